@@ -1,32 +1,46 @@
 import argparse
+import functools
+import importlib
 import logging
 import os
 import sys
-import time
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 
 from tqdm import tqdm
 
 from paper2table import __version__
-from paper2table.mapping import TablesMapping
-from paper2table.page_range import parse_page_range
-from paper2table.readers import (
-    agent,
-    camelot,
-    pdfplumber,
-    img2table,
-    pymupdf,
-    hybrid,
-    split_pages,
+from paper2table.cache import (
+    DEFAULT_CACHE_SIZE_MB,
+    ExtractionCache,
+    LLMCache,
+    OCRCache,
+    RepairCache,
+    TextLayerCache,
+    TriageCache,
+    cached_read_tables,
+    default_cache_directory,
+    source_digest,
 )
-from paper2table.readers.errors import ModelUnavailableError, PartialProcessingError
+from paper2table.dispatcher import ModelDispatcher, RunAgent, sleeping_runner
+from paper2table.readers import READERS, load_reader
+from paper2table.journal import RunJournal, is_completed, paper_key, status_record
+from paper2table.retry import DEFAULT_RETRY_BUDGET, DEFAULT_RETRY_DELAY, RetryQueue
+from paper2table.runner import PaperResult, read_papers
+from paper2table.scheduler import clean_path_costs, longest_first, scan_page_counts
+from paper2table.supervisor import default_context
+from paper2table.work_queue import DEFAULT_LEASE_TIMEOUT, LeaseQueue
 from paper2table.tables_reader import TablesReader
 from paper2table.writers import file, stdout, tablemerge
+from paper2table.writers.background import BackgroundWriter
 from paper2table.writers.tablemerge import TablemergeMetadata
-from utils.handle_sigint import handle_sigint
+from utils.handle_sigint import handle_sigint, on_sigint
+
+if TYPE_CHECKING:
+    from paper2table.mapping import TablesMapping
 
 __author__ = "Franco Leonardo Bulgarelli"
 __copyright__ = "Franco Leonardo Bulgarelli"
@@ -57,7 +71,7 @@ def parse_args():
     parser.add_argument(
         "-r",
         "--reader",
-        choices=["agent", "pdfplumber", "camelot", "img2table", "pymupdf"],
+        choices=READERS,
         help="How tables are going to be extracted",
         default="pdfplumber",
     )
@@ -79,6 +93,51 @@ def parse_args():
         ),
         action="store_true",
     )
+    parser.add_argument(
+        "--score-threshold",
+        type=float,
+        metavar="SCORE",
+        help=(
+            "Score, between 0 and 1, from which a table read with a mapping is"
+            " accepted without trying the remaining extraction strategies."
+            " Default is 0.9. Only used in hybrid mode by pdfplumber, img2table,"
+            " pymupdf and fastgrid readers"
+        ),
+    )
+    parser.add_argument(
+        "--page-time-budget",
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "Max seconds spent trying extraction strategies on each page of a table"
+            " read with a mapping, after which the best table found so far is used."
+            " Default is 1. Only used in hybrid mode by pdfplumber, img2table, pymupdf and"
+            " fastgrid readers"
+        ),
+    )
+    parser.add_argument(
+        "--triage",
+        type=float,
+        nargs="?",
+        const=0.3,
+        metavar="SCORE",
+        help=(
+            "Before reading all the tables of a paper, cheaply score how likely"
+            " each page is to contain tables, and only read pages scoring at least"
+            " SCORE, between 0 and 1. Default SCORE is 0.3."
+            " Only used by pdfplumber, img2table, pymupdf and fastgrid readers"
+            " without a mapping"
+        ),
+    )
+    parser.add_argument(
+        "--persist-strategies",
+        action="store_true",
+        help=(
+            "Store the table extraction strategies that succeeded for each paper"
+            " next to its mapping, trying them first in later runs."
+            " Only used in hybrid mode"
+        ),
+    )
     parser.add_argument(
         "-m",
         "--model",
@@ -86,14 +145,98 @@ def parse_args():
         help="language model. Default is google-gla:gemini-2.5-flash",
         default="google-gla:gemini-2.5-flash",
     )
+    parser.add_argument(
+        "--llm-cache",
+        type=str,
+        metavar="DIR",
+        help=(
+            "Record the outputs of model calls in the given directory, keyed by"
+            " the sent pdf, model, schema and instructions, and replay them in"
+            " later runs instead of calling the model again."
+            " Only used by agent or hybrid reader"
+        ),
+    )
+    parser.add_argument(
+        "--llm-replay",
+        action="store_true",
+        help=(
+            "Only replay the model outputs recorded in --llm-cache, failing"
+            " papers whose outputs weren't recorded instead of calling the model"
+        ),
+    )
+    parser.add_argument(
+        "--slim-pdf",
+        type=int,
+        nargs="?",
+        const=150,
+        metavar="DPI",
+        help=(
+            "Before sending papers to the model, downsample their images to DPI,"
+            " subset their fonts and remove their unused objects."
+            " Default DPI is 150. Only used by agent or hybrid reader"
+        ),
+    )
+    parser.add_argument(
+        "--drop-images",
+        action="store_true",
+        help=(
+            "Remove the images of papers before sending them to the model."
+            " Only used by agent or hybrid reader"
+        ),
+    )
+    parser.add_argument(
+        "--retry-budget",
+        type=int,
+        metavar="N",
+        default=DEFAULT_RETRY_BUDGET,
+        help=(
+            "Max number of times papers are read again during the run when"
+            " the model is unavailable, waiting longer before each retry."
+            " Pass 0 for not retrying them."
+            f" Only used by agent or hybrid reader. Default is {DEFAULT_RETRY_BUDGET}"
+        ),
+    )
+    parser.add_argument(
+        "--retry-delay",
+        type=float,
+        metavar="SECONDS",
+        default=DEFAULT_RETRY_DELAY,
+        help=(
+            "Seconds to wait, on average, before the first retry of a paper."
+            " Later retries wait twice as long each time."
+            f" Default is {DEFAULT_RETRY_DELAY:g}"
+        ),
+    )
     parser.add_argument(
         "-z",
         "--model-sleep",
         type=int,
         help="number of seconds to wait between model calls."
-        " Only used by agent reader. Default is 5 seconds ",
+        " Only used by agent or hybrid reader when --max-concurrent-requests"
+        " is not given. Default is 5 seconds ",
         default=5,
     )
+    parser.add_argument(
+        "--max-concurrent-requests",
+        type=int,
+        metavar="K",
+        help=(
+            "Send model calls concurrently, keeping up to K requests in flight,"
+            " instead of sleeping between them. Only used by agent or hybrid reader"
+        ),
+    )
+    parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        metavar="N",
+        help="Max model requests per minute. Only used with --max-concurrent-requests",
+    )
+    parser.add_argument(
+        "--tokens-per-minute",
+        type=float,
+        metavar="N",
+        help="Max model tokens per minute. Only used with --max-concurrent-requests",
+    )
     parser.add_argument(
         "-s",
         "--schema",
@@ -117,7 +260,10 @@ def parse_args():
         "-c",
         "--column-names-hints-path",
         type=str,
-        help="column name hints path. Only used by pdfplumber, img2table and pymupdf reader",
+        help=(
+            "column name hints path."
+            " Only used by pdfplumber, img2table, pymupdf and fastgrid readers"
+        ),
     )
     parser.add_argument(
         "-o",
@@ -125,6 +271,26 @@ def parse_args():
         type=str,
         help="Destination directory",
     )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["json", "jsonl"],
+        default="json",
+        help=(
+            "Output format when writing to stdout. jsonl writes exactly one"
+            " TablesFile per line, flushing each one as soon as it is ready."
+            " Default is json"
+        ),
+    )
+    parser.add_argument(
+        "--status-records",
+        action="store_true",
+        help=(
+            "Also write a status record line after each paper, describing its"
+            " outcome. Papers are then written as soon as they are ready,"
+            " regardless of their order. Only used with --format jsonl"
+        ),
+    )
     parser.add_argument(
         "-t",
         "--tablemerge",
@@ -137,6 +303,38 @@ def parse_args():
         metavar="UUID",
         help="Append to an existing resultset. Must be used with -t and -o",
     )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help=(
+            "Also retry papers that failed or timed out in the resultset being"
+            " appended to."
+            " Partial and model-unavailable papers are always retried."
+            " Only used with --append"
+        ),
+    )
+    parser.add_argument(
+        "--queue",
+        type=str,
+        metavar="DIR",
+        help=(
+            "Share the run with other nodes through the given directory, which"
+            " must be visible to all of them - e.g. on an NFS volume. Papers are"
+            " claimed by one node at a time, and all nodes write into the same"
+            " resultset. Must be used with -t and -o"
+        ),
+    )
+    parser.add_argument(
+        "--lease-timeout",
+        type=float,
+        metavar="SECONDS",
+        default=DEFAULT_LEASE_TIMEOUT,
+        help=(
+            "Seconds after which papers claimed by an unresponsive node are"
+            f" claimed again by other nodes. Only used with --queue."
+            f" Default is {DEFAULT_LEASE_TIMEOUT}"
+        ),
+    )
     parser.add_argument(
         "--split-pages",
         dest="split_pages",
@@ -150,6 +348,137 @@ def parse_args():
             "Only supported with -r agent (without -H)."
         ),
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=str(default_cache_directory()),
+        help=(
+            "Directory where extraction results are cached."
+            f" Default is {default_cache_directory()}"
+        ),
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        metavar="MB",
+        default=DEFAULT_CACHE_SIZE_MB,
+        help=(
+            "Max size in megabytes of each of the caches kept in --cache-dir -"
+            " extraction results, repaired papers, text layers, OCR output and"
+            " triage scores -, so that they may use up to several times this"
+            " size together. Least recently used entries are evicted first."
+            f" Default is {DEFAULT_CACHE_SIZE_MB}"
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read nor write cached extraction results",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached extraction results, overwriting them with new ones",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Number of parallel worker processes used for reading papers (default: 1). "
+            "Results are still written by the main process"
+        ),
+    )
+    parser.add_argument(
+        "--page-workers",
+        type=int,
+        metavar="N",
+        help=(
+            "Read the pages of each paper using N worker processes, so that long"
+            " papers can use several cores. Only used by pdfplumber, pymupdf,"
+            " fastgrid and camelot readers when reading all the tables of a paper"
+        ),
+    )
+    parser.add_argument(
+        "--ocr-threads",
+        type=int,
+        metavar="N",
+        default=1,
+        help=(
+            "Number of Tesseract processes run at once on the scanned pages"
+            " of each paper. Only used by img2table reader. Default is 1"
+        ),
+    )
+    parser.add_argument(
+        "--ocr-lang",
+        type=str,
+        metavar="LANG",
+        default="eng",
+        help=(
+            "Tesseract language of scanned pages, e.g. spa or eng+spa."
+            " Only used by img2table reader. Default is eng"
+        ),
+    )
+    parser.add_argument(
+        "--raster-dpi",
+        type=int,
+        metavar="DPI",
+        default=200,
+        help=(
+            "Resolution at which scanned pages are rasterized before OCR."
+            " Only used by img2table reader. Default is 200"
+        ),
+    )
+    parser.add_argument(
+        "--raster-grayscale",
+        action="store_true",
+        help="Rasterize pages in grayscale. Only used by img2table reader",
+    )
+    parser.add_argument(
+        "--raster-window",
+        type=int,
+        metavar="N",
+        default=8,
+        help=(
+            "Rasterize and read N pages at a time, so that memory doesn't grow"
+            " with the length of papers. Only used by img2table reader. Default is 8"
+        ),
+    )
+    parser.add_argument(
+        "--schedule",
+        choices=["longest-first", "given"],
+        default="longest-first",
+        help=(
+            "Order in which papers are dispatched to parallel workers."
+            " longest-first counts the pages of every paper beforehand, sending"
+            " the longest ones first, and shows progress in pages."
+            " given keeps the order of the given paths. Output order is not"
+            " affected. Default is longest-first"
+        ),
+    )
+    parser.add_argument(
+        "--paper-timeout",
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "Read each paper in a supervised worker process, killing it"
+            " when reading takes longer than the given seconds."
+            " The paper is then reported as timed out"
+        ),
+    )
+    parser.add_argument(
+        "--max-tasks-per-worker",
+        type=int,
+        metavar="N",
+        help="Replace each worker process after it reads N papers",
+    )
+    parser.add_argument(
+        "--max-worker-memory",
+        type=int,
+        metavar="MB",
+        help="Replace each worker process once its resident memory exceeds MB megabytes",
+    )
     parser.add_argument(
         "-vv",
         "--verbose",
@@ -167,23 +496,45 @@ def parse_args():
     return parser.parse_args()
 
 
-def setup_logging(loglevel):
+def setup_logging(loglevel, stream=sys.stdout):
     """Setup basic logging
 
     Args:
       loglevel (int): minimum loglevel for emitting messages
+      stream: where messages are written
     """
     logformat = "[%(asctime)s] %(levelname)s:%(name)s:%(message)s"
-    logging.basicConfig(
-        stream=sys.stdout, format=logformat, datefmt="%Y-%m-%d %H:%M:%S"
-    )
+    logging.basicConfig(stream=stream, format=logformat, datefmt="%Y-%m-%d %H:%M:%S")
     logging.getLogger().setLevel(logging.WARN)
     if loglevel:
         _logger.setLevel(loglevel)
 
 
-def get_tables_reader(args):
+def get_log_stream(args):
+    # results and status records written to stdout must not be mixed with logs
+    return sys.stdout if args.output_directory else sys.stderr
+
+
+def get_tables_reader(
+    args,
+    run_agent: Optional[RunAgent] = None,
+    page_executor: Optional[ProcessPoolExecutor] = None,
+):
+    if run_agent is None:
+        run_agent = sleeping_runner(args.model_sleep)
+    selection = read_candidate_selection(args)
+    if args.triage is not None and args.reader in (
+        "pdfplumber",
+        "img2table",
+        "pymupdf",
+        "fastgrid",
+    ):
+        selection["triage"] = get_page_triager(args)
+    llm_cache = get_llm_cache(args)
+    slimmer = get_pdf_slimmer(args)
+
     if args.reader == "agent":
+        agent = load_reader("agent")
         schema = read_schema(args)
         if not schema:
             print(
@@ -193,75 +544,132 @@ def get_tables_reader(args):
             sys.exit(1)
 
         def read_tables(  # pyright: ignore[reportRedeclaration]
-            paper_path: str, mapping: Optional[TablesMapping] = None
+            paper_path: str, mapping: Optional["TablesMapping"] = None
         ):
-            time.sleep(args.model_sleep)
             _logger.debug(f"Processing paper {paper_path} with model {args.model}")
-            return agent.read_tables(paper_path, model=args.model, schema=schema)
+            return agent.read_tables(
+                paper_path,
+                model=args.model,
+                schema=schema,
+                run_agent=run_agent,
+                llm_cache=llm_cache,
+                slimmer=slimmer,
+            )
 
     elif args.reader == "pdfplumber":
-        column_names_hints = (
-            Path(args.column_names_hints_path).read_text(encoding="utf-8")
-            if args.column_names_hints_path
-            else ""
-        )
+        pdfplumber = load_reader("pdfplumber")
+        column_names_hints = read_column_names_hints(args)
 
         _logger.debug(
             f"Using pdfplumber reader with column names hints {column_names_hints}"
         )
 
+        cache_size = args.cache_size * 1024 * 1024
+        repair_cache = (
+            None if args.no_cache else RepairCache(args.cache_dir, max_size=cache_size)
+        )
+        text_layer_cache = (
+            None
+            if args.no_cache
+            else TextLayerCache(args.cache_dir, max_size=cache_size)
+        )
+
         def read_tables(  # pyright: ignore[reportRedeclaration]
-            paper_path: str, mapping: Optional[TablesMapping] = None
+            paper_path: str, mapping: Optional["TablesMapping"] = None
         ):
             _logger.debug(f"Processing paper {paper_path}...")
             return pdfplumber.read_tables(
-                paper_path, column_names_hints, mapping=mapping
+                paper_path,
+                column_names_hints,
+                mapping=mapping,
+                page_executor=page_executor,
+                repair_cache=repair_cache,
+                text_layer_cache=text_layer_cache,
+                **selection,
             )
 
     elif args.reader == "img2table":
-        column_names_hints = (
-            Path(args.column_names_hints_path).read_text(encoding="utf-8")
-            if args.column_names_hints_path
-            else ""
-        )
+        img2table = load_reader("img2table")
+        column_names_hints = read_column_names_hints(args)
 
         _logger.debug(
             f"Using img2table reader with column names hints {column_names_hints}"
         )
 
+        ocr_cache = (
+            None
+            if args.no_cache
+            else OCRCache(args.cache_dir, max_size=args.cache_size * 1024 * 1024)
+        )
+
         def read_tables(  # pyright: ignore[reportRedeclaration]
-            paper_path: str, mapping: Optional[TablesMapping] = None
+            paper_path: str, mapping: Optional["TablesMapping"] = None
         ):
             _logger.debug(f"Processing paper {paper_path}...")
             return img2table.read_tables(
-                paper_path, column_names_hints, mapping=mapping
+                paper_path,
+                column_names_hints,
+                mapping=mapping,
+                ocr_threads=args.ocr_threads,
+                ocr_lang=args.ocr_lang,
+                ocr_cache=ocr_cache,
+                dpi=args.raster_dpi,
+                grayscale=args.raster_grayscale,
+                pages_per_window=args.raster_window,
+                **selection,
             )
 
     elif args.reader == "pymupdf":
-        column_names_hints = (
-            Path(args.column_names_hints_path).read_text(encoding="utf-8")
-            if args.column_names_hints_path
-            else ""
-        )
+        pymupdf = load_reader("pymupdf")
+        column_names_hints = read_column_names_hints(args)
 
         _logger.debug(
             f"Using pymupdf reader with column names hints {column_names_hints}"
         )
 
         def read_tables(  # pyright: ignore[reportRedeclaration]
-            paper_path: str, mapping: Optional[TablesMapping] = None
+            paper_path: str, mapping: Optional["TablesMapping"] = None
+        ):
+            _logger.debug(f"Processing paper {paper_path}...")
+            return pymupdf.read_tables(
+                paper_path,
+                column_names_hints,
+                mapping=mapping,
+                page_executor=page_executor,
+                **selection,
+            )
+
+    elif args.reader == "fastgrid":
+        fastgrid = load_reader("fastgrid")
+        column_names_hints = read_column_names_hints(args)
+
+        _logger.debug(
+            f"Using fastgrid reader with column names hints {column_names_hints}"
+        )
+
+        def read_tables(  # pyright: ignore[reportRedeclaration]
+            paper_path: str, mapping: Optional["TablesMapping"] = None
         ):
             _logger.debug(f"Processing paper {paper_path}...")
-            return pymupdf.read_tables(paper_path, column_names_hints, mapping=mapping)
+            return fastgrid.read_tables(
+                paper_path,
+                column_names_hints,
+                mapping=mapping,
+                page_executor=page_executor,
+                **selection,
+            )
 
     elif args.reader == "camelot":
+        camelot = load_reader("camelot")
         _logger.debug(f"Using camelot reader {args.reader}-{args.model}")
 
         def read_tables(  # pyright: ignore[reportRedeclaration]
-            paper_path: str, mapping: Optional[TablesMapping] = None
+            paper_path: str, mapping: Optional["TablesMapping"] = None, page_range=None
         ):
             _logger.debug(f"Processing paper {paper_path}...")
-            return camelot.read_tables(paper_path)
+            return camelot.read_tables(
+                paper_path, page_executor=page_executor, page_range=page_range
+            )
 
     else:
         raise ValueError(f"Reader {args.reader} is not implemented yet")
@@ -271,17 +679,36 @@ def get_tables_reader(args):
             print("--split-pages is only supported with -r agent (without -H)")
             sys.exit(1)
 
-    base_read = read_tables
+    # camelot reads page ranges by itself, without copying them to a new pdf
+    if args.reader != "camelot":
+        split_pages = load_reader("split_pages")
+        base_read = read_tables
 
-    def read_tables(  # pyright: ignore[reportRedeclaration]
-        paper_path: str, mapping=None, page_range=None
-    ):
-        return split_pages.read_tables(
-            paper_path,
-            lambda path: base_read(path, mapping),
-            sleep=0,
-            page_range=page_range,
-            page_size=args.split_pages,
+        def read_tables(  # pyright: ignore[reportRedeclaration]
+            paper_path: str, mapping=None, page_range=None
+        ):
+            return split_pages.read_tables(
+                paper_path,
+                lambda path: base_read(path, mapping),
+                sleep=0,
+                page_range=page_range,
+                page_size=args.split_pages,
+            )
+
+    if args.reader != "agent" and not args.no_cache:
+        read_tables = cached_read_tables(
+            read_tables,
+            ExtractionCache(args.cache_dir, max_size=args.cache_size * 1024 * 1024),
+            refresh=args.refresh_cache,
+            reader=args.reader,
+            column_names_hints=read_column_names_hints(args),
+            version=__version__,
+            source=source_digest(),
+            triage=args.triage,
+            ocr_lang=args.ocr_lang,
+            raster_dpi=args.raster_dpi,
+            raster_grayscale=args.raster_grayscale,
+            **read_candidate_selection(args),
         )
 
     if args.hybrid:
@@ -296,13 +723,13 @@ def get_tables_reader(args):
 
         _logger.debug(f"Schema is {schema}")
         _logger.debug(f"Applying {args.reader}-{args.model} hybrid reader")
+        hybrid = load_reader("hybrid")
 
         base_reader = read_tables
 
         def read_tables(  # pyright: ignore[reportRedeclaration]
-            paper_path: str, mapping: Optional[TablesMapping] = None, page_range=None
+            paper_path: str, mapping: Optional["TablesMapping"] = None, page_range=None
         ):
-            time.sleep(args.model_sleep)
             _logger.debug(f"Hybrid processing paper {paper_path}...")
             return hybrid.read_tables(
                 paper_path,
@@ -311,11 +738,82 @@ def get_tables_reader(args):
                 schema=schema,
                 reader=base_reader,
                 force_mapping_generation=args.force_mapping_generation,
+                run_agent=run_agent,
+                persist_strategies=args.persist_strategies,
+                llm_cache=llm_cache,
+                slimmer=slimmer,
             )
 
     return read_tables
 
 
+def read_column_names_hints(args):
+    return (
+        Path(args.column_names_hints_path).read_text(encoding="utf-8")
+        if args.column_names_hints_path
+        else ""
+    )
+
+
+def read_candidate_selection(args) -> dict:
+    """
+    Answers the options for selecting among candidate tables
+    that were explicitly given
+    """
+    selection = {
+        "score_threshold": args.score_threshold,
+        "page_time_budget": args.page_time_budget,
+    }
+    return {option: value for option, value in selection.items() if value is not None}
+
+
+def get_page_executor(args) -> Optional[ProcessPoolExecutor]:
+    """
+    Answers the pool of processes used for reading the pages of
+    each paper, if any. Processes are started on first use
+    """
+    if not args.page_workers or args.page_workers < 2:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=args.page_workers, mp_context=default_context()
+    )
+
+
+def get_llm_cache(args) -> Optional[LLMCache]:
+    if args.llm_replay and not args.llm_cache:
+        print("--llm-replay must be used with --llm-cache")
+        sys.exit(1)
+
+    if not args.llm_cache:
+        return None
+    return LLMCache(args.llm_cache, replay=args.llm_replay)
+
+
+def get_pdf_slimmer(args):
+    if args.slim_pdf is None and not args.drop_images:
+        return None
+    if args.reader != "agent" and not args.hybrid:
+        print("--slim-pdf and --drop-images are only supported with -r agent or -H")
+        sys.exit(1)
+
+    from paper2table.readers.payload import DEFAULT_IMAGE_DPI, PdfSlimmer
+
+    return PdfSlimmer(
+        image_dpi=args.slim_pdf or DEFAULT_IMAGE_DPI, drop_images=args.drop_images
+    )
+
+
+def get_page_triager(args):
+    from paper2table.readers.triage import PageTriager
+
+    cache = (
+        None
+        if args.no_cache
+        else TriageCache(args.cache_dir, max_size=args.cache_size * 1024 * 1024)
+    )
+    return PageTriager(args.triage, cache=cache, refresh=args.refresh_cache)
+
+
 def read_schema(args):
     return (
         Path(args.schema_path).read_text(encoding="utf-8")
@@ -324,13 +822,19 @@ def read_schema(args):
     )
 
 
-def get_skip_predicate(args):
+def get_skip_predicate(args, journal: Optional[RunJournal]):
     if not args.append:
         return lambda _: False
 
     resultset_dir = os.path.join(args.output_directory, args.append)
+    records = journal.load() if journal else {}
 
     def should_skip(paper_path):
+        record = records.get(paper_key(paper_path))
+        if record is not None:
+            return is_completed(record, retry_failed=args.retry_failed)
+
+        # resultsets created before journals were introduced
         # TODO this is duplicated
         basename = os.path.basename(paper_path).replace(".pdf", ".tables.json")
         return os.path.exists(os.path.join(resultset_dir, basename))
@@ -338,7 +842,9 @@ def get_skip_predicate(args):
     return should_skip
 
 
-def get_table_writer(args):
+def get_tablemerge_metadata(
+    args, work_queue: Optional[LeaseQueue] = None
+) -> Optional[TablemergeMetadata]:
     if args.tablemerge and not args.output_directory:
         print("--tablemerge requires also --output-directory")
         sys.exit(1)
@@ -347,32 +853,86 @@ def get_table_writer(args):
         print("--append requires --tablemerge and --output-directory")
         sys.exit(1)
 
-    if args.tablemerge:
-        if args.append:
-            validate_existing_resultset(args)
-            uuid = UUID(args.append)
-        else:
-            uuid = None
+    if not args.tablemerge:
+        return None
 
-        metadata = TablemergeMetadata(
-            reader=args.reader, model=args.model, hybrid=args.hybrid, uuid=uuid
-        )
+    if args.append:
+        validate_existing_resultset(args, args.append)
+        uuid = UUID(args.append)
+    elif work_queue:
+        uuid = UUID(work_queue.resultset_uuid())
+        if os.path.exists(
+            os.path.join(args.output_directory, str(uuid), "tables.metadata.json")
+        ):
+            validate_existing_resultset(args, str(uuid), flag="--queue")
+    else:
+        uuid = None
+
+    return TablemergeMetadata(
+        reader=args.reader, model=args.model, hybrid=args.hybrid, uuid=uuid
+    )
+
+
+def get_work_queue(args) -> Optional[LeaseQueue]:
+    if not args.queue:
+        return None
+
+    if not (args.tablemerge and args.output_directory):
+        print("--queue requires --tablemerge and --output-directory")
+        sys.exit(1)
+
+    if args.append:
+        print("--queue can't be used together with --append")
+        sys.exit(1)
+
+    work_queue = LeaseQueue(args.queue, lease_timeout=args.lease_timeout)
+    on_sigint(work_queue.close)
+    _logger.debug(f"Sharing run through queue {args.queue} as {work_queue.node}")
+    return work_queue
+
+
+def get_journal(
+    args,
+    metadata: Optional[TablemergeMetadata],
+    work_queue: Optional[LeaseQueue] = None,
+) -> Optional[RunJournal]:
+    if metadata is None:
+        return None
+
+    journal = RunJournal(
+        os.path.join(args.output_directory, str(metadata.uuid)),
+        node=work_queue.node if work_queue else None,
+    )
+    on_sigint(journal.flush)
+    return journal
+
+
+def get_table_writer(args, metadata: Optional[TablemergeMetadata]):
+    if metadata is not None:
+        resultset_dir = None
 
         def write_tables(result: TablesReader, paper_path: str):  # pyright: ignore[reportRedeclaration]
-            tablemerge.write_tables(
-                result,
-                paper_path,
-                output_directory=args.output_directory,
-                metadata=metadata,
-            )
+            nonlocal resultset_dir
+            # the resultset directory and its metadata are created only once,
+            # on the first written paper
+            if resultset_dir is None:
+                resultset_dir = tablemerge.write_metadata(
+                    args.output_directory, metadata
+                )
+            return file.write_tables(result, paper_path, resultset_dir)
 
     elif args.output_directory:
 
         def write_tables(result: TablesReader, paper_path: str):  # pyright: ignore[reportRedeclaration]
-            file.write_tables(
+            return file.write_tables(
                 result, paper_path, output_directory=args.output_directory
             )
 
+    elif args.format == "jsonl":
+
+        def write_tables(result: TablesReader, _paper_path: str):  # pyright: ignore[reportRedeclaration]
+            stdout.write_tables_line(result)
+
     else:
 
         def write_tables(result: TablesReader, _paper_path: str):
@@ -381,11 +941,29 @@ def get_table_writer(args):
     return write_tables
 
 
-def validate_existing_resultset(args):
+def get_status_writer(args):
+    if args.format == "jsonl" and args.output_directory:
+        print("--format jsonl is only supported when writing to stdout")
+        sys.exit(1)
+
+    if args.status_records and args.format != "jsonl":
+        print("--status-records requires --format jsonl")
+        sys.exit(1)
+
+    if not args.status_records:
+        return None
+
+    def write_status(paper: PaperResult):
+        stdout.write_line(status_record(paper))
+
+    return write_status
+
+
+def validate_existing_resultset(args, uuid: str, flag: str = "--append"):
     try:
-        existing = tablemerge.load_metadata(args.output_directory, args.append)
+        existing = tablemerge.load_metadata(args.output_directory, uuid)
     except FileNotFoundError:
-        print("--append: resultset doesn't exist or doesn't contain valid metadata")
+        print(f"{flag}: resultset doesn't exist or doesn't contain valid metadata")
         sys.exit(1)
 
     current_reader = TablemergeMetadata(
@@ -394,50 +972,212 @@ def validate_existing_resultset(args):
 
     if existing["reader"] != current_reader:
         print(
-            "--append: reader mismatch."
+            f"{flag}: reader mismatch."
             f" Existing: {existing['reader']}, current: {current_reader}"
         )
         sys.exit(1)
 
 
-def get_paper_paths(args):
-    return args.paths if args.quiet else tqdm(args.paths, miniters=1, mininterval=0)
+def get_model_dispatcher(args) -> Optional[ModelDispatcher]:
+    if not args.max_concurrent_requests:
+        return None
+
+    if args.reader != "agent" and not args.hybrid:
+        print("--max-concurrent-requests is only supported with -r agent or -H")
+        sys.exit(1)
+
+    if (
+        args.workers > 1
+        or args.paper_timeout
+        or args.max_tasks_per_worker
+        or args.max_worker_memory
+    ):
+        print(
+            "--max-concurrent-requests can't be used together with --workers,"
+            " --paper-timeout, --max-tasks-per-worker nor --max-worker-memory"
+        )
+        sys.exit(1)
+
+    _logger.debug(
+        f"Using up to {args.max_concurrent_requests} concurrent model requests"
+    )
+    return ModelDispatcher(
+        args.max_concurrent_requests,
+        requests_per_minute=args.requests_per_minute,
+        tokens_per_minute=args.tokens_per_minute,
+    )
+
+
+def get_page_counts(args, should_skip, parallel: bool) -> Optional[dict[str, int]]:
+    # page counts are only used for dispatching papers and showing progress
+    if args.schedule != "longest-first" or (args.quiet and not parallel):
+        return None
+    return scan_page_counts(args.paths, should_skip)
+
+
+def get_paper_paths(
+    args, page_counts: Optional[dict[str, int]], work_queue: Optional[LeaseQueue]
+):
+    if work_queue is None:
+        return args.paths
+
+    # papers are claimed right before being dispatched, in dispatch order
+    paths = (
+        [args.paths[i] for i in longest_first(args.paths, page_counts)]
+        if page_counts
+        else args.paths
+    )
+    return work_queue.claims(paths)
+
+
+def with_progress(args, results, page_counts: Optional[dict[str, int]] = None):
+    if args.quiet:
+        yield from results
+        return
+
+    if page_counts is None:
+        yield from tqdm(results, total=len(args.paths), miniters=1, mininterval=0)
+        return
+
+    pages = clean_path_costs(page_counts)
+    with tqdm(
+        total=sum(page_counts.values()), unit="page", miniters=1, mininterval=0
+    ) as progress:
+        for paper in results:
+            yield paper
+            progress.update(pages.get(paper.path, 0))
+
+
+def build_worker_reader(args):
+    setup_logging(args.loglevel, get_log_stream(args))
+    return get_tables_reader(args, page_executor=get_page_executor(args))
+
+
+def get_worker_reader_factory():
+    # worker processes can't resolve functions of the __main__ module when
+    # paper2table is run with python -m, so build_worker_reader is referenced
+    # through the importable paper2table.__main__ module instead
+    return importlib.import_module("paper2table.__main__").build_worker_reader
+
+
+def handle_paper_result(paper: PaperResult, write_tables) -> Optional[str]:
+    """
+    Log the outcome of a paper and write its results, if any,
+    answering the path of the written file
+    """
+    if paper.status == "skipped":
+        _logger.debug(f"Skipping {paper.path}, already in resultset")
+    elif paper.status == "unavailable":
+        _logger.warning("model is unavailable right now")
+    elif paper.status == "partial":
+        if paper.model_unavailable:
+            _logger.warning("model is unavailable right now")
+        else:
+            _logger.warning(
+                f"Paper {paper.path} failed on page {paper.page_num}."
+                f" Writing partial results. {paper.error}"
+            )
+        return write_tables(paper.result, paper.path)
+    elif paper.status == "failed":
+        _logger.warning(f"Paper {paper.path} failed {paper.error}")
+    elif paper.status == "timeout":
+        _logger.warning(f"Paper {paper.path} timed out. {paper.error}")
+    else:
+        path = write_tables(paper.result, paper.path)
+        _logger.debug(f"Paper {paper.path} processed")
+        return path
+    return None
 
 
 def main():
     handle_sigint()
 
     args = parse_args()
-    setup_logging(args.loglevel)
+    setup_logging(args.loglevel, get_log_stream(args))
 
-    read_tables = get_tables_reader(args)
-    write_tables = get_table_writer(args)
-    should_skip = get_skip_predicate(args)
+    # sigint callbacks run in order, so queued writes are drained
+    # before the journal is flushed and the work queue is closed
+    writer = BackgroundWriter()
+    on_sigint(writer.close)
 
-    for raw_path in get_paper_paths(args):
-        clean_path, page_range = parse_page_range(raw_path)
-        if should_skip(clean_path):
-            _logger.debug(f"Skipping {clean_path}, already in resultset")
-            continue
-        try:
-            result = read_tables(clean_path, page_range=page_range)
+    dispatcher = get_model_dispatcher(args)
 
-            write_tables(result, clean_path)
+    page_executor = get_page_executor(args)
+    if page_executor:
+        on_sigint(
+            functools.partial(page_executor.shutdown, wait=False, cancel_futures=True)
+        )
 
-            _logger.debug(f"Paper {clean_path} processed")
-        except ModelUnavailableError:
-            _logger.warning("model is unavailable right now")
-        except PartialProcessingError as e:
-            if isinstance(e.__cause__, ModelUnavailableError):
-                _logger.warning("model is unavailable right now")
-            else:
-                _logger.warning(
-                    f"Paper {clean_path} failed on page {e.page_num}."
-                    f" Writing partial results. {str(traceback.format_exc())}"
-                )
-            write_tables(e.partial_result, clean_path)
+    read_tables = get_tables_reader(
+        args,
+        run_agent=dispatcher.run_agent if dispatcher else None,
+        page_executor=page_executor,
+    )
+    work_queue = get_work_queue(args)
+    metadata = get_tablemerge_metadata(args, work_queue)
+    write_tables = get_table_writer(args, metadata)
+    write_status = get_status_writer(args)
+    journal = get_journal(args, metadata, work_queue)
+    should_skip = get_skip_predicate(args, journal)
+    page_counts = get_page_counts(
+        args, should_skip, parallel=dispatcher is not None or args.workers > 1
+    )
+
+    # papers whose model was unavailable are read again
+    # in between other papers, and at the end of the run
+    retries = RetryQueue(budget=args.retry_budget, base_delay=args.retry_delay)
+
+    results = read_papers(
+        get_paper_paths(args, page_counts, work_queue),
+        read_tables,
+        should_skip=should_skip,
+        workers=dispatcher.max_concurrency if dispatcher else args.workers,
+        use_threads=dispatcher is not None,
+        reader_factory=get_worker_reader_factory(),
+        factory_args=(args,),
+        # stdout output must keep the order of the given paths,
+        # unless each paper is followed by its status record
+        ordered=not (args.output_directory or write_status),
+        timeout=args.paper_timeout,
+        max_tasks_per_worker=args.max_tasks_per_worker,
+        max_worker_rss=(
+            args.max_worker_memory * 1024 * 1024 if args.max_worker_memory else None
+        ),
+        costs=None if work_queue else page_counts,
+        retries=retries,
+    )
+
+    def finish_paper(paper: PaperResult) -> Optional[str]:
+        try:
+            path = handle_paper_result(paper, write_tables)
         except Exception:
-            _logger.warning(f"Paper {clean_path} failed {str(traceback.format_exc())}")
+            path = None
+            paper.status = "failed"
+            _logger.warning(f"Paper {paper.path} failed {str(traceback.format_exc())}")
+        # the journal is recorded only after results have been written
+        if journal and paper.status != "skipped":
+            journal.record(paper)
+        if write_status:
+            write_status(paper)
+        if work_queue and paper.status != "skipped":
+            work_queue.release(paper.path, completed=is_completed(status_record(paper)))
+        return path
+
+    if work_queue:
+        work_queue.start()
+    try:
+        for paper in with_progress(args, retries.settled(results), page_counts):
+            writer.submit(functools.partial(finish_paper, paper))
+    finally:
+        writer.close()
+        if page_executor:
+            page_executor.shutdown()
+        if dispatcher:
+            dispatcher.close()
+        if work_queue:
+            work_queue.close()
+        if journal:
+            journal.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,381 @@
+"""
+Content-addressed on-disk caches.
+
+Entries are files named after a key, which is usually
+built from the hash of the PDF contents and the settings
+that affect the cached value. Caches are bounded in size and evict
+the least recently used entries first
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from .tables_reader import TablesReader
+from .tables_reader.dict import DictTablesReader
+
+_logger = logging.getLogger("pape2table")
+
+DEFAULT_CACHE_SIZE_MB = 1024
+EVICTION_TARGET = 0.9
+"""
+Fraction of the max size of a cache that is kept after evicting
+"""
+
+
+def default_cache_directory() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(base) / "paper2table"
+
+
+def file_digest(path: str | Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def bytes_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@functools.cache
+def source_digest() -> str:
+    """
+    Answers a digest of the source code of paper2table, so that cached
+    results are not reused after the readers change, even if the
+    package version doesn't
+    """
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.rglob("*.py")):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def settings_digest(**settings) -> str:
+    return bytes_digest(
+        json.dumps(settings, sort_keys=True, ensure_ascii=False, default=str).encode(
+            "utf-8"
+        )
+    )
+
+
+class DiskCache:
+    """
+    A directory of cache entries, bounded to max_size bytes
+    - or unbounded if max_size is None.
+
+    Reading an entry refreshes its modification time,
+    which is used for least-recently-used eviction.
+    Writes are atomic, so that the same cache can be shared
+    by concurrent processes
+    """
+
+    def __init__(
+        self, directory: str | Path, max_size: Optional[int], suffix: str = ""
+    ):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.suffix = suffix
+        self._size: Optional[int] = None
+        """
+        Running total of the size of the entries, measured
+        on the first write and resynchronized on every eviction
+        """
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def get_path(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put_bytes(self, key: str, data: bytes):
+        self.put_with(key, lambda tmp_path: Path(tmp_path).write_bytes(data))
+
+    def put_with(self, key: str, write: Callable[[str], object]):
+        """
+        Store an entry whose contents are written
+        by write(path) to a temporary file
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self.path_for(key))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.track(size)
+
+    def track(self, written: int):
+        """
+        Add the given amount of written bytes to the running total,
+        evicting entries only when it exceeds max_size.
+
+        Replaced entries and entries written by other processes are
+        not tracked, so the total is only an estimate until the next
+        eviction, which scans the directory again
+        """
+        if self.max_size is None:
+            return
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self.stats())
+        else:
+            self._size += written
+        if self._size > self.max_size:
+            self.evict()
+
+    def entries(self) -> list[os.DirEntry]:
+        try:
+            with os.scandir(self.directory) as it:
+                return [
+                    entry
+                    for entry in it
+                    if entry.is_file() and entry.name.endswith(self.suffix)
+                    and not entry.name.endswith(".tmp")
+                ]
+        except FileNotFoundError:
+            return []
+
+    def stats(self) -> list[tuple[float, int, str]]:
+        """
+        Answers the modification time, size and path of each entry
+        """
+        stats = []
+        for entry in self.entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            stats.append((stat.st_mtime, stat.st_size, entry.path))
+        return stats
+
+    def evict(self):
+        """
+        Evict the least recently used entries until the cache
+        is below EVICTION_TARGET of its max_size, so that the next
+        writes don't need to scan the directory again
+        """
+        if self.max_size is None:
+            return
+        entries = self.stats()
+        target = self.max_size * EVICTION_TARGET
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= target:
+                break
+            try:
+                os.unlink(path)
+                _logger.debug("Evicted cache entry %s", path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+        self._size = total_size
+
+
+class ExtractionCache(DiskCache):
+    """
+    A cache of readers results, stored as TablesFile JSON documents
+    """
+
+    def __init__(self, directory: str | Path, max_size: int):
+        super().__init__(Path(directory) / "extractions", max_size, suffix=".json")
+
+    def key(self, pdf_path: str, **settings) -> str:
+        return settings_digest(pdf=file_digest(pdf_path), **settings)
+
+    def get_tables(self, key: str) -> Optional[DictTablesReader]:
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+        try:
+            return DictTablesReader(json.loads(data))
+        except json.JSONDecodeError:
+            _logger.warning("Ignoring corrupted cache entry %s", self.path_for(key))
+            return None
+
+    def put_tables(self, key: str, reader: TablesReader):
+        self.put_bytes(
+            key, json.dumps(reader.to_dict(), ensure_ascii=False).encode("utf-8")
+        )
+
+
+class TriageCache(DiskCache):
+    """
+    A cache of page triages, stored as JSON lists
+    with the triage of each page
+    """
+
+    def __init__(self, directory: str | Path, max_size: int):
+        super().__init__(Path(directory) / "triage", max_size, suffix=".json")
+
+    def key(self, pdf_path: str, **settings) -> str:
+        return settings_digest(pdf=file_digest(pdf_path), **settings)
+
+    def get_triage(self, key: str) -> Optional[list[dict]]:
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+        try:
+            return json.loads(data)
+        except json.JSONDecodeError:
+            _logger.warning("Ignoring corrupted cache entry %s", self.path_for(key))
+            return None
+
+    def put_triage(self, key: str, pages: list[dict]):
+        self.put_bytes(key, json.dumps(pages).encode("utf-8"))
+
+
+class RepairCache(DiskCache):
+    """
+    A cache of repaired copies of malformed PDFs,
+    keyed by the contents of the original ones
+    """
+
+    def __init__(self, directory: str | Path, max_size: int):
+        super().__init__(Path(directory) / "repaired", max_size, suffix=".pdf")
+
+    def key(self, pdf_path: str) -> str:
+        return file_digest(pdf_path)
+
+
+class TextLayerCache(DiskCache):
+    """
+    A cache of the parsed objects of pdf pages,
+    stored as .npz files, one for each page
+    """
+
+    def __init__(self, directory: str | Path, max_size: int):
+        super().__init__(Path(directory) / "text_layer", max_size, suffix=".npz")
+
+    def key(self, pdf_digest: str, page_number: int, **settings) -> str:
+        return settings_digest(pdf=pdf_digest, page=page_number, **settings)
+
+
+class OCRCache(DiskCache):
+    """
+    A cache of the hOCR output of Tesseract,
+    keyed by the contents of the rendered page images
+    """
+
+    def __init__(self, directory: str | Path, max_size: int):
+        super().__init__(Path(directory) / "ocr", max_size, suffix=".hocr")
+
+    def key(self, image_digest: str, **settings) -> str:
+        return settings_digest(image=image_digest, **settings)
+
+
+class LLMCacheMissError(Exception):
+    pass
+
+
+class LLMCache(DiskCache):
+    """
+    A cache of the validated outputs of model calls, keyed by the
+    bytes sent to the model - e.g. a paper or a batch of its pages -
+    and the settings of the call - e.g. model, schema and instructions.
+
+    Entries are never evicted. In replay mode, missing entries
+    raise LLMCacheMissError instead of calling the model,
+    so that runs can be repeated offline
+    """
+
+    def __init__(self, directory: str | Path, replay: bool = False):
+        super().__init__(directory, max_size=None, suffix=".json")
+        self.replay = replay
+
+    def key(self, payload: bytes, **settings) -> str:
+        return settings_digest(payload=bytes_digest(payload), **settings)
+
+    def get_output(
+        self, key: str, output_type: type[BaseModel]
+    ) -> Optional[BaseModel]:
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+        try:
+            return output_type.model_validate_json(data)
+        except ValidationError:
+            _logger.warning("Ignoring invalid cache entry %s", self.path_for(key))
+            return None
+
+    def put_output(self, key: str, output: BaseModel):
+        self.put_bytes(key, output.model_dump_json().encode("utf-8"))
+
+    def output(
+        self, key: str, output_type: type[BaseModel], call: Callable[[], BaseModel]
+    ) -> BaseModel:
+        """
+        Answers the recorded output for key, or calls the model
+        with call() and records its output
+        """
+        cached = self.get_output(key, output_type)
+        if cached is not None:
+            _logger.debug("Replaying model output %s", key)
+            return cached
+        if self.replay:
+            raise LLMCacheMissError(f"No recorded model output {self.path_for(key)}")
+
+        output = call()
+        self.put_output(key, output)
+        return output
+
+
+def cached_read_tables(
+    read_tables: Callable[..., TablesReader],
+    cache: ExtractionCache,
+    refresh: bool = False,
+    **settings,
+) -> Callable[..., TablesReader]:
+    """
+    Wrap a read_tables(paper_path, mapping, page_range) function
+    so that its results are looked up in the cache first.
+
+    The cache key is built from the paper contents, the mapping,
+    the page range and the given settings.
+    When refresh is True, cached results are ignored and overwritten
+    """
+
+    def read(paper_path: str, mapping=None, page_range=None) -> TablesReader:
+        key = cache.key(
+            paper_path,
+            mapping=mapping.model_dump(mode="json") if mapping else None,
+            page_range=list(page_range) if page_range else None,
+            **settings,
+        )
+        if not refresh:
+            cached = cache.get_tables(key)
+            if cached is not None:
+                _logger.debug("Using cached extraction for %s", paper_path)
+                return cached
+
+        result = read_tables(paper_path, mapping, page_range=page_range)
+        cache.put_tables(key, result)
+        return result
+
+    return read
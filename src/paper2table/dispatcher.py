@@ -0,0 +1,113 @@
+"""
+Strategies for sending prompts to agents.
+
+Readers that use a model receive a RunAgent function,
+so that the way model calls are scheduled - sequentially with fixed
+sleeps, or concurrently and throttled by a rate limiter - can be
+chosen by the caller
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional, Sequence, cast
+
+from .rate_limit import RateLimiter
+
+if TYPE_CHECKING:
+    from pydantic_ai.usage import RunUsage
+
+_logger = logging.getLogger("pape2table")
+
+type RunAgent = Callable[[Any, Sequence[Any]], Any]
+"""
+A function that takes an Agent and a prompt,
+runs it and answers the agent run result
+"""
+
+
+def run_agent_sync(agent, prompt: Sequence[Any]):
+    return agent.run_sync(prompt)
+
+
+def sleeping_runner(sleep: float) -> RunAgent:
+    """
+    Answers a RunAgent that waits sleep seconds before each model call
+    """
+
+    def run_agent(agent, prompt: Sequence[Any]):
+        time.sleep(sleep)
+        return agent.run_sync(prompt)
+
+    return run_agent
+
+
+def total_tokens(result: Any) -> int:
+    # usage is a method in pydantic_ai 1.x and a property afterwards
+    usage = cast(
+        "RunUsage", result.usage() if callable(result.usage) else result.usage
+    )
+    return usage.total_tokens or 0
+
+
+class ModelDispatcher:
+    """
+    Runs model calls on a background asyncio event loop
+    using Agent.run, keeping up to max_concurrency requests
+    in flight and throttling them with a RateLimiter.
+
+    run_agent can be called from any number of threads,
+    and blocks until its model call is done
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError(f"Max concurrency {max_concurrency} must be positive")
+        self.max_concurrency = max_concurrency
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.loop = asyncio.new_event_loop()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="model-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    async def run(self, agent, prompt: Sequence[Any]):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            estimated_tokens = await self.limiter.acquire()
+            try:
+                result = await agent.run(prompt)
+            except BaseException:
+                self.limiter.refund(estimated_tokens)
+                raise
+            self.limiter.settle(estimated_tokens, total_tokens(result))
+            _logger.debug(
+                "Model call used %i tokens (%i estimated)",
+                total_tokens(result),
+                estimated_tokens,
+            )
+            return result
+
+    def run_agent(self, agent, prompt: Sequence[Any]):
+        return asyncio.run_coroutine_threadsafe(
+            self.run(agent, prompt), self.loop
+        ).result()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
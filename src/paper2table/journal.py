@@ -0,0 +1,125 @@
+"""
+Append-only journal of a resultset run.
+
+Each processed paper appends one JSON line to the
+tables.journal.jsonl file of the resultset, recording its outcome.
+When appending to a resultset, the journal is used for deciding
+which papers need to be processed again.
+
+When several nodes share a resultset, each one appends to its own
+tables.journal.NODE.jsonl file, and all of them are read when loading
+"""
+
+import glob
+import json
+import logging
+import os
+import threading
+from datetime import datetime as dt
+from typing import Optional
+
+from .runner import PaperResult
+
+_logger = logging.getLogger("pape2table")
+
+JOURNAL_FILENAME = "tables.journal.jsonl"
+
+JOURNAL_GLOB = "tables.journal*.jsonl"
+
+COMPLETED_STATUSES = frozenset(["done", "empty"])
+
+FAILED_STATUSES = frozenset(["failed", "timeout"])
+
+
+def paper_key(paper_path: str) -> str:
+    return os.path.basename(paper_path)
+
+
+def status_record(paper: PaperResult) -> dict:
+    """
+    Answers a JSON-serializable record of the outcome of a paper
+    """
+    return {
+        "paper": paper_key(paper.path),
+        "path": paper.path,
+        "status": paper.status,
+        "elapsed": round(paper.elapsed, 3),
+        "datetime": dt.now().isoformat(),
+        **({"page_num": paper.page_num} if paper.page_num is not None else {}),
+    }
+
+
+class RunJournal:
+    def __init__(self, resultset_dir: str, node: Optional[str] = None):
+        self.resultset_dir = resultset_dir
+        self.path = os.path.join(
+            resultset_dir,
+            f"tables.journal.{node}.jsonl" if node else JOURNAL_FILENAME,
+        )
+        self._file = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def load(self) -> dict[str, dict]:
+        """
+        Answers the last record of each paper, indexed by paper basename,
+        considering the journals of all the nodes.
+        Truncated lines - e.g. due to a crash while writing - are ignored
+        """
+        paths = sorted(glob.glob(os.path.join(self.resultset_dir, JOURNAL_GLOB)))
+        records = [record for path in paths for record in read_records(path)]
+        if len(paths) > 1:
+            # interleave the records of the journals of each node
+            records.sort(key=lambda record: str(record.get("datetime", "")))
+        return {record["paper"]: record for record in records}
+
+    def record(self, paper: PaperResult):
+        record = status_record(paper)
+        with self._lock:
+            if self._file is None:
+                os.makedirs(self.resultset_dir, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def flush(self):
+        """
+        Flush written records to disk.
+        Does nothing in forked worker processes
+        """
+        if self._file is None or os.getpid() != self._pid:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+def read_records(path: str) -> list[dict]:
+    records = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    if isinstance(record["paper"], str):
+                        records.append(record)
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    _logger.debug("Ignoring malformed journal line %s", line)
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def is_completed(record: Optional[dict], retry_failed: bool = False) -> bool:
+    if record is None:
+        return False
+    return record["status"] in COMPLETED_STATUSES or (
+        record["status"] in FAILED_STATUSES and not retry_failed
+    )
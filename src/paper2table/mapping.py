@@ -1,7 +1,7 @@
 
 
-from typing import Literal, Optional
-from pydantic import BaseModel
+from typing import Any, Literal, Optional
+from pydantic import BaseModel, PrivateAttr
 
 
 class ColumnMapping(BaseModel):
@@ -52,3 +52,17 @@ class TablesMapping(BaseModel):
     tables: list[TableMapping]
     citation: str
     metadata: Optional[TablesMappingMetadata] = None
+
+    _strategy_memo: Any = PrivateAttr(default=None)
+
+    @property
+    def strategy_memo(self):
+        """
+        The StrategyMemo used when reading the tables of this mapping,
+        if any. It is not part of the serialized mapping
+        """
+        return self._strategy_memo
+
+    @strategy_memo.setter
+    def strategy_memo(self, memo):
+        self._strategy_memo = memo
@@ -0,0 +1,120 @@
+"""
+Token-bucket based rate limiting for model calls
+"""
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """
+    A bucket that holds up to capacity tokens and
+    refills at a constant rate of capacity tokens per period seconds.
+
+    The bucket may go below zero when charged with more
+    tokens than available, which delays further acquisitions
+    until the debt is paid
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        period: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if capacity <= 0:
+            raise ValueError(f"Capacity {capacity} must be positive")
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.clock = clock
+        self.tokens = capacity
+        self.updated_at = clock()
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def delay(self, amount: float) -> float:
+        """
+        Answers the seconds to wait until amount tokens are available.
+        Amounts greater than the capacity are capped to it
+        """
+        self.refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def charge(self, amount: float):
+        self.refill()
+        self.tokens -= amount
+
+
+class RateLimiter:
+    """
+    Throttles model calls by requests per minute and tokens per minute.
+
+    Since the tokens a request consumes are only known after it is done,
+    acquire reserves an estimation that is corrected by settle afterwards.
+    The estimation is the average usage of the already settled requests
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.requests = (
+            TokenBucket(requests_per_minute, clock=clock)
+            if requests_per_minute
+            else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute else None
+        )
+        self.settled_requests = 0
+        self.settled_tokens = 0
+        self._lock = asyncio.Lock()
+
+    def estimate_tokens(self) -> float:
+        if not self.settled_requests:
+            return 0
+        return self.settled_tokens / self.settled_requests
+
+    def delay(self, estimated_tokens: float) -> float:
+        return max(
+            self.requests.delay(1) if self.requests else 0.0,
+            self.tokens.delay(estimated_tokens) if self.tokens else 0.0,
+        )
+
+    async def acquire(self) -> float:
+        """
+        Wait until a request can be sent, and answer
+        the amount of tokens that were reserved for it
+        """
+        async with self._lock:
+            estimated_tokens = self.estimate_tokens()
+            while (delay := self.delay(estimated_tokens)) > 0:
+                await asyncio.sleep(delay)
+            if self.requests:
+                self.requests.charge(1)
+            if self.tokens:
+                self.tokens.charge(estimated_tokens)
+            return estimated_tokens
+
+    def settle(self, estimated_tokens: float, actual_tokens: int):
+        self.settled_requests += 1
+        self.settled_tokens += actual_tokens
+        if self.tokens:
+            self.tokens.charge(actual_tokens - estimated_tokens)
+
+    def refund(self, estimated_tokens: float):
+        """
+        Give back the tokens reserved for a request that failed,
+        which doesn't count for the estimation of the next ones
+        """
+        if self.tokens:
+            self.tokens.charge(-estimated_tokens)
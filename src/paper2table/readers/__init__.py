@@ -0,0 +1,30 @@
+"""
+Registry of readers backends.
+
+Backends depend on heavy libraries - pandas, OpenCV, camelot,
+img2table, pydantic_ai - so they are only imported when
+they are actually used
+"""
+
+import importlib
+from types import ModuleType
+
+READERS = ["agent", "pdfplumber", "camelot", "img2table", "pymupdf", "fastgrid"]
+"""
+Names of the readers that can be selected with -r
+"""
+
+WRAPPERS = ["hybrid", "split_pages"]
+"""
+Names of the readers that wrap other readers
+"""
+
+
+def load_reader(name: str) -> ModuleType:
+    """
+    Import and answer the module of the given reader,
+    which exposes a read_tables function
+    """
+    if name not in READERS and name not in WRAPPERS:
+        raise ValueError(f"Reader {name} is not implemented yet")
+    return importlib.import_module(f"{__name__}.{name}")
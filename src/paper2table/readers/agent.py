@@ -1,13 +1,19 @@
-from pathlib import Path
+import functools
+from typing import Any, Optional
 
 from pydantic import create_model
 from pydantic_ai import Agent, BinaryContent
+from pydantic_ai.models import Model
 
 from utils.column_schema import ColumnSchema
 
+from ..cache import LLMCache
+from ..dispatcher import RunAgent, run_agent_sync
 from ..tables_reader import TablesReader
 from ..tables_reader.pydantic import TablesModelWrapper
 from .errors import ModelUnavailableError
+from .payload import PdfSlimmer, log_usage, read_payload
+from .sessions import AgentPool, default_agent_pool
 
 
 def build_table_model(schema: str):
@@ -29,6 +35,7 @@ def build_table_model(schema: str):
     return create_model("TableModel", table_fragments=(list[TableFragmentModel], ...))
 
 
+@functools.cache
 def build_tables_model(schema: str):
     return create_model(
         "TablesModel",
@@ -76,24 +83,57 @@ def is_model_unavailable(e: BaseException) -> bool:
     return "503" in error_text and ("unavailable" in error_text or "high demand" in error_text)
 
 
-def read_tables(path: str, model: str, schema: str) -> TablesReader:
-    paper_path = Path(path)
-    agent = Agent(
+def build_agent(model: Model, schema: str) -> Agent[Any, Any]:
+    return Agent(
         model,
         output_type=build_tables_model(schema),
         instructions=instructions,
     )
-    try:
-        output = agent.run_sync(
-            [
-                BinaryContent(data=paper_path.read_bytes(), media_type="application/pdf"),
-            ]
-        ).output
-    except BaseException as e:
-        cause = e
-        while cause.__cause__ is not None:
-            cause = cause.__cause__
-        if is_model_unavailable(cause) or is_model_unavailable(e):
-            raise ModelUnavailableError(str(e)) from e
-        raise
-    return TablesModelWrapper(output)
+
+
+def read_tables(
+    path: str,
+    model: str,
+    schema: str,
+    run_agent: RunAgent = run_agent_sync,
+    agents: AgentPool = default_agent_pool,
+    llm_cache: Optional[LLMCache] = None,
+    slimmer: Optional[PdfSlimmer] = None,
+) -> TablesReader:
+    """
+    Read the tables of the given paper with the model.
+
+    If an llm_cache is given, the model output is looked up
+    in it first, and recorded otherwise. If a slimmer is given,
+    the paper is slimmed before being sent
+    """
+    data = read_payload(path, slimmer)
+
+    def call_model():
+        agent = agents.agent(build_agent, model, schema)
+        try:
+            result = run_agent(
+                agent,
+                [
+                    BinaryContent(data=data, media_type="application/pdf"),
+                ],
+            )
+            log_usage(path, data, result)
+            return result.output
+        except BaseException as e:
+            cause = e
+            while cause.__cause__ is not None:
+                cause = cause.__cause__
+            if is_model_unavailable(cause) or is_model_unavailable(e):
+                raise ModelUnavailableError(str(e)) from e
+            raise
+
+    if llm_cache is None:
+        return TablesModelWrapper(call_model())
+
+    key = llm_cache.key(
+        data, model=model, schema=schema, instructions="\n".join(instructions)
+    )
+    return TablesModelWrapper(
+        llm_cache.output(key, build_tables_model(schema), call_model)
+    )
@@ -1,26 +1,126 @@
 import logging
+from concurrent.futures import Executor
+from itertools import groupby
+from typing import Literal, Optional
 
 import camelot
+import pymupdf
 
 from ..tables_reader.dataframe import DataFrameTableReader, DataFrameTablesReader
 from ..tables_reader import TablesReader
+from .document import DEFAULT_PAGES_PER_TASK
+from .layout import find_rulings
 
 _logger = logging.getLogger("pape2table")
 
+type Flavor = Literal["lattice", "stream", "hybrid"]
 
-def read_tables(pdf_path: str) -> TablesReader:
+
+def read_tables(
+    pdf_path: str,
+    page_executor: Optional[Executor] = None,
+    pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+    page_range: Optional[tuple[int, int]] = None,
+) -> TablesReader:
+    """
+    Read the tables of the given pdf, or only those
+    within the given 1-based inclusive page_range.
+
+    Each page is read with the flavor answered by choose_flavor.
+    If a page_executor is given, batches of pages_per_task pages
+    are read in parallel
+    """
     try:
-        camelot_tables = camelot.read_pdf(  # pyright: ignore[reportPrivateImportUsage]
-            pdf_path, suppress_stdout=True, flavor="hybrid", pages="all"
-        )
+        flavors = choose_flavors(pdf_path, page_range)
+        if page_executor is None:
+            tables = read_flavored_pages_tables(pdf_path, flavors)
+        else:
+            tables = read_tables_in_parallel(
+                pdf_path, flavors, page_executor, pages_per_task
+            )
     except Exception as e:
         _logger.warning(f"Error reading {pdf_path}: {e}")
         return DataFrameTablesReader(pdf_path, [])
 
+    return DataFrameTablesReader(pdf_path, tables)
+
+
+def choose_flavors(
+    pdf_path: str, page_range: Optional[tuple[int, int]] = None
+) -> list[tuple[int, Flavor]]:
+    """
+    Answers the 1-based number and flavor of each page to read
+    """
+    with pymupdf.open(pdf_path) as pdf:
+        first_page, last_page = page_range or (1, pdf.page_count)
+        return [
+            (number, choose_flavor(pdf[number - 1]))
+            for number in range(max(first_page, 1), min(last_page, pdf.page_count) + 1)
+        ]
+
+
+def choose_flavor(page: pymupdf.Page) -> Flavor:
+    """
+    Answers lattice for pages with both horizontal and vertical rulings,
+    stream for pages without rulings, and the more expensive
+    hybrid flavor for the rest - e.g. tables with only horizontal rules.
+
+    Lattice only reads the ruled cells, so text next to a ruled table,
+    like its caption, is not read as rows of the table as hybrid does
+    """
+    horizontal, vertical = find_rulings(page)
+    if len(horizontal) >= 2 and len(vertical) >= 2:
+        return "lattice"
+    if len(horizontal) == 0 and len(vertical) == 0:
+        return "stream"
+    return "hybrid"
+
+
+def read_tables_in_parallel(
+    pdf_path: str,
+    flavors: list[tuple[int, Flavor]],
+    executor: Executor,
+    pages_per_task: int,
+) -> list[DataFrameTableReader]:
+    futures = [
+        executor.submit(
+            read_flavored_pages_tables, pdf_path, flavors[i : i + pages_per_task]
+        )
+        for i in range(0, len(flavors), pages_per_task)
+    ]
+    return [table for future in futures for table in future.result()]
+
+
+def read_flavored_pages_tables(
+    pdf_path: str, flavors: list[tuple[int, Flavor]]
+) -> list[DataFrameTableReader]:
+    """
+    Read the given pages with a single camelot call per flavor,
+    answering their tables in page order
+    """
+    tables = []
+    by_flavor = sorted(flavors, key=flavor_of)
+    for flavor, pages in groupby(by_flavor, key=flavor_of):
+        numbers = ",".join(str(number) for number, _ in pages)
+        _logger.debug("Reading pages %s of %s as %s", numbers, pdf_path, flavor)
+        tables.extend(read_pages_tables(pdf_path, numbers, flavor))
+    return sorted(tables, key=lambda table: table.page)
+
+
+def flavor_of(page_flavor: tuple[int, Flavor]) -> Flavor:
+    return page_flavor[1]
+
+
+def read_pages_tables(
+    pdf_path: str, pages: str, flavor: Flavor = "hybrid"
+) -> list[DataFrameTableReader]:
+    camelot_tables = camelot.read_pdf(  # pyright: ignore[reportPrivateImportUsage]
+        pdf_path, suppress_stdout=True, flavor=flavor, pages=pages
+    )
+
     tables = []
     for table in camelot_tables:
         page_number = table.page or 0
         dataframe = table.df
         tables.append(DataFrameTableReader(page_number, dataframe))
-
-    return DataFrameTablesReader(pdf_path, tables)
+    return tables
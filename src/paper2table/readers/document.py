@@ -4,7 +4,18 @@ pdf document
 """
 
 import logging
-from typing import Callable, cast, Optional, Protocol, Generator
+import time
+from concurrent.futures import Executor
+from typing import (
+    Callable,
+    Container,
+    cast,
+    Optional,
+    Protocol,
+    Generator,
+    Iterator,
+    Sequence,
+)
 
 import pandas as pd
 
@@ -14,6 +25,7 @@ from ..hints import parse_column_names_hints
 from ..mapping import TableMapping, TablesMapping
 from ..tables_reader import TablesReader
 from ..tables_reader.dataframe import DataFrameTableReader, DataFrameTablesReader
+from .strategies import StrategyMemo
 
 
 class PDFTable(Protocol):
@@ -24,8 +36,13 @@ class PDFTable(Protocol):
 
 class PDFPage:
     def extract_tables_candidates(
-        self,
+        self, preferred: Sequence[str] = ()
     ) -> Generator[tuple[str, list[PDFTable]], None, None]:
+        """
+        Yield the tables extracted with each of the strategies
+        supported by this page, as (strategy, tables) pairs.
+        The preferred strategies are tried first
+        """
         yield ("default", self.extract_tables())
 
     def extract_tables(self) -> list[PDFTable]: ...
@@ -33,53 +50,160 @@ class PDFPage:
     @property
     def page_number(self) -> int: ...
 
+    def close(self):
+        """
+        Release the resources - e.g. parsed layout - held by this page
+        once it has been read. The page can still be read again afterwards
+        """
+
 
 class PDFDocument:
     """
-    A base class for pdf documents
+    A base class for pdf documents.
+
+    Pages are loaded on demand, so that
+    only the page being read is held in memory
     """
 
     @property
     def page_count(self) -> int: ...
 
     @property
-    def pages(self) -> list[PDFPage]: ...
+    def pages(self) -> Iterator[PDFPage]:
+        """
+        Iterate over the pages of this document, in order,
+        loading each of them when it is reached
+        """
+        for index in range(1, self.page_count + 1):
+            yield self.page_at(index)
 
     def page_at(self, index: int) -> PDFPage:
-        return self.pages[index - 1]
+        """
+        Answers the page with the given 1-based index,
+        raising IndexError if it is out of bounds
+        """
+        ...
+
+    def close(self):
+        """
+        Release the underlying pdf file
+        """
 
 
 _logger = logging.getLogger("pape2table")
 
+type Triage = Callable[[str], Optional[Container[int]]]
+"""
+A function that answers the numbers of the pages of a pdf
+worth reading, or None if all of them should be read
+"""
+
+
+DEFAULT_SCORE_THRESHOLD = 0.9
+"""
+Score from which a mapped table candidate is accepted
+without trying the remaining strategies
+"""
+
+DEFAULT_PAGE_TIME_BUDGET = 1.0
+"""
+Max seconds spent trying strategies on each page of a mapped table,
+so that pages whose candidates never reach the score threshold
+don't try every strategy
+"""
+
+DEFAULT_PAGES_PER_TASK = 8
+"""
+Number of pages read by each task when pages are read in parallel
+"""
+
 
 def read_tables(
     pdf_path: str,
     read_document: Callable[[str], PDFDocument],
     column_names_hints: Optional[str] = None,
     mapping: Optional[TablesMapping] = None,
+    score_threshold: float = DEFAULT_SCORE_THRESHOLD,
+    page_time_budget: Optional[float] = DEFAULT_PAGE_TIME_BUDGET,
+    triage: Optional[Triage] = None,
+    page_executor: Optional[Executor] = None,
+    pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+    raise_open_errors: bool = False,
 ) -> TablesReader:
+    """
+    Read the tables of the given pdf, either those described by mapping
+    or all of them.
+
+    Errors raised by read_document are logged and answered as an empty
+    result, unless raise_open_errors is True, in which case they are
+    raised, so that the paper is reported as failed.
+
+    When reading all the tables, only the pages selected by triage are read.
+    If a page_executor is given, they are read in parallel in batches of
+    pages_per_task pages, each of them opening the pdf on its own - so
+    read_document must be picklable when the executor uses processes
+    """
     try:
         document = read_document(pdf_path)
     except Exception as e:
+        if raise_open_errors:
+            raise
         _logger.warning(f"Error reading {pdf_path}: {e}")
         return DataFrameTablesReader(pdf_path, [])
 
-    if mapping:
-        tables = read_mapped_tables(pdf_path, mapping, document)
-    else:
-        tables = read_all_tables(pdf_path, column_names_hints, document)
+    try:
+        if mapping:
+            tables = read_mapped_tables(
+                pdf_path,
+                mapping,
+                document,
+                score_threshold=score_threshold,
+                page_time_budget=page_time_budget,
+            )
+        else:
+            pages = triage(pdf_path) if triage else None
+            page_numbers = [
+                number
+                for number in range(1, document.page_count + 1)
+                if pages is None or number in pages
+            ]
+            if page_executor is not None and len(page_numbers) > pages_per_task:
+                tables = read_all_tables_in_parallel(
+                    pdf_path,
+                    column_names_hints,
+                    read_document,
+                    page_numbers,
+                    page_executor,
+                    pages_per_task,
+                )
+            else:
+                tables = read_all_tables(pdf_path, column_names_hints, document, pages)
+    finally:
+        document.close()
 
     return DataFrameTablesReader(
         pdf_path, tables, citation=mapping.citation if mapping else None
     )
 
 
-def read_mapped_tables(pdf_path: str, mapping: TablesMapping, document: PDFDocument):
+def read_mapped_tables(
+    pdf_path: str,
+    mapping: TablesMapping,
+    document: PDFDocument,
+    score_threshold: float = DEFAULT_SCORE_THRESHOLD,
+    page_time_budget: Optional[float] = DEFAULT_PAGE_TIME_BUDGET,
+):
     """
-    Reads the tables described by schema
+    Reads the tables described by schema.
+
+    For each page, candidates of every extraction strategy are scored
+    until one reaches score_threshold or page_time_budget seconds are
+    spent, and the best scored candidate is read
     """
+    memo = mapping.strategy_memo or StrategyMemo()
     tables = []
-    for table_mapping in mapping.tables:
+    for table_index, table_mapping in enumerate(mapping.tables):
+        table_key = str(table_index)
         for page_number in range(table_mapping.first_page, table_mapping.last_page + 1):
             try:
                 page = document.page_at(page_number)
@@ -89,51 +213,143 @@ def read_mapped_tables(pdf_path: str, mapping: TablesMapping, document: PDFDocum
                 )
                 break
 
-            candidates = page.extract_tables_candidates()
-            last_error: Exception | None = None
-            strategy: str | None = None
-            for strategy, extracted_tables in candidates:
-                try:
-                    dataframe = read_page_as_dataframe(
-                        extracted_tables, table_mapping, page_number
-                    )
-                    tables.append(
-                        DataFrameTableReader(
-                            title=table_mapping.title,
-                            page=page_number,
-                            dataframe=dataframe,
-                        )
-                    )
-                    last_error = None
-                    break
-                except Exception as e:
-                    _logger.debug(
-                        "Strategy %s failed when reading page %i", strategy, page_number
+            try:
+                dataframe = read_mapped_page(
+                    pdf_path,
+                    page,
+                    table_key,
+                    table_mapping,
+                    memo,
+                    score_threshold=score_threshold,
+                    page_time_budget=page_time_budget,
+                )
+            finally:
+                page.close()
+
+            if dataframe is not None:
+                tables.append(
+                    DataFrameTableReader(
+                        title=table_mapping.title,
+                        page=page_number,
+                        dataframe=dataframe,
                     )
-                    last_error = e
-
-            if last_error:
-                _logger.warning(
-                    f"Couldn't read page {page_number} of {pdf_path}"
-                    f" with strategy {strategy}: {last_error}"
                 )
 
         break
 
+    _logger.debug("Strategies of %s: %s", pdf_path, memo.to_dict()["stats"])
     return tables
 
 
+def read_mapped_page(
+    pdf_path: str,
+    page: PDFPage,
+    table_key: str,
+    table_mapping: TableMapping,
+    memo: StrategyMemo,
+    score_threshold: float = DEFAULT_SCORE_THRESHOLD,
+    page_time_budget: Optional[float] = DEFAULT_PAGE_TIME_BUDGET,
+) -> Optional[pd.DataFrame]:
+    """
+    Reads the given page of a mapped table, answering the best scored
+    candidate, or None if no strategy could read it
+    """
+    page_number = page.page_number
+    candidates = page.extract_tables_candidates(memo.preferred(table_key))
+    last_error: Exception | None = None
+    strategy: str | None = None
+    best: tuple[float, str, pd.DataFrame] | None = None
+    page_start = start = time.perf_counter()
+    for strategy, extracted_tables in candidates:
+        try:
+            extracted, dataframe = read_page_as_dataframe(
+                extracted_tables, table_mapping, page_number
+            )
+            score = score_table(extracted, dataframe, table_mapping)
+            _logger.debug(
+                "Strategy %s scored %.2f when reading page %i",
+                strategy,
+                score,
+                page_number,
+            )
+            if best is None or score > best[0]:
+                best = (score, strategy, dataframe)
+            memo.record(table_key, strategy, True, time.perf_counter() - start)
+        except Exception as e:
+            _logger.debug("Strategy %s failed when reading page %i", strategy, page_number)
+            last_error = e
+            memo.record(table_key, strategy, False, time.perf_counter() - start)
+
+        # the budget is checked before extracting the next candidate,
+        # no matter whether this one could be read or not
+        start = time.perf_counter()
+        if (best is not None and best[0] >= score_threshold) or (
+            page_time_budget is not None and start - page_start >= page_time_budget
+        ):
+            break
+
+    if best is not None:
+        score, winner, dataframe = best
+        memo.choose(table_key, winner)
+        return dataframe
+
+    if last_error:
+        _logger.warning(
+            f"Couldn't read page {page_number} of {pdf_path}"
+            f" with strategy {strategy}: {last_error}"
+        )
+    return None
+
+
+def score_table(
+    extracted: pd.DataFrame, dataframe: pd.DataFrame, table_mapping: TableMapping
+) -> float:
+    """
+    Cheaply score how well a mapped table was read, from 0 to 1, given
+    both the extracted dataframe and its mapped version, considering:
+
+    * columns: whether the extracted table has all the columns the mapping
+      needs - extra columns are not penalized, since tables usually have
+      more columns than those mapped;
+    * fill ratio: the proportion of non-empty mapped cells;
+    * rows: tables with more rows are more likely to be actual tables
+    """
+    needed_columns = 1 + max(
+        (mapping.from_column_number for mapping in table_mapping.column_mappings),
+        default=0,
+    )
+    extracted_columns = len(extracted.columns)
+    columns_score = min(extracted_columns, needed_columns) / needed_columns
+
+    if dataframe.size:
+        values = dataframe.to_numpy().ravel()
+        filled = sum(1 for value in values if not pd.isna(value) and str(value).strip())
+        fill_score = filled / len(values)
+    else:
+        fill_score = 0.0
+
+    rows = len(dataframe)
+    rows_score = rows / (rows + 1)
+
+    return 0.4 * columns_score + 0.4 * fill_score + 0.2 * rows_score
+
+
 def read_page_as_dataframe(
     extracted_tables: list[PDFTable], table_mapping: TableMapping, page_number: int
-):
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Read the last table extracted from a page, answering both
+    the extracted dataframe and its mapped version
+    """
     if not extracted_tables:
         raise ValueError("No tables were extracted")
 
-    return read_table(
+    extracted = extract_dataframe(
         table_fragment=extracted_tables[-1],
         table_mapping=table_mapping,
         page=page_number,
     )
+    return extracted, map_dataframe(extracted, table_mapping)
 
 
 def read_table(
@@ -141,6 +357,18 @@ def read_table(
     column_names_hints: Optional[list[str]] = None,
     table_mapping: Optional[TableMapping] = None,
     page: Optional[int] = None,
+) -> pd.DataFrame:
+    return map_dataframe(
+        extract_dataframe(table_fragment, column_names_hints, table_mapping, page),
+        table_mapping,
+    )
+
+
+def extract_dataframe(
+    table_fragment: PDFTable,
+    column_names_hints: Optional[list[str]] = None,
+    table_mapping: Optional[TableMapping] = None,
+    page: Optional[int] = None,
 ) -> pd.DataFrame:
     if column_names_hints is None:
         column_names_hints = []
@@ -152,10 +380,12 @@ def read_table(
         )
     )
 
-    dataframe: pd.DataFrame = table_fragment.to_dataframe(
-        column_names_hints, skip_first_row
-    )
+    return table_fragment.to_dataframe(column_names_hints, skip_first_row)
+
 
+def map_dataframe(
+    dataframe: pd.DataFrame, table_mapping: Optional[TableMapping] = None
+) -> pd.DataFrame:
     def index_renamer(column):
         return int(dataframe.columns.get_loc(column))  # pyright: ignore[reportArgumentType]
 
@@ -175,7 +405,9 @@ def read_table(
             selected_column_names
         ].rename(columns=renamer)
 
-    dataframe.rename(columns=lambda column: normalize_column_name(str(column)), inplace=True)
+    dataframe = dataframe.rename(
+        columns=lambda column: normalize_column_name(str(column))
+    )
     dataframe = cast(pd.DataFrame, dataframe.apply(
         lambda row: list(
             map(lambda v: v.replace("\n", " ") if isinstance(v, str) else v, row)
@@ -185,14 +417,64 @@ def read_table(
     return dataframe
 
 
+def read_all_tables_in_parallel(
+    pdf_path: str,
+    column_names_hints: Optional[str],
+    read_document: Callable[[str], PDFDocument],
+    page_numbers: list[int],
+    executor: Executor,
+    pages_per_task: int,
+) -> list[DataFrameTableReader]:
+    """
+    Read the tables of the given pages, submitting batches of consecutive
+    pages to executor, and answer them in page order
+    """
+    futures = [
+        executor.submit(
+            read_pages_tables,
+            pdf_path,
+            column_names_hints,
+            read_document,
+            page_numbers[start : start + pages_per_task],
+        )
+        for start in range(0, len(page_numbers), pages_per_task)
+    ]
+    return [table for future in futures for table in future.result()]
+
+
+def read_pages_tables(
+    pdf_path: str,
+    column_names_hints: Optional[str],
+    read_document: Callable[[str], PDFDocument],
+    page_numbers: list[int],
+) -> list[DataFrameTableReader]:
+    document = read_document(pdf_path)
+    try:
+        return read_all_tables(pdf_path, column_names_hints, document, set(page_numbers))
+    finally:
+        document.close()
+
+
 def read_all_tables(
-    pdf_path: str, column_names_hints: Optional[str], document: PDFDocument
+    pdf_path: str,
+    column_names_hints: Optional[str],
+    document: PDFDocument,
+    pages: Optional[Container[int]] = None,
 ):
     tables = []
     parsed_hints = (
         parse_column_names_hints(column_names_hints) if column_names_hints else []
     )
-    for page in document.pages:
+    if pages is None:
+        selected_pages = document.pages
+    else:
+        selected_pages = (
+            document.page_at(number)
+            for number in range(1, document.page_count + 1)
+            if number in pages
+        )
+
+    for page in selected_pages:
         try:
             table_fragments = page.extract_tables()
             for table_fragment in table_fragments:
@@ -203,4 +485,6 @@ def read_all_tables(
                 tables.append(DataFrameTableReader(page.page_number, dataframe))
         except Exception as e:
             _logger.warning(f"Error reading page {page.page_number} of {pdf_path}: {e}")
+        finally:
+            page.close()
     return tables
@@ -0,0 +1,352 @@
+"""
+A fast reader for simple born-digital tables.
+
+Instead of finding tables through the chars and edges of a page,
+it works on arrays of word boxes and ruling lines, as answered by pymupdf:
+
+ 1. words are grouped in text rows by their vertical centers;
+ 2. rows split in two or more segments by wide gaps are tabular,
+    and runs of tabular rows are tables;
+ 3. columns of each table are found with one of several strategies:
+    vertical ruling lines (lines), gaps in the horizontal coverage
+    of its words (gaps) or 1-D k-means on the centers of its segments (kmeans);
+ 4. words are assigned to cells by their centers
+"""
+
+import logging
+from concurrent.futures import Executor
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pymupdf
+
+from ..mapping import TablesMapping
+from ..tables_reader import TablesReader
+from . import document
+from .document import PDFDocument, PDFPage
+from .layout import MIN_COLUMN_GAP, find_rulings, gap_breaks
+from .strategies import prefer
+from .utils import Row, first_row_is_table_header
+
+_logger = logging.getLogger("pape2table")
+
+STRATEGIES = ["gaps", "lines", "kmeans"]
+
+_MIN_TABLE_ROWS = 3
+_MAX_SEGMENT_WIDTH = 0.35
+"""
+Max width of the segments of a tabular row, relative to the width of
+the text of the page: longer segments are usually columns of prose
+"""
+
+
+class FastGridTable:
+    rows: list[Row]
+
+    def __init__(self, rows: list[Row]):
+        self.rows = rows
+
+    def to_dataframe(
+        self, column_names_hints: list[str], skip_first_row: bool
+    ) -> pd.DataFrame:
+        if skip_first_row or first_row_is_table_header(self.rows, column_names_hints):
+            return pd.DataFrame(self.rows[1:], columns=self.rows[0])  # pyright: ignore[reportArgumentType]
+        return pd.DataFrame(self.rows)
+
+
+class PageGrid:
+    """
+    The words, text rows and ruling lines of a page,
+    and the regions of rows that look like tables
+    """
+
+    def __init__(self, page: pymupdf.Page):
+        words = page.get_text("words", sort=True)
+        self.texts: list[str] = [word[4] for word in words]
+        self.boxes = np.array([word[:4] for word in words], dtype=np.float64).reshape(
+            -1, 4
+        )
+        self.horizontal_rulings, self.vertical_rulings = find_rulings(page)
+        self.rows = group_rows(self.boxes)
+        self.regions = find_regions(self.boxes, self.rows)
+
+    def extract_tables(self, strategy: str) -> list[FastGridTable]:
+        tables = []
+        for region in self.regions:
+            rows = [self.rows[index] for index in region]
+            words = np.concatenate(rows)
+            boundaries = self.column_boundaries(strategy, rows, words)
+            if boundaries is None:
+                continue
+            tables.append(FastGridTable(self.read_cells(rows, words, boundaries, strategy)))
+        return tables
+
+    def column_boundaries(
+        self, strategy: str, rows: list[np.ndarray], words: np.ndarray
+    ) -> Optional[np.ndarray]:
+        boxes = self.boxes[words]
+        left, right = boxes[:, 0].min(), boxes[:, 2].max()
+        if strategy == "lines":
+            top, bottom = boxes[:, 1].min(), boxes[:, 3].max()
+            boundaries = ruling_boundaries(
+                self.vertical_rulings, left, right, top, bottom
+            )
+        elif strategy == "gaps":
+            boundaries = gap_boundaries(boxes, left, right)
+        elif strategy == "kmeans":
+            boundaries = kmeans_boundaries(self.boxes, rows)
+        else:
+            raise ValueError(f"Unknown strategy {strategy}")
+
+        return boundaries if len(boundaries) else None
+
+    def read_cells(
+        self,
+        rows: list[np.ndarray],
+        words: np.ndarray,
+        boundaries: np.ndarray,
+        strategy: str,
+    ) -> list[Row]:
+        boxes = self.boxes[words]
+        centers_y = (boxes[:, 1] + boxes[:, 3]) / 2
+        if strategy == "lines":
+            row_boundaries = ruling_boundaries(
+                self.horizontal_rulings,
+                boxes[:, 1].min(),
+                boxes[:, 3].max(),
+                boxes[:, 0].min(),
+                boxes[:, 2].max(),
+            )
+        else:
+            row_boundaries = np.array([])
+
+        if len(row_boundaries):
+            row_indexes = np.searchsorted(row_boundaries, centers_y)
+        else:
+            row_indexes = np.concatenate(
+                [np.full(len(row), index) for index, row in enumerate(rows)]
+            )
+        column_indexes = np.searchsorted(boundaries, (boxes[:, 0] + boxes[:, 2]) / 2)
+
+        cells: dict[tuple[int, int], list[int]] = {}
+        for word, row_index, column_index in zip(words, row_indexes, column_indexes):
+            cells.setdefault((int(row_index), int(column_index)), []).append(int(word))
+
+        columns_count = len(boundaries) + 1
+        return [
+            [
+                self.cell_text(cells.get((row_index, column_index), []))
+                for column_index in range(columns_count)
+            ]
+            for row_index in sorted({row_index for row_index, _ in cells})
+        ]
+
+    def cell_text(self, words: list[int]) -> str:
+        lines: list[list[int]] = []
+        for word in words:
+            if lines and abs(self.boxes[word, 1] - self.boxes[lines[-1][-1], 1]) < 1:
+                lines[-1].append(word)
+            else:
+                lines.append([word])
+        return "\n".join(
+            " ".join(self.texts[word] for word in line) for line in lines
+        )
+
+
+def group_rows(boxes: np.ndarray) -> list[np.ndarray]:
+    """
+    Group words in text rows, answering the indexes of the words of each row,
+    sorted from top to bottom, and each of them from left to right
+    """
+    if not len(boxes):
+        return []
+    centers = (boxes[:, 1] + boxes[:, 3]) / 2
+    order = np.argsort(centers, kind="stable")
+    tolerance = np.median(boxes[:, 3] - boxes[:, 1]) / 2
+    breaks = np.flatnonzero(np.diff(centers[order]) > tolerance) + 1
+    return [
+        row[np.argsort(boxes[row, 0], kind="stable")]
+        for row in np.split(order, breaks)
+    ]
+
+
+def row_segments(boxes: np.ndarray, row: np.ndarray) -> list[np.ndarray]:
+    """
+    Split a row in runs of words separated by wide gaps
+    """
+    return np.split(row, gap_breaks(boxes[row, 0], boxes[row, 2]))
+
+
+def find_regions(boxes: np.ndarray, rows: list[np.ndarray]) -> list[list[int]]:
+    """
+    Answers the runs of consecutive tabular rows, as lists of row indexes
+    """
+    if not rows:
+        return []
+    text_width = boxes[:, 2].max() - boxes[:, 0].min()
+    tops = np.array([boxes[row, 1].min() for row in rows])
+    pitch = np.median(np.diff(tops)) if len(rows) > 1 else 0
+
+    regions: list[list[int]] = []
+    current: list[int] = []
+    for index, row in enumerate(rows):
+        segments = row_segments(boxes, row)
+        widths = [boxes[segment, 2].max() - boxes[segment, 0].min() for segment in segments]
+        tabular = len(segments) >= 2 and max(widths) < _MAX_SEGMENT_WIDTH * text_width
+        contiguous = bool(current) and tops[index] - tops[current[-1]] <= 2.5 * pitch
+        if tabular and contiguous:
+            current.append(index)
+        else:
+            if len(current) >= _MIN_TABLE_ROWS:
+                regions.append(current)
+            current = [index] if tabular else []
+    if len(current) >= _MIN_TABLE_ROWS:
+        regions.append(current)
+    return regions
+
+
+def ruling_boundaries(
+    rulings: np.ndarray, start: float, end: float, span_start: float, span_end: float
+) -> np.ndarray:
+    """
+    Answers the positions of the rulings strictly between start and end
+    that overlap the [span_start, span_end] range, merging those closer
+    than 2 points
+    """
+    if not len(rulings):
+        return np.array([])
+    positions = rulings[
+        (rulings[:, 0] > start)
+        & (rulings[:, 0] < end)
+        & (rulings[:, 1] < span_end)
+        & (rulings[:, 2] > span_start),
+        0,
+    ]
+    positions = np.sort(positions)
+    if not len(positions):
+        return positions
+    return positions[np.concatenate([[True], np.diff(positions) >= 2])]
+
+
+def gap_boundaries(boxes: np.ndarray, left: float, right: float) -> np.ndarray:
+    """
+    Answers the middle of the vertical strips, at least MIN_COLUMN_GAP
+    points wide, that no word of the table covers
+    """
+    bins = int(np.ceil(right - left)) + 1
+    coverage = np.zeros(bins + 1, dtype=np.int64)
+    np.add.at(coverage, np.floor(boxes[:, 0] - left).astype(int), 1)
+    np.add.at(coverage, np.ceil(boxes[:, 2] - left).astype(int), -1)
+    uncovered = np.cumsum(coverage)[:bins] == 0
+
+    changes = np.flatnonzero(np.diff(np.concatenate([[0], uncovered, [0]]).astype(np.int8)))
+    starts, ends = changes[0::2], changes[1::2]
+    wide = ends - starts >= MIN_COLUMN_GAP
+    return left + (starts[wide] + ends[wide]) / 2
+
+
+def kmeans_boundaries(
+    boxes: np.ndarray, rows: list[np.ndarray], iterations: int = 20
+) -> np.ndarray:
+    """
+    Cluster the horizontal centers of the segments of the table in as many
+    columns as the most common number of segments per row, answering
+    the middle points between consecutive centroids
+    """
+    segments = [segment for row in rows for segment in row_segments(boxes, row)]
+    counts = np.bincount([len(row_segments(boxes, row)) for row in rows])
+    k = int(np.argmax(counts))
+    if k < 2:
+        return np.array([])
+
+    centers = np.array(
+        [(boxes[segment, 0].min() + boxes[segment, 2].max()) / 2 for segment in segments]
+    )
+    centroids = np.quantile(centers, (np.arange(k) + 0.5) / k)
+    for _ in range(iterations):
+        labels = np.argmin(np.abs(centers[:, None] - centroids[None, :]), axis=1)
+        updated = np.array(
+            [
+                centers[labels == label].mean() if np.any(labels == label) else centroid
+                for label, centroid in enumerate(centroids)
+            ]
+        )
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+
+    centroids = np.sort(centroids)
+    return (centroids[1:] + centroids[:-1]) / 2
+
+
+class FastGridPage(PDFPage):
+    def __init__(self, page: pymupdf.Page):
+        self.page = page
+        self._grid: Optional[PageGrid] = None
+
+    @property
+    def grid(self) -> PageGrid:
+        if self._grid is None:
+            self._grid = PageGrid(self.page)
+        return self._grid
+
+    def extract_tables_candidates(self, preferred: Sequence[str] = ()):
+        for strategy in prefer(STRATEGIES, list(preferred)):
+            yield (strategy, self.grid.extract_tables(strategy))
+
+    def extract_tables(self) -> list[FastGridTable]:
+        return self.grid.extract_tables("gaps")
+
+    @property
+    def page_number(self) -> int:
+        return (self.page.number or 0) + 1
+
+    def close(self):
+        self._grid = None
+
+
+class FastGridDocument(PDFDocument):
+    _document: pymupdf.Document
+
+    def __init__(self, document: pymupdf.Document):
+        self._document = document
+
+    @property
+    def page_count(self) -> int:
+        return self._document.page_count
+
+    def page_at(self, index: int) -> FastGridPage:
+        if not 1 <= index <= self.page_count:
+            raise IndexError(f"Page {index} is out of bounds")
+        return FastGridPage(self._document.load_page(index - 1))
+
+    def close(self):
+        self._document.close()
+
+
+def open_document(pdf_path: str) -> FastGridDocument:
+    return FastGridDocument(pymupdf.open(pdf_path))
+
+
+def read_tables(
+    pdf_path: str,
+    column_names_hints: Optional[str] = None,
+    mapping: Optional[TablesMapping] = None,
+    score_threshold: float = document.DEFAULT_SCORE_THRESHOLD,
+    page_time_budget: Optional[float] = document.DEFAULT_PAGE_TIME_BUDGET,
+    triage: Optional[document.Triage] = None,
+    page_executor: Optional[Executor] = None,
+) -> TablesReader:
+    return document.read_tables(
+        pdf_path,
+        column_names_hints=column_names_hints,
+        mapping=mapping,
+        score_threshold=score_threshold,
+        page_time_budget=page_time_budget,
+        triage=triage,
+        page_executor=page_executor,
+        read_document=open_document,
+        # unreadable papers must be reported as failed, not as empty
+        raise_open_errors=True,
+    )
@@ -1,18 +1,26 @@
+import functools
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable, Optional, cast
 
 from pydantic_ai import Agent, BinaryContent
+from pydantic_ai.models import Model
 
 from utils.column_schema import ColumnSchema
 
+from ..cache import LLMCache
+from ..dispatcher import RunAgent, run_agent_sync
 from ..mapping import TablesMapping, TablesMappingMetadata
 from ..tables_reader import TablesReader
+from .payload import PdfSlimmer, log_usage, read_payload
+from .sessions import AgentPool, default_agent_pool
+from .strategies import StrategyMemo
 
 _logger = logging.getLogger("pape2table")
 
 
+@functools.cache
 def build_instructions(schema):
     parsed_schema = ColumnSchema.parse(schema)
     column_listing = ", ".join(
@@ -65,6 +73,14 @@ def build_instructions(schema):
     )
 
 
+def build_agent(model: Model, schema: str) -> Agent[Any, Any]:
+    return Agent(
+        model,
+        output_type=TablesMapping,
+        instructions=build_instructions(schema),
+    )
+
+
 def read_tables(
     path: str,
     model: str,
@@ -72,9 +88,29 @@ def read_tables(
     mappings_path: Path,
     reader: Callable[[str, TablesMapping], TablesReader],
     force_mapping_generation: bool = False,
+    run_agent: RunAgent = run_agent_sync,
+    persist_strategies: bool = False,
+    agents: AgentPool = default_agent_pool,
+    llm_cache: Optional[LLMCache] = None,
+    slimmer: Optional[PdfSlimmer] = None,
 ) -> TablesReader:
+    """
+    Read the tables of a paper using a mapping generated by the model.
+    Mappings are stored in mappings_path and reused in later calls.
+
+    If an llm_cache is given, mappings are looked up in it before
+    calling the model, and recorded otherwise. If a slimmer is given,
+    the paper is slimmed before being sent.
+
+    When persist_strategies is True, the extraction strategies that
+    succeeded for each table are also stored next to the mapping,
+    so that later calls try them first
+    """
     paper_path = Path(path)
     mapping_path = mappings_path / paper_path.name.replace(".pdf", ".mapping.json")
+    strategies_path = mappings_path / paper_path.name.replace(
+        ".pdf", ".strategies.json"
+    )
     if mapping_path.exists() and not force_mapping_generation:
         _logger.debug("Using existing mapping for %s", paper_path)
         mapping = TablesMapping.model_validate_json(
@@ -87,22 +123,45 @@ def read_tables(
             _logger.debug(
                 "Mapping for %s doesn't exist. Generating it with model", paper_path
             )
-        agent = Agent(
-            model,
-            output_type=TablesMapping,
-            instructions=build_instructions(schema),
-        )
-        mapping = agent.run_sync(
-            [
-                BinaryContent(
-                    data=paper_path.read_bytes(), media_type="application/pdf"
-                ),
-            ]
-        ).output
+        data = read_payload(path, slimmer)
+
+        def call_model():
+            agent = agents.agent(build_agent, model, schema)
+            result = run_agent(
+                agent,
+                [
+                    BinaryContent(data=data, media_type="application/pdf"),
+                ],
+            )
+            log_usage(path, data, result)
+            return result.output
+
+        if llm_cache is None:
+            mapping = call_model()
+        else:
+            key = llm_cache.key(
+                data,
+                model=model,
+                schema=schema,
+                instructions="\n".join(build_instructions(schema)),
+            )
+            mapping = cast(
+                TablesMapping, llm_cache.output(key, TablesMapping, call_model)
+            )
         mapping.metadata = TablesMappingMetadata(
             model=model,
             date=datetime.now(timezone.utc).isoformat(),
         )
         mappings_path.mkdir(parents=True, exist_ok=True)
         mapping_path.write_text(mapping.model_dump_json(), encoding="utf-8")
-    return reader(path, mapping)
+        # strategies of a previous mapping don't apply to the new one
+        strategies_path.unlink(missing_ok=True)
+
+    if not persist_strategies:
+        return reader(path, mapping)
+
+    mapping.strategy_memo = StrategyMemo.load(strategies_path)
+    result = reader(path, mapping)
+    mappings_path.mkdir(parents=True, exist_ok=True)
+    mapping.strategy_memo.save(strategies_path)
+    return result
@@ -1,11 +1,18 @@
 import logging
-from typing import Optional
+from typing import Optional, cast
 
+import cv2
+import numpy as np
 import pandas as pd
+import pymupdf
+import pypdfium2
 from img2table.document import PDF
+from img2table.document.base.rotation import fix_rotation_image  # pyright: ignore[reportMissingImports]
 from img2table.ocr import TesseractOCR
+from img2table.ocr.base import OCRInstance
 from img2table.tables.objects.extraction import ExtractedTable  # pyright: ignore[reportMissingImports]
 
+from paper2table.cache import OCRCache, bytes_digest
 from paper2table.mapping import TablesMapping
 from paper2table.readers import document
 from paper2table.readers.document import PDFDocument, PDFPage
@@ -14,6 +21,21 @@ from paper2table.tables_reader import TablesReader
 
 _logger = logging.getLogger("pape2table")
 
+_MIN_TEXT_LAYER_CHARS = 20
+
+TEXT_LAYER_DPI = 200
+"""
+Resolution of the images of pages with a text layer, which must match
+the one img2table uses for placing the text layer over them
+"""
+
+DEFAULT_OCR_DPI = 200
+
+DEFAULT_PAGES_PER_WINDOW = 8
+"""
+Number of pages rasterized and read at once
+"""
+
 
 class Img2TableTable:
     def __init__(self, table: ExtractedTable):
@@ -41,46 +63,237 @@ class Img2TablePage(PDFPage):
 
     @property
     def page_number(self) -> int:
-        return self.index  # pyright: ignore[reportAttributeAccessIssue]
+        return self.page + 1
 
 
 class Img2TableDocument(PDFDocument):
+    """
+    A document whose pages are rasterized and read in windows of
+    pages_per_window consecutive pages, when they are first reached.
+    Only the tables of the current window are held in memory, so that
+    memory doesn't grow with the length of the document
+    """
+
     tables: dict[int, list[ExtractedTable]]
+    """
+    The tables extracted from each page of the current window,
+    by 0-based page index
+    """
 
-    def __init__(self, tables: dict[int, list[ExtractedTable]]):
-        self.tables = tables
+    def __init__(
+        self,
+        pdf_path: str,
+        ocr_threads: int = 1,
+        ocr_lang: str = "eng",
+        ocr_cache: Optional[OCRCache] = None,
+        dpi: int = DEFAULT_OCR_DPI,
+        grayscale: bool = False,
+        pages_per_window: int = DEFAULT_PAGES_PER_WINDOW,
+    ):
+        self.pdf_path = pdf_path
+        self.ocr_threads = ocr_threads
+        self.ocr_lang = ocr_lang
+        self.ocr_cache = ocr_cache
+        self.dpi = dpi
+        self.grayscale = grayscale
+        self.pages_per_window = max(pages_per_window, 1)
+        self.ocr: Optional[TesseractOCR] = None
+        self.window = range(0)
+        self.tables = {}
+
+        text_pages, scanned_pages = split_scanned_pages(pdf_path)
+        self.scanned_pages = set(scanned_pages)
+        self._page_count = len(text_pages) + len(scanned_pages)
 
     @property
     def page_count(self) -> int:
-        return len(self.tables)
+        return self._page_count
 
-    @property
-    def pages(self) -> list[Img2TablePage]:
-        return [Img2TablePage(page, tables) for page, tables in self.tables.items()]
+    def page_at(self, index: int) -> Img2TablePage:
+        if not 1 <= index <= self.page_count:
+            raise IndexError(f"Page {index} is out of bounds")
+        if index - 1 not in self.window:
+            # release the previous window before rendering the next one
+            self.tables = {}
+            self.window = range(
+                index - 1, min(index - 1 + self.pages_per_window, self.page_count)
+            )
+            self.tables = self.extract_window(self.window)
+        return Img2TablePage(index - 1, self.tables.get(index - 1, []))
+
+    def extract_window(self, window: range) -> dict[int, list[ExtractedTable]]:
+        """
+        Extract the tables of the given pages. The contents of pages with
+        a text layer are read from it, and Tesseract only runs on scanned pages
+        """
+        text_pages = [index for index in window if index not in self.scanned_pages]
+        scanned_pages = [index for index in window if index in self.scanned_pages]
+
+        extracted = {}
+        if text_pages:
+            # rendering keeps born-digital pages straight, so their text
+            # layer always matches their image
+            images = render_pages(
+                self.pdf_path, text_pages, TEXT_LAYER_DPI, self.grayscale
+            )
+            pdf = PDF(
+                self.pdf_path,
+                pages=text_pages,
+                pdf_text_extraction=True,
+                _images=images,
+            )
+            extracted.update(extract_tables(pdf, ocr=None))
+        if scanned_pages:
+            _logger.debug(
+                "Pages %s of %s have no text layer",
+                [index + 1 for index in scanned_pages],
+                self.pdf_path,
+            )
+            images = [
+                fix_rotation_image(img=image)[0]
+                for image in render_pages(
+                    self.pdf_path, scanned_pages, self.dpi, self.grayscale
+                )
+            ]
+            pdf = PDF(
+                self.pdf_path,
+                pages=scanned_pages,
+                pdf_text_extraction=False,
+                _images=images,
+            )
+            extracted.update(extract_tables(pdf, ocr=self.get_ocr()))
+        return extracted
+
+    def get_ocr(self) -> TesseractOCR:
+        if self.ocr is None:
+            self.ocr = CachedTesseractOCR(
+                cache=self.ocr_cache, n_threads=self.ocr_threads, lang=self.ocr_lang
+            )
+        return self.ocr
+
+    def close(self):
+        self.window = range(0)
+        self.tables = {}
 
 
 def read_tables(
     pdf_path: str,
     column_names_hints: Optional[str] = None,
     mapping: Optional[TablesMapping] = None,
+    score_threshold: float = document.DEFAULT_SCORE_THRESHOLD,
+    page_time_budget: Optional[float] = document.DEFAULT_PAGE_TIME_BUDGET,
+    triage: Optional[document.Triage] = None,
+    ocr_threads: int = 1,
+    ocr_lang: str = "eng",
+    ocr_cache: Optional[OCRCache] = None,
+    dpi: int = DEFAULT_OCR_DPI,
+    grayscale: bool = False,
+    pages_per_window: int = DEFAULT_PAGES_PER_WINDOW,
 ) -> TablesReader:
+    """
+    Read the tables of the given pdf, rasterizing pages_per_window
+    pages at a time. Scanned pages are rendered at the given dpi,
+    and all pages are rendered in grayscale if requested
+    """
 
     return document.read_tables(
         pdf_path,
         column_names_hints=column_names_hints,
         mapping=mapping,
-        read_document=lambda pdf_path: Img2TableDocument(open_pdf(pdf_path)),
+        score_threshold=score_threshold,
+        page_time_budget=page_time_budget,
+        triage=triage,
+        read_document=lambda pdf_path: Img2TableDocument(
+            pdf_path,
+            ocr_threads=ocr_threads,
+            ocr_lang=ocr_lang,
+            ocr_cache=ocr_cache,
+            dpi=dpi,
+            grayscale=grayscale,
+            pages_per_window=pages_per_window,
+        ),
     )
 
 
-def open_pdf(pdf_path: str):
-    ocr = TesseractOCR(n_threads=1, lang="eng")
-    pdf = PDF(pdf_path, detect_rotation=True, pdf_text_extraction=True)
-    extracted = pdf.extract_tables(
-        ocr=ocr,
+class CachedTesseractOCR(TesseractOCR):
+    """
+    A TesseractOCR that looks up the hOCR of each
+    rendered page image in an OCRCache first
+    """
+
+    def __init__(self, cache: Optional[OCRCache] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def hocr(self, image: np.ndarray) -> str:
+        if self.cache is None:
+            return super().hocr(image)
+
+        key = self.cache.key(
+            bytes_digest(image.tobytes()),
+            shape=list(image.shape),
+            lang=self.lang,
+            psm=self.psm,
+        )
+        cached = self.cache.get_bytes(key)
+        if cached is not None:
+            return cached.decode("utf-8")
+
+        hocr = super().hocr(image)
+        self.cache.put_bytes(key, hocr.encode("utf-8"))
+        return hocr
+
+
+def has_text_layer(page: pymupdf.Page) -> bool:
+    return len(cast(str, page.get_text("text")).strip()) >= _MIN_TEXT_LAYER_CHARS
+
+
+def split_scanned_pages(pdf_path: str) -> tuple[list[int], list[int]]:
+    """
+    Answers the 0-based indices of the pages with a usable
+    text layer, and those of the scanned pages
+    """
+    with pymupdf.open(pdf_path) as pdf:
+        text_pages = [
+            index for index in range(pdf.page_count) if has_text_layer(pdf[index])
+        ]
+        return text_pages, [
+            index for index in range(pdf.page_count) if index not in text_pages
+        ]
+
+
+def render_pages(
+    pdf_path: str, indices: list[int], dpi: int, grayscale: bool
+) -> list[np.ndarray]:
+    """
+    Render the pages with the given 0-based indices as RGB images,
+    as expected by img2table
+    """
+    pdf = pypdfium2.PdfDocument(pdf_path)
+    try:
+        images = []
+        for index in indices:
+            page = pdf[index]
+            # scale is inferred as int from its default, but any float works
+            scale = cast(int, dpi / 72)
+            bitmap = page.render(scale=scale, grayscale=grayscale).to_numpy()
+            images.append(
+                cv2.cvtColor(
+                    bitmap, cv2.COLOR_GRAY2RGB if grayscale else cv2.COLOR_BGR2RGB
+                )
+            )
+            page.close()
+        return images
+    finally:
+        pdf.close()
+
+
+def extract_tables(pdf: PDF, ocr: Optional[OCRInstance]):
+    return pdf.extract_tables(
+        # img2table reads pages without OCR when it is None
+        ocr=cast(OCRInstance, ocr),
         implicit_rows=True,
         implicit_columns=True,
         borderless_tables=True,
         min_confidence=20,
     )
-    return extracted
@@ -0,0 +1,56 @@
+"""
+Layout detection shared by the readers and the triage:
+ruling lines drawn in a page, and wide gaps between words
+"""
+
+import numpy as np
+import pymupdf
+
+MIN_RULING_LENGTH = 10
+MIN_COLUMN_GAP = 8
+"""
+Min width of the gaps that separate columns of text, in points
+"""
+
+
+def find_rulings(page: pymupdf.Page) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Answers the horizontal (y, x0, x1) and vertical (x, y0, y1) lines of
+    the page, either drawn as lines, thin rectangles or borders of boxes
+    """
+    horizontal: list[tuple[float, float, float]] = []
+    vertical: list[tuple[float, float, float]] = []
+    for drawing in page.get_drawings():
+        for item in drawing["items"]:
+            if item[0] == "l":
+                start, end = item[1], item[2]
+                x0, x1 = sorted((start.x, end.x))
+                y0, y1 = sorted((start.y, end.y))
+            elif item[0] == "re":
+                rect = item[1]
+                x0, y0, x1, y1 = rect.x0, rect.y0, rect.x1, rect.y1
+            else:
+                continue
+
+            width, height = x1 - x0, y1 - y0
+            if height < 2 and width >= MIN_RULING_LENGTH:
+                horizontal.append(((y0 + y1) / 2, x0, x1))
+            elif width < 2 and height >= MIN_RULING_LENGTH:
+                vertical.append(((x0 + x1) / 2, y0, y1))
+            elif item[0] == "re" and min(width, height) >= MIN_RULING_LENGTH:
+                horizontal.extend([(y0, x0, x1), (y1, x0, x1)])
+                vertical.extend([(x0, y0, y1), (x1, y0, y1)])
+
+    return (
+        np.array(horizontal, dtype=np.float64).reshape(-1, 3),
+        np.array(vertical, dtype=np.float64).reshape(-1, 3),
+    )
+
+
+def gap_breaks(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Given the horizontal starts and ends of boxes sorted from left to right,
+    answers the indexes of those separated from the previous one
+    by a gap at least MIN_COLUMN_GAP wide
+    """
+    return np.flatnonzero(starts[1:] - ends[:-1] >= MIN_COLUMN_GAP) + 1
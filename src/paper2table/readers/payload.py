@@ -0,0 +1,93 @@
+"""
+Slimming of the pdfs sent to models.
+
+Figure-heavy papers weigh tens of megabytes, almost all of it raster
+images and embedded fonts, which slows down uploads and may increase
+input tokens. Before being sent, papers can be rewritten with their
+images downsampled - or dropped -, their fonts subset to the used
+glyphs and their unused objects garbage-collected
+"""
+
+import logging
+from typing import Optional
+
+import pymupdf
+
+from ..dispatcher import total_tokens
+
+_logger = logging.getLogger("pape2table")
+
+DEFAULT_IMAGE_DPI = 150
+
+
+class PdfSlimmer:
+    """
+    Rewrites pdfs with their images downsampled to image_dpi
+    - or dropped, if drop_images is True -, keeping the original
+    ones when they can't be made smaller.
+
+    The same pdf is always rewritten with the same bytes,
+    so that slimmed pdfs can be used as cache keys
+    """
+
+    def __init__(
+        self, image_dpi: Optional[int] = DEFAULT_IMAGE_DPI, drop_images: bool = False
+    ):
+        self.image_dpi = image_dpi
+        self.drop_images = drop_images
+
+    def __call__(self, path: str, data: bytes) -> bytes:
+        try:
+            slim = slim_pdf(data, self.image_dpi, self.drop_images)
+        except Exception as e:
+            _logger.warning(f"Couldn't slim {path}, sending it as is: {e}")
+            return data
+
+        if len(slim) >= len(data):
+            _logger.debug("Slimming %s didn't reduce its size", path)
+            return data
+        _logger.info(
+            "Slimmed %s from %i to %i bytes (%.0f%% saved)",
+            path,
+            len(data),
+            len(slim),
+            100 * (1 - len(slim) / len(data)),
+        )
+        return slim
+
+
+def slim_pdf(
+    data: bytes, image_dpi: Optional[int] = DEFAULT_IMAGE_DPI, drop_images: bool = False
+) -> bytes:
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        if drop_images:
+            for page in doc:
+                for image in page.get_images(full=True):
+                    page.delete_image(image[0])
+        elif image_dpi:
+            # only images above the target resolution are resampled
+            doc.rewrite_images(
+                dpi_threshold=image_dpi + 1, dpi_target=image_dpi, quality=75
+            )
+        doc.subset_fonts()
+        return doc.tobytes(garbage=4, deflate=True, use_objstms=1, no_new_id=True)
+
+
+def read_payload(path: str, slimmer: Optional[PdfSlimmer] = None) -> bytes:
+    """
+    Answers the bytes of the given pdf to send to a model,
+    slimmed by slimmer, if any
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    return slimmer(path, data) if slimmer else data
+
+
+def log_usage(path: str, data: bytes, result):
+    """
+    Report the size of the payload sent for the given paper
+    and the tokens used by the model run result
+    """
+    _logger.info(
+        "Sent %i bytes of %s, using %i tokens", len(data), path, total_tokens(result)
+    )
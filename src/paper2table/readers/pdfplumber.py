@@ -1,22 +1,43 @@
+import functools
 import logging
-from typing import Optional
+from collections import Counter
+from concurrent.futures import Executor
+from typing import Callable, Optional, Sequence
 import json
 
 import pandas as pd
 import pdfplumber
 import pdfplumber.page
+from pdfplumber.table import (
+    TableFinder,
+    TableSettings,
+    merge_edges,
+    words_to_edges_h,
+    words_to_edges_v,
+)
+from pdfplumber.utils.geometry import filter_edges
+from pdfminer.pdfparser import PDFSyntaxError
+from pdfminer.psexceptions import PSSyntaxError
 
 
-from . import document
+from . import document, text_layer
 from .utils import first_row_is_table_header, Row
+from ..cache import RepairCache, TextLayerCache, file_digest
 from ..mapping import TablesMapping
 from ..tables_reader import TablesReader
 from .document import PDFDocument, PDFPage
+from .strategies import prefer
 
 _logger = logging.getLogger("pape2table")
 
 type TableFragment = list[Row]
 
+repair_counts: Counter[str] = Counter()
+"""
+Number of documents opened by this process, by outcome:
+intact, repaired and - among the latter - cached
+"""
+
 
 class PDFPlumberTable:
     rows: TableFragment
@@ -30,14 +51,148 @@ class PDFPlumberTable:
         return pd.DataFrame(self.rows)
 
 
+class PageLayout:
+    """
+    The parts of pdfplumber table finding that don't depend
+    on - or are shared by - the table settings, computed
+    once per page: words, edges derived from lines and words,
+    the tables found for each distinct set of edges and
+    the text extracted from each distinct set of cells.
+
+    Trying many settings on the same page this way only
+    reruns the steps that actually change between them
+    """
+
+    def __init__(self, page: pdfplumber.page.Page):
+        self.page = page
+        self._words: dict[str, list] = {}
+        self._edges: dict[tuple, list] = {}
+        self._tables: dict[tuple, list] = {}
+        self._rows: dict[tuple, list] = {}
+
+    def words(self, settings: TableSettings) -> list:
+        key = json.dumps(settings.text_settings or {}, sort_keys=True)
+        if key not in self._words:
+            self._words[key] = self.page.extract_words(**(settings.text_settings or {}))
+        return self._words[key]
+
+    def base_edges(self, settings: TableSettings, orientation: str) -> list:
+        strategy = getattr(settings, f"{orientation}_strategy")
+        if strategy == "lines":
+            key = (orientation, strategy, settings.edge_min_length_prefilter)
+        elif orientation == "vertical":
+            key = (orientation, strategy, settings.min_words_vertical)
+        else:
+            key = (orientation, strategy, settings.min_words_horizontal)
+
+        if key in self._edges:
+            return self._edges[key]
+
+        if strategy == "lines":
+            edges = filter_edges(
+                self.page.edges,
+                orientation[0],
+                min_length=settings.edge_min_length_prefilter,
+            )
+        elif orientation == "vertical":
+            edges = words_to_edges_v(
+                self.words(settings), word_threshold=settings.min_words_vertical
+            )
+        else:
+            edges = words_to_edges_h(
+                self.words(settings), word_threshold=settings.min_words_horizontal
+            )
+        self._edges[key] = edges
+        return edges
+
+    def edges(self, settings: TableSettings) -> list:
+        """
+        Answers the same edges TableFinder.get_edges does, for
+        lines and text strategies without explicit lines
+        """
+        edges = merge_edges(
+            self.base_edges(settings, "vertical")
+            + self.base_edges(settings, "horizontal"),
+            snap_x_tolerance=settings.snap_x_tolerance,
+            snap_y_tolerance=settings.snap_y_tolerance,
+            join_x_tolerance=settings.join_x_tolerance,
+            join_y_tolerance=settings.join_y_tolerance,
+        )
+        return filter_edges(edges, min_length=settings.edge_min_length)
+
+    def extract_tables(self, settings: Optional[dict]) -> list:
+        """
+        Answers the same as pdfplumber's page.extract_tables(settings)
+        """
+        table_settings = TableSettings.resolve(settings)
+        if not self.supports(table_settings):
+            return self.page.extract_tables(table_settings)
+
+        edges = self.edges(table_settings)
+        text_settings = json.dumps(table_settings.text_settings or {}, sort_keys=True)
+        key = (
+            tuple(
+                (edge["x0"], edge["top"], edge["x1"], edge["bottom"], edge["orientation"])
+                for edge in edges
+            ),
+            table_settings.intersection_x_tolerance,
+            table_settings.intersection_y_tolerance,
+            text_settings,
+        )
+        if key not in self._tables:
+            finder = LayoutTableFinder(self.page, table_settings, edges)
+            self._tables[key] = [
+                self.extract_rows(table, table_settings, text_settings)
+                for table in finder.tables
+            ]
+        else:
+            _logger.debug("Reusing tables found with same edges")
+        return self._tables[key]
+
+    def extract_rows(self, table, settings: TableSettings, text_settings: str) -> list:
+        key = (tuple(table.cells), text_settings)
+        if key not in self._rows:
+            self._rows[key] = table.extract(**(settings.text_settings or {}))
+        return self._rows[key]
+
+    @staticmethod
+    def supports(settings: TableSettings) -> bool:
+        return (
+            settings.vertical_strategy in ("lines", "text")
+            and settings.horizontal_strategy in ("lines", "text")
+            and not settings.explicit_vertical_lines
+            and not settings.explicit_horizontal_lines
+        )
+
+
+class LayoutTableFinder(TableFinder):
+    """
+    A TableFinder that uses already computed edges
+    """
+
+    def __init__(
+        self, page: pdfplumber.page.Page, settings: TableSettings, edges: list
+    ):
+        self._precomputed_edges = edges
+        super().__init__(page, settings)
+
+    def get_edges(self) -> list:
+        return self._precomputed_edges
+
+
 class PDFPlumberPage(PDFPage):
     def __init__(self, page: pdfplumber.page.Page):
         self.page = page
 
-    def extract_tables_candidates(self):
-        for settings in self.generate_pdfplumber_settings():
+    def extract_tables_candidates(self, preferred: Sequence[str] = ()):
+        layout = PageLayout(self.page)
+        for settings in prefer(
+            list(self.generate_pdfplumber_settings()), list(preferred), key=json.dumps
+        ):
             settings_id = json.dumps(settings)
-            yield (settings_id, self.extract_tables_with_settings(settings))
+            tables = layout.extract_tables(settings)
+            _logger.debug("Extracted %i tables", len(tables))
+            yield (settings_id, [PDFPlumberTable(table) for table in tables])
 
     def extract_tables(self) -> list[PDFPlumberTable]:
         tables = self.extract_tables_with_settings(None)
@@ -69,34 +224,184 @@ class PDFPlumberPage(PDFPage):
     def page_number(self) -> int:
         return self.page.page_number
 
+    def close(self):
+        self.page.close()
+
 
 class PDFPlumberDocument(PDFDocument):
     _pdf: pdfplumber.pdf.PDF
-    _pages: list[PDFPlumberPage]
 
-    def __init__(self, pdf: pdfplumber.pdf.PDF):
+    def __init__(
+        self,
+        pdf: pdfplumber.pdf.PDF,
+        text_layer_cache: Optional[TextLayerCache] = None,
+        pdf_digest: Optional[str] = None,
+        repair: Optional[Callable[[], pdfplumber.pdf.PDF]] = None,
+    ):
         self._pdf = pdf
-        self._pages = [PDFPlumberPage(page) for page in self._pdf.pages]
+        self.text_layer_cache = text_layer_cache
+        """
+        Cache of the parsed objects of pages, keyed by pdf_digest
+        """
+        self.pdf_digest = pdf_digest
+        self.repair = repair
+        """
+        Answers a repaired copy of the pdf, which replaces it when the
+        contents of a page can't be parsed. None if it was already repaired
+        """
 
     @property
     def page_count(self) -> int:
         return len(self._pdf.pages)
 
-    @property
-    def pages(self) -> list[PDFPlumberPage]:
-        return self._pages
+    def page_at(self, index: int) -> PDFPlumberPage:
+        if not 1 <= index <= self.page_count:
+            raise IndexError(f"Page {index} is out of bounds")
+        try:
+            return self.load_page(index)
+        except (PSSyntaxError, PDFSyntaxError) as e:
+            if self.repair is None:
+                raise
+            _logger.debug("Repairing pdf, since page %i can't be parsed: %s", index, e)
+            self._pdf.close()
+            self._pdf, self.repair = self.repair(), None
+            repair_counts["intact"] -= 1
+            repair_counts["repaired"] += 1
+            return self.load_page(index)
+
+    def load_page(self, index: int) -> PDFPlumberPage:
+        page = self._pdf.pages[index - 1]
+        if self.text_layer_cache is not None and self.pdf_digest is not None:
+            self.restore_text_layer(page, self.text_layer_cache, self.pdf_digest)
+        else:
+            # page contents are parsed lazily, so they are parsed here
+            # in order to repair the pdf if they are malformed
+            page.objects
+        return PDFPlumberPage(page)
+
+    def restore_text_layer(
+        self, page: pdfplumber.page.Page, cache: TextLayerCache, pdf_digest: str
+    ):
+        """
+        Load the objects of the given page from the cache, instead of
+        parsing them, or parse and store them if they aren't cached yet
+        """
+        key = cache.key(
+            pdf_digest,
+            page.page_number,
+            unicode_norm=self._pdf.unicode_norm,
+            version=text_layer.TEXT_LAYER_VERSION,
+        )
+        objects = text_layer.load_objects(cache, key)
+        if objects is not None:
+            page._objects = objects  # pyright: ignore[reportAttributeAccessIssue]
+        else:
+            text_layer.store_objects(cache, key, page.objects)
+
+    def close(self):
+        self._pdf.close()
+
+
+def open_document(
+    pdf_path: str,
+    repair_cache: Optional[RepairCache] = None,
+    text_layer_cache: Optional[TextLayerCache] = None,
+) -> PDFPlumberDocument:
+    """
+    Open the given pdf, repairing it only if it can't be parsed.
+
+    Malformed page contents are only found when pages are read,
+    in which case the document is repaired then.
+
+    Repairing rewrites the whole pdf with Ghostscript, so repaired copies
+    are stored in repair_cache, if given, and reused afterwards.
+    Likewise, parsed pages are stored in text_layer_cache, if given
+    """
+    pdf, repaired = open_pdf(pdf_path, repair_cache)
+    return PDFPlumberDocument(
+        pdf,
+        text_layer_cache=text_layer_cache,
+        pdf_digest=file_digest(pdf_path) if text_layer_cache else None,
+        repair=(
+            None
+            if repaired
+            else functools.partial(open_repaired_pdf, pdf_path, repair_cache)
+        ),
+    )
+
+
+def open_pdf(
+    pdf_path: str, repair_cache: Optional[RepairCache]
+) -> tuple[pdfplumber.pdf.PDF, bool]:
+    """
+    Answers the given pdf - repaired if it can't be parsed - and
+    whether it was repaired
+    """
+    pdf = None
+    try:
+        pdf = pdfplumber.open(pdf_path, unicode_norm="NFKC")
+        # pages are parsed lazily
+        pdf.pages
+        repair_counts["intact"] += 1
+        return pdf, False
+    except OSError:
+        raise
+    except Exception as e:
+        if pdf is not None:
+            pdf.close()
+        _logger.debug("Repairing %s, which can't be parsed: %s", pdf_path, e)
+
+    pdf = open_repaired_pdf(pdf_path, repair_cache)
+    repair_counts["repaired"] += 1
+    _logger.debug(
+        "%i of %i documents needed repair, %i of them were cached",
+        repair_counts["repaired"],
+        repair_counts["repaired"] + repair_counts["intact"],
+        repair_counts["cached"],
+    )
+    return pdf, True
+
+
+def open_repaired_pdf(
+    pdf_path: str, repair_cache: Optional[RepairCache]
+) -> pdfplumber.pdf.PDF:
+    if repair_cache is None:
+        return pdfplumber.open(pdf_path, unicode_norm="NFKC", repair=True)
+
+    key = repair_cache.key(pdf_path)
+    repaired_path = repair_cache.get_path(key)
+    if repaired_path is None:
+        repair_cache.put_with(
+            key, lambda tmp_path: pdfplumber.repair(pdf_path, outfile=tmp_path)
+        )
+        repaired_path = repair_cache.path_for(key)
+    else:
+        repair_counts["cached"] += 1
+    return pdfplumber.open(repaired_path, unicode_norm="NFKC")
 
 
 def read_tables(
     pdf_path: str,
     column_names_hints: Optional[str] = None,
     mapping: Optional[TablesMapping] = None,
+    score_threshold: float = document.DEFAULT_SCORE_THRESHOLD,
+    page_time_budget: Optional[float] = document.DEFAULT_PAGE_TIME_BUDGET,
+    triage: Optional[document.Triage] = None,
+    page_executor: Optional[Executor] = None,
+    repair_cache: Optional[RepairCache] = None,
+    text_layer_cache: Optional[TextLayerCache] = None,
 ) -> TablesReader:
     return document.read_tables(
         pdf_path,
         column_names_hints=column_names_hints,
         mapping=mapping,
-        read_document=lambda pdf_path: PDFPlumberDocument(
-            pdfplumber.open(pdf_path, unicode_norm="NFKC", repair=True)
+        score_threshold=score_threshold,
+        page_time_budget=page_time_budget,
+        triage=triage,
+        page_executor=page_executor,
+        read_document=functools.partial(
+            open_document,
+            repair_cache=repair_cache,
+            text_layer_cache=text_layer_cache,
         ),
     )
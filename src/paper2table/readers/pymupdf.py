@@ -1,5 +1,6 @@
 import logging
-from typing import Optional
+from concurrent.futures import Executor
+from typing import Optional, Sequence
 
 import pandas as pd
 import pymupdf
@@ -7,6 +8,7 @@ import pymupdf
 from paper2table.mapping import TablesMapping
 from paper2table.readers import document
 from paper2table.readers.document import PDFDocument, PDFPage
+from paper2table.readers.strategies import prefer
 from paper2table.tables_reader import TablesReader
 
 _logger = logging.getLogger("pape2table")
@@ -28,8 +30,8 @@ class PyMuPDFPage(PDFPage):
     def __init__(self, page: pymupdf.Page):
         self.page = page
 
-    def extract_tables_candidates(self):
-        for strategy in ["lines", "lines_strict", "text"]:
+    def extract_tables_candidates(self, preferred: Sequence[str] = ()):
+        for strategy in prefer(["lines", "lines_strict", "text"], list(preferred)):
             yield (strategy, self.extract_tables_with_strategy(strategy))
 
     def extract_tables(self) -> list[PyMuPDFTable]:
@@ -46,31 +48,46 @@ class PyMuPDFPage(PDFPage):
 
 class PyMuPDFDocument(PDFDocument):
     _document: pymupdf.Document
-    _pages: list[PyMuPDFPage]
 
     def __init__(self, document: pymupdf.Document):
         self._document = document
-        self._pages = [PyMuPDFPage(page) for page in document]
 
     @property
     def page_count(self) -> int:
         return self._document.page_count
 
-    @property
-    def pages(self) -> list[PyMuPDFPage]:
-        return self._pages
+    def page_at(self, index: int) -> PyMuPDFPage:
+        if not 1 <= index <= self.page_count:
+            raise IndexError(f"Page {index} is out of bounds")
+        return PyMuPDFPage(self._document.load_page(index - 1))
+
+    def close(self):
+        self._document.close()
+
+
+def open_document(pdf_path: str) -> PyMuPDFDocument:
+    return PyMuPDFDocument(pymupdf.open(pdf_path))
 
 
 def read_tables(
     pdf_path: str,
     column_names_hints: Optional[str] = None,
     mapping: Optional[TablesMapping] = None,
+    score_threshold: float = document.DEFAULT_SCORE_THRESHOLD,
+    page_time_budget: Optional[float] = document.DEFAULT_PAGE_TIME_BUDGET,
+    triage: Optional[document.Triage] = None,
+    page_executor: Optional[Executor] = None,
 ) -> TablesReader:
 
-    with pymupdf.open(pdf_path) as pdf:
-        return document.read_tables(
-            pdf_path,
-            column_names_hints=column_names_hints,
-            mapping=mapping,
-            read_document=lambda _: PyMuPDFDocument(pdf),
-        )
+    return document.read_tables(
+        pdf_path,
+        column_names_hints=column_names_hints,
+        mapping=mapping,
+        score_threshold=score_threshold,
+        page_time_budget=page_time_budget,
+        triage=triage,
+        page_executor=page_executor,
+        read_document=open_document,
+        # unreadable papers must be reported as failed, not as empty
+        raise_open_errors=True,
+    )
@@ -0,0 +1,57 @@
+"""
+Agents shared by all the papers of a run.
+
+Building an agent for every paper rebuilds its output model and
+instructions, and creates a new provider for its model - with a new HTTP
+client -, so that connections to the model API are never reused.
+Instead, agents are built once and kept in an AgentPool.
+
+HTTP clients are bound to the event loop where they are first used, and
+agents run with run_sync use an event loop per thread, so each thread
+keeps its own models and agents
+"""
+
+import threading
+from typing import Any, Callable, Hashable
+
+from pydantic_ai import Agent
+from pydantic_ai.models import Model, infer_model
+
+
+class AgentPool:
+    """
+    A pool of agents, built on first use by a build(model, *args)
+    function and reused afterwards.
+
+    Models are built by model_factory from their names - e.g.
+    google-gla:gemini-2.5-flash -, once per thread, and shared by all
+    the agents of that thread
+    """
+
+    def __init__(self, model_factory: Callable[[str], Model] = infer_model):
+        self.model_factory = model_factory
+        self._local = threading.local()
+
+    def _session(self) -> tuple[dict[str, Model], dict[Hashable, Agent]]:
+        if not hasattr(self._local, "models"):
+            self._local.models = {}
+            self._local.agents = {}
+        return self._local.models, self._local.agents
+
+    def model(self, name: str) -> Model:
+        models, _ = self._session()
+        if name not in models:
+            models[name] = self.model_factory(name)
+        return models[name]
+
+    def agent(
+        self, build: Callable[..., Agent], model: str, *args: Hashable
+    ) -> Agent[Any, Any]:
+        _, agents = self._session()
+        key = (build, model, *args)
+        if key not in agents:
+            agents[key] = build(self.model(model), *args)
+        return agents[key]
+
+
+default_agent_pool = AgentPool()
@@ -80,7 +80,9 @@ def write_tmp_page_file(doc, page_indices: list[int]) -> str:
             page_doc.insert_pdf(doc, from_page=i, to_page=i)
         with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
             tmp_name = tmp.name
-        page_doc.save(tmp_name)
+        # without a new random id, the same pages are always saved
+        # with the same bytes, so that they can be used as cache keys
+        page_doc.save(tmp_name, no_new_id=True)
     return tmp_name
 
 
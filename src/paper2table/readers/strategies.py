@@ -0,0 +1,126 @@
+"""
+Memoization of table extraction strategies.
+
+When reading mapped tables, pages yield candidates for several
+extraction strategies - e.g. pdfplumber settings - that are tried in order
+until one of them succeeds. Consecutive pages of a table - and tables of the same
+document - are usually read successfully with the same strategy, so the
+strategy that succeeded last is tried first
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+_logger = logging.getLogger("pape2table")
+
+
+class StrategyStats:
+    def __init__(self, successes: int = 0, failures: int = 0, seconds: float = 0):
+        self.successes = successes
+        self.failures = failures
+        self.seconds = seconds
+        """
+        Total seconds spent extracting and reading tables with this strategy
+        """
+
+    @property
+    def attempts(self) -> int:
+        return self.successes + self.failures
+
+    def to_dict(self) -> dict:
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "seconds": round(self.seconds, 6),
+        }
+
+
+class StrategyMemo:
+    """
+    Remembers the strategy that was chosen last for each table and
+    for the whole document, along with success and latency
+    statistics of each strategy
+    """
+
+    def __init__(self):
+        self.document_winner: Optional[str] = None
+        self.table_winners: dict[str, str] = {}
+        self.stats: dict[str, StrategyStats] = {}
+
+    def preferred(self, table_key: str) -> list[str]:
+        """
+        Answers the strategies that should be tried first
+        when reading the given table, most promising first
+        """
+        preferred = []
+        for strategy in [self.table_winners.get(table_key), self.document_winner]:
+            if strategy is not None and strategy not in preferred:
+                preferred.append(strategy)
+        return preferred
+
+    def record(self, table_key: str, strategy: str, succeeded: bool, seconds: float):
+        """
+        Record an attempt of reading a table with the given strategy
+        """
+        stats = self.stats.setdefault(strategy, StrategyStats())
+        stats.seconds += seconds
+        if succeeded:
+            stats.successes += 1
+        else:
+            stats.failures += 1
+
+    def choose(self, table_key: str, strategy: str):
+        """
+        Record the strategy whose results were chosen for reading a table
+        """
+        self.table_winners[table_key] = strategy
+        self.document_winner = strategy
+
+    def to_dict(self) -> dict:
+        return {
+            "document_winner": self.document_winner,
+            "table_winners": self.table_winners,
+            "stats": {strategy: stats.to_dict() for strategy, stats in self.stats.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StrategyMemo":
+        memo = cls()
+        memo.document_winner = data.get("document_winner")
+        memo.table_winners = dict(data.get("table_winners", {}))
+        memo.stats = {
+            strategy: StrategyStats(**stats)
+            for strategy, stats in data.get("stats", {}).items()
+        }
+        return memo
+
+    @classmethod
+    def load(cls, path: Path) -> "StrategyMemo":
+        """
+        Load a memo, answering an empty one if it
+        doesn't exist or can't be read
+        """
+        try:
+            return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            return cls()
+        except (json.JSONDecodeError, TypeError, AttributeError) as e:
+            _logger.warning(f"Ignoring malformed strategies file {path}: {e}")
+            return cls()
+
+    def save(self, path: Path):
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(self.to_dict()), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def prefer(strategies: list, preferred: list[str], key=lambda strategy: strategy) -> list:
+    """
+    Reorder strategies so that the preferred ones come first,
+    in their preference order, keeping the order of the rest
+    """
+    ranks = {strategy: rank for rank, strategy in enumerate(preferred)}
+    return sorted(strategies, key=lambda strategy: ranks.get(key(strategy), len(ranks)))
@@ -0,0 +1,198 @@
+"""
+Compact storage of the text layer of pdf pages.
+
+Parsing the content streams of a pdf - i.e. finding its chars, lines,
+rects and curves - is usually the most expensive step of reading its tables.
+The objects of each page are stored as NumPy arrays in an uncompressed .npz
+file - one array per object type and attribute -, so that subsequent
+runs over the same paper - e.g. when tuning hints or mappings -
+can skip parsing altogether
+"""
+
+import json
+import logging
+import zipfile
+from typing import Any, Optional
+
+import numpy as np
+
+from ..cache import TextLayerCache
+
+_logger = logging.getLogger("pape2table")
+
+TEXT_LAYER_VERSION = 1
+"""
+Version of the stored format, used to invalidate
+cached text layers when it changes
+"""
+
+type PageObjects = dict[str, list[dict[str, Any]]]
+"""
+Objects of a page, by object type, as answered by pdfplumber
+"""
+
+_META = "__meta__"
+
+
+def encode_objects(objects: PageObjects) -> dict[str, np.ndarray]:
+    """
+    Encode the given objects as columns: one array for each attribute
+    of each object type. Attributes that are not scalars nor fixed-size
+    tuples of numbers - e.g. curve points - are stored as JSON strings
+    """
+    arrays: dict[str, np.ndarray] = {}
+    meta: dict[str, dict] = {}
+    for object_type, objs in objects.items():
+        keys = list(dict.fromkeys(key for obj in objs for key in obj))
+        kinds = {}
+        for key in keys:
+            name = f"{object_type}.{key}"
+            present = [key in obj for obj in objs]
+            if not all(present):
+                arrays[f"{name}.present"] = np.array(present, dtype=bool)
+            values = [obj[key] for obj in objs if key in obj]
+            kinds[key] = encode_column(name, values, arrays)
+        meta[object_type] = {"count": len(objs), "kinds": kinds}
+
+    arrays[_META] = np.array(json.dumps(meta))
+    return arrays
+
+
+def encode_column(name: str, values: list, arrays: dict[str, np.ndarray]) -> str:
+    if all(type(value) is bool for value in values):
+        arrays[name] = np.array(values, dtype=bool)
+        return "bool"
+    if all(type(value) is int for value in values):
+        arrays[name] = np.array(values, dtype=np.int64)
+        return "int"
+    if all(type(value) in (int, float) for value in values):
+        arrays[name] = np.array(values, dtype=np.float64)
+        return "float"
+    if values and all(is_numbers_tuple(value, values[0]) for value in values):
+        # most tuples - e.g. colors - are repeated
+        distinct, codes = np.unique(
+            np.array(values, dtype=np.float64), axis=0, return_inverse=True
+        )
+        arrays[name] = codes.astype(np.int32).reshape(-1)
+        arrays[f"{name}.values"] = distinct
+        return "tuple"
+
+    if all(type(value) is str for value in values):
+        encode_strings(name, values, arrays)
+        return "str"
+
+    encode_strings(name, [json.dumps(mark_tuples(value)) for value in values], arrays)
+    return "json"
+
+
+def encode_strings(name: str, values: list[str], arrays: dict[str, np.ndarray]):
+    """
+    Store strings as codes into a list of their distinct values, since most
+    of them - e.g. font names or colors - are repeated. Distinct values are
+    stored as a single UTF-8 buffer, along with the offsets where each of them ends
+    """
+    distinct = list(dict.fromkeys(values))
+    codes = {value: code for code, value in enumerate(distinct)}
+    encoded = [value.encode("utf-8") for value in distinct]
+    arrays[name] = np.array([codes[value] for value in values], dtype=np.int32)
+    arrays[f"{name}.values"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    arrays[f"{name}.offsets"] = np.cumsum(
+        [len(value) for value in encoded], dtype=np.int64
+    )
+
+
+def decode_strings(arrays, name: str) -> list[str]:
+    buffer = arrays[f"{name}.values"].tobytes()
+    ends = arrays[f"{name}.offsets"].tolist()
+    return [
+        buffer[start:end].decode("utf-8") for start, end in zip([0] + ends, ends)
+    ]
+
+
+def is_numbers_tuple(value, first) -> bool:
+    """
+    Answers whether value is a tuple of numbers with the same size as first
+    """
+    return (
+        type(value) is tuple
+        and type(first) is tuple
+        and len(value) == len(first)
+        and all(type(item) in (int, float) for item in value)
+    )
+
+
+def decode_objects(arrays) -> PageObjects:
+    meta = json.loads(str(arrays[_META]))
+    objects: PageObjects = {}
+    for object_type, type_meta in meta.items():
+        objs: list[dict] = [{} for _ in range(type_meta["count"])]
+        for key, kind in type_meta["kinds"].items():
+            name = f"{object_type}.{key}"
+            values = iter(decode_column(arrays, name, kind))
+            if f"{name}.present" in arrays:
+                present = arrays[f"{name}.present"].tolist()
+            else:
+                present = [True] * len(objs)
+            for obj, has_key in zip(objs, present):
+                if has_key:
+                    obj[key] = next(values)
+        objects[object_type] = objs
+    return objects
+
+
+def decode_column(arrays, name: str, kind: str) -> list:
+    array = arrays[name]
+    if kind == "tuple":
+        distinct = [tuple(row) for row in arrays[f"{name}.values"].tolist()]
+        return [distinct[code] for code in array.tolist()]
+    if kind in ("str", "json"):
+        distinct = decode_strings(arrays, name)
+        if kind == "json":
+            distinct = [unmark_tuples(json.loads(value)) for value in distinct]
+        return [distinct[code] for code in array.tolist()]
+    return array.tolist()
+
+
+def mark_tuples(value):
+    """
+    Wrap tuples - e.g. points - so that they can be told apart
+    from lists once decoded from JSON
+    """
+    if isinstance(value, tuple):
+        return {"tuple": [mark_tuples(item) for item in value]}
+    if isinstance(value, list):
+        return [mark_tuples(item) for item in value]
+    return value
+
+
+def unmark_tuples(value):
+    if isinstance(value, dict):
+        return tuple(unmark_tuples(item) for item in value["tuple"])
+    if isinstance(value, list):
+        return [unmark_tuples(item) for item in value]
+    return value
+
+
+def load_objects(cache: TextLayerCache, key: str) -> Optional[PageObjects]:
+    path = cache.get_path(key)
+    if path is None:
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as arrays:
+            return decode_objects(arrays)
+    except (OSError, ValueError, KeyError):
+        _logger.warning("Ignoring corrupted cache entry %s", path)
+        return None
+
+
+def store_objects(cache: TextLayerCache, key: str, objects: PageObjects):
+    arrays = encode_objects(objects)
+
+    def write(tmp_path: str):
+        # the same .npz archive np.savez writes, with an .npy file per array
+        with zipfile.ZipFile(tmp_path, "w") as archive:
+            for name, array in arrays.items():
+                with archive.open(f"{name}.npy", "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, array, allow_pickle=False)
+
+    cache.put_with(key, write)
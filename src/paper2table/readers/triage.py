@@ -0,0 +1,213 @@
+"""
+Fast triage of the pages that are likely to contain tables.
+
+Reading every page of a paper with a reader backend is expensive, while
+most pages of a paper are plain prose. Triage cheaply scores each page from 0 to 1
+using its vector drawings and text layer - no table finding involved -,
+so that only pages scoring above a threshold reach the reader
+"""
+
+import logging
+import re
+from collections import defaultdict
+from typing import Optional, cast
+
+import numpy as np
+import pymupdf
+
+from .layout import find_rulings, gap_breaks
+
+_logger = logging.getLogger("pape2table")
+
+TRIAGE_VERSION = 1
+"""
+Version of the scoring, used to invalidate cached triages when it changes
+"""
+
+DEFAULT_TRIAGE_THRESHOLD = 0.3
+
+_CAPTION_RE = re.compile(r"^(table|tabla)\s+([0-9]+|[ivxlc]+)\b", re.IGNORECASE)
+
+_COLUMN_BIN_WIDTH = 5
+_ROW_BIN_HEIGHT = 2
+
+
+class PageTriage:
+    def __init__(
+        self,
+        page_number: int,
+        rules: int = 0,
+        aligned_rows: int = 0,
+        caption: bool = False,
+        scanned: bool = False,
+    ):
+        self.page_number = page_number
+        self.rules = rules
+        """
+        Number of horizontal and vertical lines drawn in the page
+        """
+        self.aligned_rows = aligned_rows
+        """
+        Number of text rows split in three or more
+        segments that are aligned with other rows
+        """
+        self.caption = caption
+        """
+        Whether a line of the page looks like a table caption
+        """
+        self.scanned = scanned
+        """
+        Whether the page is made of images without text, and can't be triaged
+        """
+
+    @property
+    def score(self) -> float:
+        if self.scanned:
+            return 1.0
+        rules_score = min(self.rules / 6, 1)
+        alignment_score = min(self.aligned_rows / 5, 1)
+        return 0.4 * rules_score + 0.4 * alignment_score + 0.2 * self.caption
+
+    def to_dict(self) -> dict:
+        return {
+            "page_number": self.page_number,
+            "rules": self.rules,
+            "aligned_rows": self.aligned_rows,
+            "caption": self.caption,
+            "scanned": self.scanned,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PageTriage":
+        return cls(**data)
+
+    def __repr__(self) -> str:
+        return (
+            f"score={self.score:.2f} rules={self.rules}"
+            f" aligned_rows={self.aligned_rows} caption={self.caption}"
+            f" scanned={self.scanned}"
+        )
+
+
+def triage_page(page: pymupdf.Page) -> PageTriage:
+    words = cast(list, page.get_text("words"))
+    if not words and page.get_images():
+        return PageTriage((page.number or 0) + 1, scanned=True)
+
+    return PageTriage(
+        (page.number or 0) + 1,
+        rules=count_rules(page),
+        aligned_rows=count_aligned_rows(words),
+        caption=has_caption(page),
+    )
+
+
+def triage_document(pdf_path: str) -> list[PageTriage]:
+    with pymupdf.open(pdf_path) as pdf:
+        return [triage_page(page) for page in pdf]
+
+
+def count_rules(page: pymupdf.Page) -> int:
+    """
+    Count the horizontal and vertical lines of the page,
+    either drawn as lines, thin rectangles or borders of boxes
+    """
+    horizontal, vertical = find_rulings(page)
+    return len(horizontal) + len(vertical)
+
+
+def count_aligned_rows(words: list) -> int:
+    """
+    Count the text rows whose segments - runs of words separated by
+    wide gaps - start at the same positions than segments of other rows.
+
+    Only rows with three or more such segments are counted, since two
+    column page layouts also produce rows with two aligned segments
+    """
+    rows: dict[int, list] = defaultdict(list)
+    for word in words:
+        x0, y0, x1, y1 = word[:4]
+        rows[round((y0 + y1) / 2 / _ROW_BIN_HEIGHT)].append((x0, x1))
+
+    rows_segments_starts = []
+    for row_words in rows.values():
+        boxes = np.array(sorted(row_words))
+        starts = boxes[np.concatenate([[0], gap_breaks(boxes[:, 0], boxes[:, 1])]), 0]
+        rows_segments_starts.append(
+            {round(start / _COLUMN_BIN_WIDTH) for start in starts}
+        )
+
+    rows_per_column: dict[int, int] = defaultdict(int)
+    for starts in rows_segments_starts:
+        for start in starts:
+            rows_per_column[start] += 1
+
+    return sum(
+        1
+        for starts in rows_segments_starts
+        if sum(1 for start in starts if rows_per_column[start] >= 3) >= 3
+    )
+
+
+def has_caption(page: pymupdf.Page) -> bool:
+    for block in cast(dict, page.get_text("dict"))["blocks"]:
+        for line in block.get("lines", []):
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if _CAPTION_RE.match(text):
+                return True
+    return False
+
+
+class PageTriager:
+    """
+    Answers the numbers of the pages of a paper that are worth reading,
+    i.e. those whose triage score is at least threshold.
+
+    Triages are looked up in the given cache first, if any
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_TRIAGE_THRESHOLD,
+        cache=None,
+        refresh: bool = False,
+    ):
+        self.threshold = threshold
+        self.cache = cache
+        self.refresh = refresh
+
+    def triage(self, pdf_path: str) -> list[PageTriage]:
+        if self.cache is None:
+            return triage_document(pdf_path)
+
+        key = self.cache.key(pdf_path, version=TRIAGE_VERSION)
+        cached = None if self.refresh else self.cache.get_triage(key)
+        if cached is not None:
+            return [PageTriage.from_dict(page) for page in cached]
+
+        pages = triage_document(pdf_path)
+        self.cache.put_triage(key, [page.to_dict() for page in pages])
+        return pages
+
+    def __call__(self, pdf_path: str) -> Optional[set[int]]:
+        try:
+            pages = self.triage(pdf_path)
+        except Exception as e:
+            _logger.warning(f"Couldn't triage {pdf_path}, reading all its pages: {e}")
+            return None
+
+        selected = set()
+        for page in pages:
+            if page.score >= self.threshold:
+                selected.add(page.page_number)
+            else:
+                _logger.debug(
+                    "Skipping page %i of %s after triage: %s",
+                    page.page_number,
+                    pdf_path,
+                    page,
+                )
+        _logger.debug(
+            "Triage selected %i of %i pages of %s", len(selected), len(pages), pdf_path
+        )
+        return selected
@@ -0,0 +1,219 @@
+"""
+Deferred retries of papers whose model was unavailable.
+
+Instead of dropping papers - or the remaining pages of split-pages
+papers - when the model answers that it is overloaded, they are queued
+and read again later, once a jittered, exponentially growing delay has
+passed. Papers that were partially read are resumed from the page where
+they failed, and their results are merged with the partial ones.
+
+Retries are read by runner.read_papers, in the same way - and with the
+same pool of workers - as the rest of the papers
+"""
+
+import dataclasses
+import heapq
+import logging
+import random
+import time
+from typing import Callable, Iterable, Iterator, Optional
+
+from .page_range import parse_page_range
+from .runner import PaperResult
+from .tables_reader import TablesReader
+from .tables_reader.dict import DictTablesReader
+
+_logger = logging.getLogger("pape2table")
+
+DEFAULT_RETRY_BUDGET = 20
+DEFAULT_RETRY_DELAY = 30.0
+MAX_RETRY_DELAY = 600.0
+MAX_ATTEMPTS = 5
+"""
+Max number of retries of a single paper
+"""
+
+
+@dataclasses.dataclass(order=True)
+class Retry:
+    ready_at: float
+    raw_path: str = dataclasses.field(compare=False)
+    attempts: int = dataclasses.field(compare=False)
+    partial: Optional[TablesReader] = dataclasses.field(default=None, compare=False)
+    """
+    Results of the pages read before the model became unavailable, if any
+    """
+
+
+class RetryQueue:
+    """
+    A queue of papers to read again, spending at most budget retries
+    in the whole run.
+
+    The n-th retry of a paper waits a random delay between half and
+    all of base_delay * 2 ** (n - 1) seconds, capped to max_delay
+    """
+
+    def __init__(
+        self,
+        budget: int = DEFAULT_RETRY_BUDGET,
+        base_delay: float = DEFAULT_RETRY_DELAY,
+        max_delay: float = MAX_RETRY_DELAY,
+        max_attempts: int = MAX_ATTEMPTS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[], float] = random.random,
+    ):
+        self.budget = budget
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self.sleep = sleep
+        self.jitter = jitter
+        self._retries: list[Retry] = []
+        self._running: dict[str, Retry] = {}
+        """
+        Retries being read, by paper path
+        """
+
+    def __len__(self) -> int:
+        """
+        Answers the number of queued retries, not counting those being read
+        """
+        return len(self._retries)
+
+    def delay(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay / 2 + self.jitter() * delay / 2
+
+    def defer(self, paper: PaperResult, attempts: int = 0) -> bool:
+        """
+        Queue the given paper if its model was unavailable and there is
+        retry budget left, answering whether it was queued
+        """
+        if not paper.model_unavailable or paper.status not in ("unavailable", "partial"):
+            return False
+        if self.budget <= 0 or attempts >= self.max_attempts:
+            _logger.warning("No retries left for %s", paper.path)
+            return False
+
+        self.budget -= 1
+        delay = self.delay(attempts + 1)
+        raw_path = resume_path(paper)
+        _logger.info(
+            "Model is unavailable. Retrying %s in %.0f seconds", raw_path, delay
+        )
+        heapq.heappush(
+            self._retries,
+            Retry(
+                ready_at=self.clock() + delay,
+                raw_path=raw_path,
+                attempts=attempts + 1,
+                partial=paper.result if paper.status == "partial" else None,
+            ),
+        )
+        return True
+
+    def ready(self) -> list[str]:
+        """
+        Pop the retries whose delay has passed, answering
+        the raw paths to read
+        """
+        ready = []
+        while self._retries and self._retries[0].ready_at <= self.clock():
+            retry = heapq.heappop(self._retries)
+            clean_path, _ = parse_page_range(retry.raw_path)
+            self._running[clean_path] = retry
+            ready.append(retry.raw_path)
+        return ready
+
+    def next_delay(self) -> Optional[float]:
+        """
+        Answers the seconds left until the next retry is ready,
+        or None if there are no queued retries
+        """
+        if not self._retries:
+            return None
+        return max(0.0, self._retries[0].ready_at - self.clock())
+
+    def wait(self):
+        """
+        Sleep until the next retry is ready
+        """
+        self.sleep(self.next_delay() or 0.0)
+
+    def settle(self, paper: PaperResult) -> Optional[PaperResult]:
+        """
+        Answers the given paper - merged with the results of its previous
+        attempts, if it was retried -, or None if it was queued again
+        """
+        retry = self._running.pop(paper.path, None)
+        if retry is not None:
+            paper = self.merge(retry, paper)
+        return None if self.defer(paper, retry.attempts if retry else 0) else paper
+
+    def settled(self, papers: Iterable[PaperResult]) -> Iterator[PaperResult]:
+        """
+        Yield the given papers that were not queued again
+        """
+        for paper in papers:
+            settled = self.settle(paper)
+            if settled is not None:
+                yield settled
+
+    def merge(self, retry: Retry, paper: PaperResult) -> PaperResult:
+        if retry.partial is None:
+            return paper
+
+        merged = merge_results(retry.partial, paper.result)
+        if paper.status in ("done", "empty"):
+            status = "done" if merged.tables else "empty"
+            return dataclasses.replace(paper, status=status, result=merged)
+
+        # the results of the first pages are kept even if reading the rest failed
+        page_num = paper.page_num
+        if page_num is None and paper.page_range:
+            page_num = paper.page_range[0]
+        return dataclasses.replace(
+            paper, status="partial", result=merged, page_num=page_num
+        )
+
+
+def resume_path(paper: PaperResult) -> str:
+    """
+    Answers the raw path - i.e. PATH:FROM:TO - of the pages
+    of the given paper that are left to read
+    """
+    if paper.status == "partial" and paper.page_num is not None:
+        last_page = paper.page_range[1] if paper.page_range else count_pages(paper.path)
+        return f"{paper.path}:{paper.page_num}:{last_page}"
+    if paper.page_range:
+        return f"{paper.path}:{paper.page_range[0]}:{paper.page_range[1]}"
+    return paper.path
+
+
+def count_pages(path: str) -> int:
+    # imported here since pymupdf is not needed for just starting the CLI
+    import pymupdf
+
+    with pymupdf.open(path) as doc:
+        return doc.page_count
+
+
+def merge_results(first: TablesReader, rest: Optional[TablesReader]) -> TablesReader:
+    """
+    Merge the results of the first pages of a paper
+    with those of the rest of its pages
+    """
+    data = first.to_dict()
+    if rest is None:
+        return DictTablesReader(data)
+    rest_data = rest.to_dict()
+    return DictTablesReader(
+        {
+            **data,
+            "tables": data.get("tables", []) + rest_data.get("tables", []),
+            "citation": data.get("citation") or rest_data.get("citation"),
+        }
+    )
@@ -0,0 +1,410 @@
+"""
+Runs readers over a list of papers, either sequentially
+or distributing them across a pool of worker processes or threads.
+
+Reading never raises: every paper produces a PaperResult that
+describes its outcome, so that the caller (which owns the writers)
+can decide what to write and what to log
+"""
+
+import dataclasses
+import functools
+import signal
+import time
+import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    Literal,
+    Mapping,
+    Optional,
+)
+
+from .page_range import parse_page_range
+from .supervisor import SupervisedProcessPool, default_context
+from .readers.errors import ModelUnavailableError, PartialProcessingError
+from .scheduler import longest_first
+from .tables_reader import TablesReader
+from .tables_reader.dict import DictTablesReader
+
+if TYPE_CHECKING:
+    from .retry import RetryQueue
+
+type Status = Literal[
+    "done", "empty", "partial", "failed", "unavailable", "timeout", "skipped"
+]
+
+type ReadTables = Callable[..., TablesReader]
+
+
+@dataclasses.dataclass
+class PaperResult:
+    path: str
+    status: Status
+    result: Optional[TablesReader] = None
+    page_num: Optional[int] = None
+    """
+    1-based page where processing failed.
+    Only set for partial results
+    """
+    model_unavailable: bool = False
+    page_range: Optional[tuple[int, int]] = None
+    """
+    1-based inclusive range of the pages that were read, if not all of them
+    """
+    error: Optional[str] = None
+    """
+    Formatted traceback of the failure, if any
+    """
+    elapsed: float = 0
+    """
+    Seconds spent reading the paper
+    """
+
+    def snapshot(self) -> "PaperResult":
+        """
+        Answers a copy of this result that can be pickled
+        """
+        if self.result is None or isinstance(self.result, DictTablesReader):
+            return self
+        return dataclasses.replace(
+            self, result=DictTablesReader.from_reader(self.result)
+        )
+
+
+def read_paper(read_tables: ReadTables, raw_path: str) -> PaperResult:
+    start = time.perf_counter()
+    paper = do_read_paper(read_tables, raw_path)
+    paper.elapsed = time.perf_counter() - start
+    return paper
+
+
+def do_read_paper(read_tables: ReadTables, raw_path: str) -> PaperResult:
+    clean_path, page_range = parse_page_range(raw_path)
+    try:
+        result = read_tables(clean_path, page_range=page_range)
+        return PaperResult(
+            path=clean_path,
+            status="done" if result.tables else "empty",
+            result=result,
+            page_range=page_range,
+        )
+    except ModelUnavailableError:
+        return PaperResult(
+            path=clean_path,
+            status="unavailable",
+            model_unavailable=True,
+            page_range=page_range,
+        )
+    except PartialProcessingError as e:
+        return PaperResult(
+            path=clean_path,
+            status="partial",
+            result=e.partial_result,
+            page_num=e.page_num,
+            model_unavailable=isinstance(e.__cause__, ModelUnavailableError),
+            page_range=page_range,
+            error=traceback.format_exc(),
+        )
+    except Exception:
+        return PaperResult(
+            path=clean_path,
+            status="failed",
+            page_range=page_range,
+            error=traceback.format_exc(),
+        )
+
+
+_worker_read_tables: Optional[ReadTables] = None
+
+
+def init_worker(reader_factory: Callable[..., ReadTables], *factory_args):
+    global _worker_read_tables
+    # workers are stopped by their parent process
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_read_tables = reader_factory(*factory_args)
+
+
+def read_paper_in_worker(raw_path: str) -> PaperResult:
+    assert _worker_read_tables is not None, "worker was not initialized"
+    return read_paper(_worker_read_tables, raw_path).snapshot()
+
+
+def read_papers(
+    raw_paths: Iterable[Optional[str]],
+    read_tables: ReadTables,
+    should_skip: Callable[[str], bool] = lambda _: False,
+    workers: int = 1,
+    use_threads: bool = False,
+    reader_factory: Optional[Callable[..., ReadTables]] = None,
+    factory_args: tuple = (),
+    ordered: bool = True,
+    timeout: Optional[float] = None,
+    max_tasks_per_worker: Optional[int] = None,
+    max_worker_rss: Optional[int] = None,
+    costs: Optional[Mapping[str, int]] = None,
+    max_pending: Optional[int] = None,
+    retries: Optional["RetryQueue"] = None,
+) -> Iterator[PaperResult]:
+    """
+    Read the given papers, yielding one PaperResult per path.
+
+    When workers > 1, papers are sent to a process pool whose workers build
+    their own reader by calling reader_factory(*factory_args), since
+    readers are usually closures that can't be pickled. If use_threads is True,
+    a thread pool that shares read_tables is used instead, which is
+    suitable for readers that mostly wait on model calls.
+
+    When timeout, max_tasks_per_worker or max_worker_rss are given, papers are
+    read in supervised worker processes - even if workers is 1 - so that
+    papers that take longer than timeout seconds are reported as timed out,
+    and workers are recycled after the given number of papers or when their
+    resident memory exceeds the given bytes.
+
+    When costs - e.g. page counts indexed by raw path - are given, papers are
+    dispatched to the pool from the most to the least expensive one.
+
+    Results are yielded in the same order of raw_paths, unless ordered is False,
+    in which case they are yielded as soon as they are ready. At most
+    max_pending papers - by default, twice the number of workers - are
+    submitted to the pool and not yet yielded, so that the results waiting
+    for an earlier paper are bounded. When ordered and dispatched by costs,
+    papers are submitted beyond that bound until the next one to yield is,
+    so that the longest papers may still be buffered meanwhile.
+
+    raw_paths may yield None when no paper is available yet - e.g. when
+    waiting for papers leased by other nodes -, so that the papers that
+    are done meanwhile are yielded, instead of waiting for the next path.
+
+    When retries are given, the papers queued in it while reading are read
+    as soon as they are ready - in between the rest of the papers - and
+    their results yielded as they complete, until no retries are left.
+    The caller is expected to settle every yielded result with retries
+    """
+    supervised = bool(timeout or max_tasks_per_worker or max_worker_rss)
+    if supervised and use_threads:
+        raise ValueError("Threads can't be supervised")
+
+    if workers <= 1 and not supervised:
+        yield from sequential_results(read_tables, raw_paths, should_skip, retries)
+        return
+
+    if use_threads:
+        executor: Executor = ThreadPoolExecutor(max_workers=workers)
+        read = functools.partial(read_paper, read_tables)
+    elif reader_factory is not None and supervised:
+        executor = SupervisedProcessPool(
+            max_workers=max(workers, 1),
+            initializer=init_worker,
+            initargs=(reader_factory, *factory_args),
+            timeout=timeout,
+            max_tasks_per_worker=max_tasks_per_worker,
+            max_worker_rss=max_worker_rss,
+        )
+        read = read_paper_in_worker
+    elif reader_factory is not None:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=default_context(),
+            initializer=init_worker,
+            initargs=(reader_factory, *factory_args),
+        )
+        read = read_paper_in_worker
+    else:
+        raise ValueError("A reader factory is required when using worker processes")
+
+    with executor:
+        if ordered:
+            yield from ordered_results(
+                executor,
+                read,
+                [raw_path for raw_path in raw_paths if raw_path is not None],
+                should_skip,
+                timeout,
+                costs,
+                max_pending or max(workers, 1) * 2,
+                retries,
+            )
+        else:
+            if costs:
+                paths = [raw_path for raw_path in raw_paths if raw_path is not None]
+                raw_paths = [paths[i] for i in longest_first(paths, costs)]
+            yield from unordered_results(
+                executor,
+                read,
+                raw_paths,
+                should_skip,
+                timeout,
+                max_pending or max(workers, 1) * 2,
+                retries,
+            )
+
+
+def sequential_results(
+    read_tables: ReadTables,
+    raw_paths: Iterable[Optional[str]],
+    should_skip: Callable[[str], bool],
+    retries: Optional["RetryQueue"],
+) -> Iterator[PaperResult]:
+    def read_ready_retries():
+        for raw_path in retries.ready() if retries else []:
+            yield read_paper(read_tables, raw_path)
+
+    for raw_path in raw_paths:
+        if raw_path is not None:
+            skipped = skip_result(raw_path, should_skip)
+            yield skipped if skipped else read_paper(read_tables, raw_path)
+        yield from read_ready_retries()
+
+    while retries:
+        retries.wait()
+        yield from read_ready_retries()
+
+
+def ordered_results(
+    executor: Executor,
+    read: Callable[[str], PaperResult],
+    raw_paths: list[str],
+    should_skip: Callable[[str], bool],
+    timeout: Optional[float],
+    costs: Optional[Mapping[str, int]],
+    max_pending: int,
+    retries: Optional["RetryQueue"],
+) -> Iterator[PaperResult]:
+    dispatch = iter(
+        longest_first(raw_paths, costs) if costs else range(len(raw_paths))
+    )
+    pending: dict[int, PaperResult | Future] = {}
+    retried: dict[Future, str] = {}
+
+    for i, raw_path in enumerate(raw_paths):
+        while i not in pending or len(pending) < max_pending:
+            j = next(dispatch, None)
+            if j is None:
+                break
+            skipped = skip_result(raw_paths[j], should_skip)
+            pending[j] = skipped if skipped else executor.submit(read, raw_paths[j])
+
+        # retries are yielded as soon as they are done, regardless of order
+        submit_retries(executor, read, retries, retried)
+        for future in [future for future in retried if future.done()]:
+            yield future_result(future, retried.pop(future), timeout)
+
+        item = pending.pop(i)
+        yield (
+            item
+            if isinstance(item, PaperResult)
+            else future_result(item, raw_path, timeout)
+        )
+
+    yield from completed_results(executor, read, retried, timeout, retries)
+
+
+def unordered_results(
+    executor: Executor,
+    read: Callable[[str], PaperResult],
+    raw_paths: Iterable[Optional[str]],
+    should_skip: Callable[[str], bool],
+    timeout: Optional[float],
+    max_pending: int,
+    retries: Optional["RetryQueue"],
+) -> Iterator[PaperResult]:
+    pending: dict[Future, str] = {}
+    for raw_path in raw_paths:
+        if raw_path is None:
+            submit_retries(executor, read, retries, pending)
+            for future in [future for future in pending if future.done()]:
+                yield future_result(future, pending.pop(future), timeout)
+            continue
+
+        skipped = skip_result(raw_path, should_skip)
+        if skipped:
+            yield skipped
+            continue
+
+        submit_retries(executor, read, retries, pending)
+        while len(pending) >= max_pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future_result(future, pending.pop(future), timeout)
+        pending[executor.submit(read, raw_path)] = raw_path
+
+    yield from completed_results(executor, read, pending, timeout, retries)
+
+
+def submit_retries(
+    executor: Executor,
+    read: Callable[[str], PaperResult],
+    retries: Optional["RetryQueue"],
+    pending: dict[Future, str],
+):
+    for raw_path in retries.ready() if retries else []:
+        pending[executor.submit(read, raw_path)] = raw_path
+
+
+def completed_results(
+    executor: Executor,
+    read: Callable[[str], PaperResult],
+    pending: dict[Future, str],
+    timeout: Optional[float],
+    retries: Optional["RetryQueue"],
+) -> Iterator[PaperResult]:
+    """
+    Yield the results of the pending papers as they complete,
+    submitting the retries queued meanwhile when they are ready
+    """
+    while True:
+        submit_retries(executor, read, retries, pending)
+        if not pending:
+            if not retries:
+                return
+            retries.wait()
+            continue
+
+        done, _ = wait(
+            pending,
+            timeout=retries.next_delay() if retries else None,
+            return_when=FIRST_COMPLETED,
+        )
+        for future in done:
+            yield future_result(future, pending.pop(future), timeout)
+
+
+def future_result(
+    future: Future, raw_path: str, timeout: Optional[float] = None
+) -> PaperResult:
+    """
+    Answers the PaperResult of a future, turning
+    errors raised by the executor itself - like timeouts
+    or dead workers - into PaperResults
+    """
+    clean_path, _ = parse_page_range(raw_path)
+    try:
+        return future.result()
+    except TimeoutError as e:
+        return PaperResult(
+            path=clean_path, status="timeout", error=str(e), elapsed=timeout or 0
+        )
+    except Exception:
+        return PaperResult(
+            path=clean_path, status="failed", error=traceback.format_exc()
+        )
+
+
+def skip_result(
+    raw_path: str, should_skip: Callable[[str], bool]
+) -> Optional[PaperResult]:
+    clean_path, _ = parse_page_range(raw_path)
+    if should_skip(clean_path):
+        return PaperResult(path=clean_path, status="skipped")
+    return None
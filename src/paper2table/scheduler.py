@@ -0,0 +1,74 @@
+"""
+Cost-aware scheduling of papers.
+
+The number of pages of a paper is a cheap estimation of how long
+reading it takes. Page counts are used for dispatching the most expensive
+papers first - so that a long paper given at the end of a
+parallel run doesn't dominate its duration - and for measuring progress
+in pages rather than in papers
+"""
+
+import logging
+from typing import Callable, Iterable, Mapping
+
+from .page_range import parse_page_range
+
+_logger = logging.getLogger("pape2table")
+
+
+def page_count(raw_path: str) -> int:
+    """
+    Answers the number of pages that will be read from the given paper,
+    honouring its page range, if any.
+
+    Papers that can't be opened count as a single page,
+    their errors are reported later by readers
+    """
+    # imported here since pymupdf is not needed for just starting the CLI
+    import pymupdf
+
+    clean_path, page_range = parse_page_range(raw_path)
+    try:
+        with pymupdf.open(clean_path) as doc:
+            pages = doc.page_count
+    except Exception:
+        _logger.debug("Could not count pages of %s", clean_path)
+        return 1
+
+    if page_range:
+        from_page, to_page = page_range
+        pages = min(to_page, pages) - max(from_page, 1) + 1
+    return max(pages, 1)
+
+
+def scan_page_counts(
+    raw_paths: Iterable[str], should_skip: Callable[[str], bool] = lambda _: False
+) -> dict[str, int]:
+    """
+    Answers the page count of each of the given papers, indexed by raw path.
+    Papers that will be skipped are not scanned
+    """
+    return {
+        raw_path: page_count(raw_path)
+        for raw_path in raw_paths
+        if not should_skip(parse_page_range(raw_path)[0])
+    }
+
+
+def longest_first(raw_paths: list[str], costs: Mapping[str, int]) -> list[int]:
+    """
+    Answers the indices of raw_paths sorted by decreasing cost,
+    keeping the given order for papers of equal cost.
+
+    Dispatching papers this way to a pool of workers is the
+    longest-processing-time-first (LPT) heuristic
+    """
+    return sorted(range(len(raw_paths)), key=lambda i: -costs.get(raw_paths[i], 0))
+
+
+def clean_path_costs(costs: Mapping[str, int]) -> dict[str, int]:
+    """
+    Re-index costs by clean path, as reported by PaperResults
+    """
+    return {parse_page_range(raw_path)[0]: cost for raw_path, cost in costs.items()}
+
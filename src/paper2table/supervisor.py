@@ -0,0 +1,219 @@
+"""
+A process pool whose workers are supervised:
+tasks that exceed a deadline get their worker killed,
+and workers are recycled after a number of tasks or when their
+memory grows beyond a threshold
+"""
+
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import traceback
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+_logger = logging.getLogger("pape2table")
+
+
+class WorkerDiedError(RuntimeError):
+    pass
+
+
+class TaskError(RuntimeError):
+    """
+    An error raised by a task inside a worker.
+    Holds the formatted traceback, since exceptions
+    can't always be pickled
+    """
+
+
+def default_context():
+    """
+    Answers the multiprocessing context used for worker processes.
+
+    forkserver is preferred over fork, since workers are started
+    from multi-threaded processes
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def current_rss() -> int:
+    """
+    Answers the resident set size in bytes of the current process.
+    Falls back to the peak RSS on platforms without /proc
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def worker_loop(conn, initializer: Optional[Callable], initargs: tuple):
+    if initializer is not None:
+        initializer(*initargs)
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        fn, args, kwargs = task
+        try:
+            conn.send((True, fn(*args, **kwargs), current_rss()))
+        except BaseException:
+            conn.send((False, TaskError(traceback.format_exc()), current_rss()))
+    conn.close()
+
+
+class SupervisedWorker:
+    def __init__(
+        self,
+        context,
+        initializer: Optional[Callable],
+        initargs: tuple,
+        timeout: Optional[float],
+        max_tasks: Optional[int],
+        max_rss: Optional[int],
+    ):
+        self.context = context
+        self.initializer = initializer
+        self.initargs = initargs
+        self.timeout = timeout
+        self.max_tasks = max_tasks
+        self.max_rss = max_rss
+        self.process = None
+        self.conn = None
+        self.tasks = 0
+
+    def start(self):
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=worker_loop,
+            args=(child_conn, self.initializer, self.initargs),
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def run(self, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        if self.process is None:
+            self.start()
+        assert self.conn is not None and self.process is not None
+
+        self.conn.send((fn, args, kwargs))
+        if not self.conn.poll(self.timeout):
+            pid = self.process.pid
+            self.kill()
+            raise TimeoutError(
+                f"Worker {pid} killed after exceeding {self.timeout} seconds"
+            )
+
+        try:
+            succeeded, value, rss = self.conn.recv()
+        except EOFError:
+            exitcode = self.process.exitcode
+            self.kill()
+            raise WorkerDiedError(f"Worker died with exit code {exitcode}")
+
+        self.tasks += 1
+        if self.should_recycle(rss):
+            _logger.debug(
+                "Recycling worker %i after %i tasks using %i bytes",
+                self.process.pid,
+                self.tasks,
+                rss,
+            )
+            self.stop()
+
+        if succeeded:
+            return value
+        raise value
+
+    def should_recycle(self, rss: int) -> bool:
+        return bool(
+            (self.max_tasks and self.tasks >= self.max_tasks)
+            or (self.max_rss and rss >= self.max_rss)
+        )
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)  # pyright: ignore[reportOptionalMemberAccess]
+            self.process.join(5)
+        except OSError:
+            pass
+        self.kill()
+
+    def kill(self):
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()  # pyright: ignore[reportOptionalMemberAccess]
+        self.process = None
+        self.conn = None
+
+
+class SupervisedProcessPool(Executor):
+    """
+    An Executor that runs each task in one of max_workers worker processes.
+
+    Unlike ProcessPoolExecutor, a task that takes longer than timeout seconds
+    makes its future raise TimeoutError and its worker get killed and replaced.
+    Workers are also replaced after max_tasks_per_worker tasks, or when their
+    resident memory exceeds max_worker_rss bytes.
+
+    Tasks and their results must be picklable
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = (),
+        timeout: Optional[float] = None,
+        max_tasks_per_worker: Optional[int] = None,
+        max_worker_rss: Optional[int] = None,
+    ):
+        self._context = default_context()
+        self._threads = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="supervisor"
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._workers: list[SupervisedWorker] = []
+        self._worker_settings = (
+            initializer,
+            initargs,
+            timeout,
+            max_tasks_per_worker,
+            max_worker_rss,
+        )
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        return self._threads.submit(self._run, fn, args, kwargs)
+
+    def _run(self, fn: Callable, args: tuple, kwargs: dict):
+        worker = getattr(self._local, "worker", None)
+        if worker is None:
+            worker = SupervisedWorker(self._context, *self._worker_settings)
+            self._local.worker = worker
+            with self._lock:
+                self._workers.append(worker)
+        return worker.run(fn, args, kwargs)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self._threads.shutdown(wait=wait, cancel_futures=cancel_futures)
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
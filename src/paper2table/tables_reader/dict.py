@@ -0,0 +1,30 @@
+from . import TablesReader
+
+
+class DictTablesReader:
+    """
+    A TablesReader that wraps an already
+    serialized TablesFile dict.
+
+    Used for moving results across process
+    boundaries, since not all readers results
+    can be pickled
+    """
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    @classmethod
+    def from_reader(cls, reader: TablesReader) -> "DictTablesReader":
+        return cls(reader.to_dict())
+
+    @property
+    def tables(self) -> list:
+        return self.data.get("tables", [])
+
+    @property
+    def citation(self) -> str | None:
+        return self.data.get("citation")
+
+    def to_dict(self) -> dict:
+        return self.data
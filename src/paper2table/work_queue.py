@@ -0,0 +1,250 @@
+"""
+A work queue backed by a shared directory - e.g. on an NFS volume -
+that lets several nodes process the same list of papers without an
+external broker.
+
+A node claims a paper by atomically creating its lease file, and keeps
+it alive by touching it periodically. Leases that are not touched
+for lease_timeout seconds are considered held by a dead node, and can be
+claimed by any other node. Once a paper has been completed,
+a done marker is created for it.
+
+Papers are processed at least once: a node that is too slow to
+refresh its lease may see its paper claimed and processed again by
+another node. The queue directory also records the resultset that
+all the nodes write into
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional
+from uuid import uuid4
+
+from .journal import paper_key
+from .page_range import parse_page_range
+
+_logger = logging.getLogger("pape2table")
+
+DEFAULT_LEASE_TIMEOUT = 300
+
+QUEUE_FILENAME = "queue.json"
+
+
+def default_node_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseQueue:
+    def __init__(
+        self,
+        directory: str,
+        node: Optional[str] = None,
+        lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.directory = directory
+        self.node = node or default_node_name()
+        self.lease_timeout = lease_timeout
+        self.heartbeat_interval = lease_timeout / 3
+        self.poll_interval = min(self.heartbeat_interval, 10)
+        self.clock = clock
+        self.sleep = sleep
+        self.leases_dir = os.path.join(directory, "leases")
+        self.done_dir = os.path.join(directory, "done")
+        self._held: set[str] = set()
+        self._attempted: set[str] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def resultset_uuid(self) -> str:
+        """
+        Answers the uuid of the resultset shared by all the nodes,
+        creating it if this is the first node that uses the queue
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, QUEUE_FILENAME)
+        try:
+            with open(path, "x", encoding="utf-8") as f:
+                json.dump({"uuid": str(uuid4())}, f)
+        except FileExistsError:
+            pass
+
+        # another node may still be writing the file
+        for _ in range(50):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    return json.load(f)["uuid"]
+            except (json.JSONDecodeError, KeyError):
+                self.sleep(0.1)
+        raise ValueError(f"Malformed queue file {path}")
+
+    def lease_path(self, paper_path: str) -> str:
+        return os.path.join(self.leases_dir, f"{paper_key(paper_path)}.lease")
+
+    def done_path(self, paper_path: str) -> str:
+        return os.path.join(self.done_dir, paper_key(paper_path))
+
+    def is_done(self, paper_path: str) -> bool:
+        return os.path.exists(self.done_path(paper_path))
+
+    def claim(self, paper_path: str) -> bool:
+        """
+        Try to acquire the lease of the given paper, answering whether
+        it was acquired. Expired leases are taken over
+        """
+        if self.is_done(paper_path):
+            return False
+
+        os.makedirs(self.leases_dir, exist_ok=True)
+        lease_path = self.lease_path(paper_path)
+        if self.create_lease(lease_path, paper_path):
+            return True
+
+        if not self.is_expired(lease_path):
+            return False
+
+        # only one of the nodes that race for an expired lease
+        # succeeds in moving it away
+        stale_path = f"{lease_path}.{self.node}.stale"
+        try:
+            os.rename(lease_path, stale_path)
+        except FileNotFoundError:
+            return False
+        os.unlink(stale_path)
+        _logger.info("Taking over expired lease of %s", paper_path)
+        return self.create_lease(lease_path, paper_path)
+
+    def create_lease(self, lease_path: str, paper_path: str) -> bool:
+        try:
+            fd = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"node": self.node, "paper": paper_path}, f)
+        with self._lock:
+            self._held.add(lease_path)
+        return True
+
+    def owns(self, lease_path: str) -> bool:
+        """
+        Answers whether the given lease exists and was created by this node,
+        i.e. it wasn't taken over by another node after expiring
+        """
+        try:
+            with open(lease_path, encoding="utf-8") as f:
+                return json.load(f).get("node") == self.node
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+    def is_expired(self, lease_path: str) -> bool:
+        try:
+            return os.stat(lease_path).st_mtime + self.lease_timeout < self.clock()
+        except FileNotFoundError:
+            return True
+
+    def release(self, paper_path: str, completed: bool):
+        """
+        Give up the lease of the given paper,
+        marking it as done if it was completed
+        """
+        if completed:
+            os.makedirs(self.done_dir, exist_ok=True)
+            with open(self.done_path(paper_path), "w", encoding="utf-8") as f:
+                f.write(self.node)
+
+        lease_path = self.lease_path(paper_path)
+        with self._lock:
+            self._held.discard(lease_path)
+        self.remove_lease(lease_path)
+
+    def remove_lease(self, lease_path: str):
+        if not self.owns(lease_path):
+            _logger.debug("Lease %s is not held by this node", lease_path)
+            return
+        try:
+            os.unlink(lease_path)
+        except FileNotFoundError:
+            pass
+
+    def claims(self, raw_paths: Iterable[str]) -> Iterator[Optional[str]]:
+        """
+        Yield the given papers as this node claims them.
+
+        Papers leased by other nodes are checked again after
+        the rest of them, until they are done or their lease expires.
+        Each paper is yielded at most once.
+
+        None is yielded after each wait for the papers leased by other
+        nodes, so that the papers being read by this node can be
+        finished - and their leases released - meanwhile. Otherwise, nodes
+        waiting for each other's papers would never release their own ones
+        """
+        waiting = list(raw_paths)
+        while waiting:
+            still_waiting = []
+            for raw_path in waiting:
+                clean_path, _ = parse_page_range(raw_path)
+                if paper_key(clean_path) in self._attempted or self.is_done(
+                    clean_path
+                ):
+                    continue
+                if self.claim(clean_path):
+                    self._attempted.add(paper_key(clean_path))
+                    yield raw_path
+                else:
+                    still_waiting.append(raw_path)
+
+            waiting = still_waiting
+            if waiting:
+                self.sleep(self.poll_interval)
+                yield None
+
+    def heartbeat(self):
+        with self._lock:
+            held = list(self._held)
+        for lease_path in held:
+            if self.owns(lease_path):
+                try:
+                    os.utime(lease_path)
+                    continue
+                except FileNotFoundError:
+                    pass
+            # the lease expired and was taken over - or released - meanwhile
+            _logger.warning("Lease %s was lost", lease_path)
+            with self._lock:
+                self._held.discard(lease_path)
+
+    def start(self):
+        def run():
+            while not self._stopped.wait(self.heartbeat_interval):
+                self.heartbeat()
+
+        self._heartbeat = threading.Thread(
+            target=run, name="lease-heartbeat", daemon=True
+        )
+        self._heartbeat.start()
+
+    def close(self):
+        """
+        Stop refreshing leases and give up the ones still held,
+        so that other nodes can claim them right away
+        """
+        self._stopped.set()
+        with self._lock:
+            held = list(self._held)
+            self._held.clear()
+        for lease_path in held:
+            self.remove_lease(lease_path)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,83 @@
+import logging
+import queue
+import threading
+from typing import Callable, Optional
+
+from .file import fsync_paths
+
+_logger = logging.getLogger("pape2table")
+
+type WriteTask = Callable[[], Optional[str]]
+"""
+A function that writes something, answering the path
+of the file it wrote, if any
+"""
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """
+    Runs write tasks in a background thread, in the same order they were
+    submitted, so that slow storage doesn't block reading papers.
+
+    At most max_queued tasks wait to be run: submitting more
+    blocks until there is room for them. Written files are flushed to disk
+    in batches, every sync_every files or whenever the queue gets empty.
+
+    An error raised by a task stops the writer - remaining tasks are
+    discarded - and is raised again by subsequent calls to submit and close
+    """
+
+    def __init__(self, max_queued: int = 64, sync_every: int = 32):
+        self.sync_every = sync_every
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queued)
+        self._unsynced: list[str] = []
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, task: WriteTask):
+        self._raise_error()
+        self._queue.put(task)
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            if task is _STOP:
+                break
+            if self._error is not None:
+                continue
+
+            try:
+                path = task()
+                if path:
+                    self._unsynced.append(path)
+                if len(self._unsynced) >= self.sync_every or self._queue.empty():
+                    self.sync()
+            except BaseException as e:
+                _logger.error("Writer failed: %s", e)
+                self._error = e
+        self.sync()
+
+    def sync(self):
+        paths, self._unsynced = self._unsynced, []
+        fsync_paths(paths)
+
+    def close(self):
+        """
+        Wait for all the submitted tasks to be written
+        """
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
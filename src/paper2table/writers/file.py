@@ -1,13 +1,73 @@
 import json
 import os
 import logging
+from typing import Iterable, Optional
+from uuid import uuid4
 
 from paper2table.tables_reader import TablesReader
 
 _logger = logging.getLogger("pape2table")
 
 
-def write_tables(reader: TablesReader, paper_path: str, output_directory: str):
+def write_atomically(path: str, content: str):
+    """
+    Write content to path through a temporary file that then
+    replaces it, so that a crash never leaves a truncated file behind
+    """
+    # unlike mkstemp, open honours the umask
+    tmp_path = os.path.join(
+        os.path.dirname(path), f".{os.path.basename(path)}.{uuid4().hex}.tmp"
+    )
+    try:
+        with open(tmp_path, "x", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def fsync_paths(paths: Iterable[str]):
+    """
+    Flush the given files to disk, and then their directories,
+    so that their renames are durable too
+    """
+    directories = set()
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            continue
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        directories.add(os.path.dirname(path) or ".")
+
+    for directory in directories:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            # not all platforms support syncing directories
+            pass
+        finally:
+            os.close(fd)
+
+
+def write_tables(
+    reader: TablesReader, paper_path: str, output_directory: str
+) -> Optional[str]:
+    """
+    Write the tables of a paper to the output directory,
+    answering the path of the written file, if any
+    """
     tables_path = os.path.join(
         output_directory,
         os.path.basename(paper_path).replace(".pdf", ".tables.json"),
@@ -15,7 +75,7 @@ def write_tables(reader: TablesReader, paper_path: str, output_directory: str):
 
     if not reader.tables:
         _logger.warning(f"no tables could be extracted from {paper_path}")
-        return
+        return None
 
-    with open(tables_path, "w", encoding="utf-8") as f:
-        f.write(json.dumps(reader.to_dict(), ensure_ascii=False))
+    write_atomically(tables_path, json.dumps(reader.to_dict(), ensure_ascii=False))
+    return tables_path
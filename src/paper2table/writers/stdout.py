@@ -1,6 +1,21 @@
 import json
+import sys
 from ..tables_reader import TablesReader
 
 
 def write_tables(tables: TablesReader):
     print(json.dumps(tables.to_dict(), ensure_ascii=False))
+
+
+def write_line(record: dict):
+    """
+    Write a record as a single JSON line,
+    flushing it immediately so that consumers
+    can process it as soon as it is ready
+    """
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def write_tables_line(tables: TablesReader):
+    write_line(tables.to_dict())
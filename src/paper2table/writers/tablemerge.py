@@ -8,7 +8,7 @@ from paper2table.tables_reader import TablesReader
 
 from . import file
 
-type Reader = Literal["agent", "pdfplumber", "camelot", "img2table", "pymupdf"]
+type Reader = Literal["agent", "pdfplumber", "camelot", "img2table", "pymupdf", "fastgrid"]
 
 class TablemergeMetadata:
     reader: Reader
@@ -54,19 +54,28 @@ def load_metadata(output_directory: str, uuid: str) -> dict:
         return json.load(f)
 
 
-def write_tables(
-    tables: TablesReader,
-    paper_path: str,
-    output_directory: str,
-    metadata: TablemergeMetadata,
-):
+def write_metadata(output_directory: str, metadata: TablemergeMetadata) -> str:
+    """
+    Create the resultset directory and its metadata file, unless they
+    already exist, answering the resultset directory
+    """
     tablemerge_path = os.path.join(output_directory, str(metadata.uuid))
     metadata_path = os.path.join(tablemerge_path, "tables.metadata.json")
 
     os.makedirs(tablemerge_path, exist_ok=True)
 
     if not os.path.exists(metadata_path):
-        with open(metadata_path, "w", encoding="utf-8") as f:
-            json.dump(metadata.to_dict(), f, ensure_ascii=False)
+        file.write_atomically(
+            metadata_path, json.dumps(metadata.to_dict(), ensure_ascii=False)
+        )
+    return tablemerge_path
+
 
-    file.write_tables(tables, paper_path, tablemerge_path)
+def write_tables(
+    tables: TablesReader,
+    paper_path: str,
+    output_directory: str,
+    metadata: TablemergeMetadata,
+) -> Optional[str]:
+    tablemerge_path = write_metadata(output_directory, metadata)
+    return file.write_tables(tables, paper_path, tablemerge_path)
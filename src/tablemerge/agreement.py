@@ -10,7 +10,7 @@ class Agreement(Protocol):
 def is_agent_reader(reader: str | None) -> bool:
     if not reader:
         return True
-    if reader in ("pdfplumber", "camelot", "pymupdf"):
+    if reader in ("pdfplumber", "camelot", "pymupdf", "fastgrid"):
         return False
     if reader.startswith("hybrid-"):
         return False
@@ -1,9 +1,25 @@
 import os
 import signal
+from typing import Callable
+
+_exit_callbacks: list[Callable[[], None]] = []
+
+
+def on_sigint(callback: Callable[[], None]):
+    """
+    Register a callback that will be run
+    before exiting due to a SIGINT
+    """
+    _exit_callbacks.append(callback)
 
 
 def do_handle_sigint(_sig, _frame):
     print("\nCancelled")
+    for callback in _exit_callbacks:
+        try:
+            callback()
+        except Exception:
+            pass
     os._exit(1)
 
 
@@ -0,0 +1,224 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from paper2table.cache import (
+    DiskCache,
+    ExtractionCache,
+    LLMCache,
+    LLMCacheMissError,
+    cached_read_tables,
+    file_digest,
+    source_digest,
+)
+from paper2table.mapping import TablesMapping
+from paper2table.readers import agent, hybrid
+from paper2table.readers.pymupdf import read_tables
+
+DEMO_PDF = "./tests/data/demo_table.pdf"
+DEMO_PDF_P10 = "./tests/data/demo_table_p10.pdf"
+
+
+class SpyReader:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, paper_path, mapping=None, page_range=None):
+        self.calls.append((paper_path, mapping, page_range))
+        return read_tables(paper_path)
+
+
+def test_file_digest_depends_on_contents():
+    assert file_digest(DEMO_PDF) == file_digest(DEMO_PDF)
+    assert file_digest(DEMO_PDF) != file_digest(DEMO_PDF_P10)
+
+
+def test_source_digest_is_stable():
+    assert len(source_digest()) == 64
+    assert source_digest() == source_digest()
+
+
+def test_disk_cache_roundtrip(tmp_path):
+    cache = DiskCache(tmp_path, max_size=1024)
+    assert cache.get_bytes("key") is None
+    cache.put_bytes("key", b"value")
+    assert cache.get_bytes("key") == b"value"
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_size=25)
+    cache.put_bytes("first", b"x" * 10)
+    cache.put_bytes("second", b"x" * 10)
+    os.utime(cache.path_for("first"), (1, 1))
+    os.utime(cache.path_for("second"), (2, 2))
+
+    cache.get_bytes("first")
+    cache.put_bytes("third", b"x" * 10)
+
+    assert cache.get_bytes("first") is not None
+    assert cache.get_bytes("second") is None
+    assert cache.get_bytes("third") is not None
+
+
+def test_disk_cache_scans_entries_only_when_full(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path, max_size=100)
+    scans = []
+    entries = cache.entries
+    monkeypatch.setattr(cache, "entries", lambda: scans.append(1) or entries())
+
+    for i in range(9):
+        cache.put_bytes(f"entry{i}", b"x" * 10)
+    assert len(scans) == 1
+
+    cache.put_bytes("entry9", b"x" * 10)
+    cache.put_bytes("entry10", b"x" * 10)
+    assert len(scans) == 2
+    assert sum(size for _, size, _ in cache.stats()) <= 90
+
+
+def test_extraction_cache_key_depends_on_settings():
+    cache = ExtractionCache("unused", max_size=0)
+    key = cache.key(DEMO_PDF, reader="pymupdf", page_range=None)
+    assert key == cache.key(DEMO_PDF, reader="pymupdf", page_range=None)
+    assert key != cache.key(DEMO_PDF, reader="pdfplumber", page_range=None)
+    assert key != cache.key(DEMO_PDF, reader="pymupdf", page_range=[1, 2])
+    assert key != cache.key(DEMO_PDF_P10, reader="pymupdf", page_range=None)
+
+
+def test_cached_read_tables_reads_once(tmp_path):
+    spy = SpyReader()
+    read = cached_read_tables(
+        spy, ExtractionCache(tmp_path, max_size=1024 * 1024), reader="pymupdf"
+    )
+
+    first = read(DEMO_PDF)
+    second = read(DEMO_PDF)
+
+    assert len(spy.calls) == 1
+    assert second.to_dict() == first.to_dict()
+    assert len(second.tables) == len(first.tables)
+
+
+def test_cached_read_tables_distinguishes_page_ranges_and_mappings(tmp_path):
+    spy = SpyReader()
+    read = cached_read_tables(
+        spy, ExtractionCache(tmp_path, max_size=1024 * 1024), reader="pymupdf"
+    )
+    mapping = TablesMapping(tables=[], citation="A citation")
+
+    read(DEMO_PDF)
+    read(DEMO_PDF, page_range=(1, 1))
+    read(DEMO_PDF, mapping)
+    read(DEMO_PDF, mapping)
+
+    assert len(spy.calls) == 3
+
+
+def test_cached_read_tables_refresh_overwrites(tmp_path):
+    spy = SpyReader()
+    cache = ExtractionCache(tmp_path, max_size=1024 * 1024)
+
+    cached_read_tables(spy, cache, reader="pymupdf")(DEMO_PDF)
+    cached_read_tables(spy, cache, refresh=True, reader="pymupdf")(DEMO_PDF)
+    cached_read_tables(spy, cache, reader="pymupdf")(DEMO_PDF)
+
+    assert len(spy.calls) == 2
+
+
+def test_cached_read_tables_does_not_cache_failures(tmp_path):
+    calls = []
+
+    def failing_reader(paper_path, mapping=None, page_range=None):
+        calls.append(paper_path)
+        raise ValueError("broken")
+
+    read = cached_read_tables(failing_reader, ExtractionCache(tmp_path, 1024))
+    for _ in range(2):
+        try:
+            read(DEMO_PDF)
+        except ValueError:
+            pass
+
+    assert len(calls) == 2
+
+
+class SpyRunAgent:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, test_agent, prompt):
+        self.calls += 1
+        return test_agent.run_sync(prompt)
+
+
+def test_llm_cache_records_and_replays_agent_outputs(tmp_path):
+    run_agent = SpyRunAgent()
+    cache = LLMCache(tmp_path)
+
+    first = agent.read_tables(
+        DEMO_PDF, model="test", schema="name:str", run_agent=run_agent, llm_cache=cache
+    )
+    second = agent.read_tables(
+        DEMO_PDF, model="test", schema="name:str", run_agent=run_agent, llm_cache=cache
+    )
+    agent.read_tables(
+        DEMO_PDF_P10,
+        model="test",
+        schema="name:str",
+        run_agent=run_agent,
+        llm_cache=cache,
+    )
+
+    assert run_agent.calls == 2
+    assert second.to_dict() == first.to_dict()
+
+
+def test_llm_cache_replay_fails_on_misses(tmp_path):
+    run_agent = SpyRunAgent()
+    agent.read_tables(
+        DEMO_PDF,
+        model="test",
+        schema="name:str",
+        run_agent=run_agent,
+        llm_cache=LLMCache(tmp_path),
+    )
+
+    replay = LLMCache(tmp_path, replay=True)
+    agent.read_tables(
+        DEMO_PDF, model="test", schema="name:str", run_agent=run_agent, llm_cache=replay
+    )
+    with pytest.raises(LLMCacheMissError):
+        agent.read_tables(
+            DEMO_PDF,
+            model="test",
+            schema="name:str species:str",
+            run_agent=run_agent,
+            llm_cache=replay,
+        )
+    assert run_agent.calls == 1
+
+
+def test_llm_cache_replays_hybrid_mappings(tmp_path):
+    run_agent = SpyRunAgent()
+    cache = LLMCache(tmp_path / "llm")
+    mappings = []
+
+    def fake_reader(path, mapping: TablesMapping):
+        mappings.append(mapping)
+        return mapping
+
+    for _ in range(2):
+        hybrid.read_tables(
+            DEMO_PDF,
+            model="test",
+            schema="name:str species:str",
+            mappings_path=Path(tmp_path / "mappings"),
+            reader=fake_reader,  # pyright: ignore[reportArgumentType]
+            force_mapping_generation=True,
+            run_agent=run_agent,
+            llm_cache=cache,
+        )
+
+    assert run_agent.calls == 1
+    assert mappings[0].tables == mappings[1].tables
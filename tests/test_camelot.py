@@ -0,0 +1,40 @@
+import pymupdf
+
+from paper2table.readers.camelot import choose_flavor, choose_flavors, read_tables
+
+DEMO_PDF = "./tests/data/demo_table.pdf"
+
+
+def test_read_table():
+    result = read_tables(DEMO_PDF)
+
+    assert len(result.tables) == 1
+    assert result.tables[0].page == 1
+    assert result.tables[0].rows[1] == {
+        0: "Sun\x00ower",
+        1: "Helianthus annuus",
+        2: "annuus",
+    }
+
+
+def test_read_tables_within_page_range():
+    assert choose_flavors(DEMO_PDF, (2, 5)) == []
+    assert read_tables(DEMO_PDF, page_range=(2, 5)).tables == []
+
+
+def test_choose_flavor_by_ruling_lines():
+    with pymupdf.open() as doc:
+        prose = doc.new_page()
+        prose.insert_text((50, 50), "Lorem ipsum dolor sit amet")
+
+        rules_only = doc.new_page()
+        for y in (50, 70, 150):
+            rules_only.draw_line((50, y), (400, y))
+
+        grid = doc.new_page()
+        for y in (50, 70, 150):
+            grid.draw_line((50, y), (400, y))
+        for x in (50, 200, 400):
+            grid.draw_line((x, 50), (x, 150))
+
+        assert [choose_flavor(page) for page in doc] == ["stream", "hybrid", "lattice"]
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart
+
+from paper2table.dispatcher import ModelDispatcher, sleeping_runner, total_tokens
+from paper2table.mapping import TablesMapping
+from paper2table.readers import agent, hybrid
+
+DEMO_PDF = "./tests/data/demo_table.pdf"
+
+
+class ConcurrencyProbe:
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    async def respond(self, _messages: list[ModelMessage], _info: AgentInfo):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.05)
+        with self.lock:
+            self.in_flight -= 1
+        return ModelResponse(parts=[TextPart("done")])
+
+
+def test_dispatcher_keeps_at_most_max_concurrency_requests_in_flight():
+    probe = ConcurrencyProbe()
+    test_agent = Agent(FunctionModel(probe.respond))
+
+    with ModelDispatcher(2) as dispatcher:
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            outputs = list(
+                executor.map(
+                    lambda _: dispatcher.run_agent(test_agent, ["hello"]).output,
+                    range(6),
+                )
+            )
+
+    assert outputs == ["done"] * 6
+    assert probe.calls == 6
+    assert probe.max_in_flight == 2
+
+
+def test_dispatcher_settles_token_usage():
+    probe = ConcurrencyProbe()
+    test_agent = Agent(FunctionModel(probe.respond))
+
+    with ModelDispatcher(1, tokens_per_minute=1_000_000) as dispatcher:
+        result = dispatcher.run_agent(test_agent, ["hello"])
+
+    assert dispatcher.limiter.settled_requests == 1
+    assert dispatcher.limiter.settled_tokens == total_tokens(result)
+
+
+def test_sleeping_runner_sleeps_before_calls():
+    probe = ConcurrencyProbe()
+    test_agent = Agent(FunctionModel(probe.respond))
+
+    start = time.monotonic()
+    assert sleeping_runner(0.1)(test_agent, ["hello"]).output == "done"
+    assert time.monotonic() - start >= 0.1
+
+
+def test_agent_reader_uses_given_run_agent():
+    calls = []
+
+    def spy_run_agent(test_agent, prompt):
+        calls.append(prompt)
+        return test_agent.run_sync(prompt)
+
+    result = agent.read_tables(
+        DEMO_PDF, model="test", schema="name:str", run_agent=spy_run_agent
+    )
+    assert len(calls) == 1
+    assert result.to_dict()["tables"] == []
+
+
+def test_hybrid_reader_does_not_call_model_with_existing_mapping():
+    def failing_run_agent(_agent, _prompt):
+        raise AssertionError("model should not be called")
+
+    mappings = []
+
+    def fake_reader(path, mapping: TablesMapping):
+        mappings.append(mapping)
+        return mapping
+
+    hybrid.read_tables(
+        DEMO_PDF,
+        model="test",
+        schema="name:str species:str",
+        mappings_path=Path("tests/data/mappings"),
+        reader=fake_reader,  # pyright: ignore[reportArgumentType]
+        run_agent=failing_run_agent,
+    )
+    assert len(mappings) == 1
+
+
+def test_dispatcher_refunds_tokens_of_failed_requests():
+    async def fail(_messages: list[ModelMessage], _info: AgentInfo):
+        raise RuntimeError("503 UNAVAILABLE")
+
+    failing_agent = Agent(FunctionModel(fail))
+
+    with ModelDispatcher(1, tokens_per_minute=1000) as dispatcher:
+        dispatcher.limiter.settle(0, 400)
+        tokens = dispatcher.limiter.tokens.tokens
+        with pytest.raises(RuntimeError):
+            dispatcher.run_agent(failing_agent, ["hello"])
+
+    assert dispatcher.limiter.tokens.tokens >= tokens
+    assert dispatcher.limiter.settled_requests == 1
@@ -0,0 +1,130 @@
+import numpy as np
+import pymupdf
+import pytest
+
+from paper2table.mapping import ColumnMapping, TableMapping, TablesMapping
+from paper2table.readers.fastgrid import (
+    STRATEGIES,
+    gap_boundaries,
+    group_rows,
+    kmeans_boundaries,
+    open_document,
+    read_tables,
+)
+
+DEMO_PDF = "./tests/data/demo_table.pdf"
+
+FIRST_ROWS = [
+    ["common_name", "scientific_name", "species"],
+    ["Sunflower", "Helianthus annuus", "annuus"],
+    ["Rose", "Rosa gallica", "gallica"],
+]
+
+
+def test_read_table_without_options():
+    result = read_tables(DEMO_PDF)
+
+    assert result.citation == None
+    assert len(result.tables) == 1
+    assert result.tables[0].page == 1
+    assert result.tables[0].rows[:2] == [
+        {"0": "common_name", "1": "scientific_name", "2": "species"},
+        {"0": "Sunflower", "1": "Helianthus annuus", "2": "annuus"},
+    ]
+    assert len(result.tables[0].rows) == 11
+
+
+def test_read_table_with_hints():
+    result = read_tables(DEMO_PDF, "common_name\nscientific_name")
+
+    assert result.tables[0].rows[0] == {
+        "common_name": "Sunflower",
+        "scientific_name": "Helianthus annuus",
+        "species": "annuus",
+    }
+
+
+def test_all_strategies_read_the_demo_table():
+    document = open_document(DEMO_PDF)
+    page = document.page_at(1)
+
+    candidates = list(page.extract_tables_candidates(["kmeans"]))
+
+    assert [strategy for strategy, _ in candidates] == ["kmeans"] + [
+        strategy for strategy in STRATEGIES if strategy != "kmeans"
+    ]
+    for _, tables in candidates:
+        assert len(tables) == 1
+        assert tables[0].rows[:3] == FIRST_ROWS
+    document.close()
+
+
+def test_read_table_with_mapping():
+    result = read_tables(
+        DEMO_PDF,
+        mapping=TablesMapping(
+            tables=[
+                TableMapping(
+                    title="plants",
+                    header_mode="all_pages",
+                    first_page=1,
+                    last_page=1,
+                    column_mappings=[
+                        ColumnMapping(from_column_number=1, to_column_name="name")
+                    ],
+                )
+            ],
+            citation="A citation",
+        ),
+    )
+
+    assert result.citation == "A citation"
+    assert result.tables[0].rows[:2] == [
+        {"name": "Helianthus annuus"},
+        {"name": "Rosa gallica"},
+    ]
+
+
+def test_prose_is_not_read_as_tables(tmp_path):
+    path = str(tmp_path / "prose.pdf")
+    with pymupdf.open() as doc:
+        page = doc.new_page()
+        text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 10
+        page.insert_textbox(pymupdf.Rect(50, 50, 280, 800), text)
+        page.insert_textbox(pymupdf.Rect(310, 50, 550, 800), text)
+        doc.save(path)
+
+    assert read_tables(path).tables == []
+
+
+def test_group_rows_by_vertical_center():
+    boxes = np.array(
+        [
+            [50, 10, 60, 20],
+            [10, 11, 20, 21],
+            [10, 30, 20, 40],
+        ],
+        dtype=np.float64,
+    )
+
+    assert [row.tolist() for row in group_rows(boxes)] == [[1, 0], [2]]
+
+
+def test_gap_and_kmeans_boundaries_split_columns():
+    boxes = np.array(
+        [[0, row * 10, 20, row * 10 + 8] for row in range(3)]
+        + [[50, row * 10, 70, row * 10 + 8] for row in range(3)],
+        dtype=np.float64,
+    )
+    rows = group_rows(boxes)
+
+    assert gap_boundaries(boxes, 0, 70).tolist() == [35.0]
+    assert kmeans_boundaries(boxes, rows).tolist() == [35.0]
+
+
+def test_read_unreadable_pdf_raises(tmp_path):
+    path = tmp_path / "bad.pdf"
+    path.write_bytes(b"%PDF-1.4 garbage")
+
+    with pytest.raises(pymupdf.FileDataError):
+        read_tables(str(path))
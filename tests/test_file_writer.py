@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+from uuid import UUID
+
+import pytest
+
+from paper2table.tables_reader.dict import DictTablesReader
+from paper2table.writers import file, tablemerge
+from paper2table.writers.background import BackgroundWriter
+from paper2table.writers.tablemerge import TablemergeMetadata
+
+TABLES = {"tables": [{"rows": [{"0": "a"}], "page": 1}], "citation": None}
+
+
+def test_write_atomically_replaces_file(tmp_path):
+    path = str(tmp_path / "a.tables.json")
+    file.write_atomically(path, "old")
+    file.write_atomically(path, "new")
+
+    assert os.listdir(tmp_path) == ["a.tables.json"]
+    assert (tmp_path / "a.tables.json").read_text() == "new"
+
+
+def test_write_atomically_keeps_previous_file_on_failure(tmp_path, monkeypatch):
+    path = str(tmp_path / "a.tables.json")
+    file.write_atomically(path, "old")
+
+    def failing_replace(*_):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        file.write_atomically(path, "new")
+
+    assert os.listdir(tmp_path) == ["a.tables.json"]
+    assert (tmp_path / "a.tables.json").read_text() == "old"
+
+
+def test_write_tables_answers_written_path(tmp_path):
+    path = file.write_tables(DictTablesReader(TABLES), "papers/a.pdf", str(tmp_path))
+
+    assert path == str(tmp_path / "a.tables.json")
+    assert json.loads((tmp_path / "a.tables.json").read_text()) == TABLES
+    assert file.write_tables(DictTablesReader({"tables": []}), "b.pdf", str(tmp_path)) is None
+
+
+def test_write_metadata_only_once(tmp_path):
+    metadata = TablemergeMetadata(
+        reader="pymupdf", model=None, uuid=UUID("a7e1f3a0-8a2e-4c5e-9d42-1c7f0a3d2b11")
+    )
+    resultset_dir = tablemerge.write_metadata(str(tmp_path), metadata)
+    metadata_path = os.path.join(resultset_dir, "tables.metadata.json")
+    os.utime(metadata_path, (0, 0))
+
+    assert tablemerge.write_metadata(str(tmp_path), metadata) == resultset_dir
+    assert os.path.getmtime(metadata_path) == 0
+    assert json.loads(open(metadata_path).read())["reader"] == "pymupdf"
+
+
+def test_fsync_paths_ignores_missing_files(tmp_path):
+    (tmp_path / "a").write_text("a")
+    file.fsync_paths([str(tmp_path / "a"), str(tmp_path / "missing")])
+
+
+def test_background_writer_runs_tasks_in_order():
+    written = []
+    with BackgroundWriter(max_queued=2) as writer:
+        for i in range(10):
+            writer.submit(lambda i=i: written.append(i))
+    assert written == list(range(10))
+
+
+def test_background_writer_syncs_written_files(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(
+        "paper2table.writers.background.fsync_paths",
+        lambda paths: synced.extend(paths),
+    )
+    gate = threading.Event()
+
+    def write(name):
+        gate.wait(5)
+        path = str(tmp_path / name)
+        file.write_atomically(path, name)
+        return path
+
+    with BackgroundWriter(sync_every=2) as writer:
+        for name in ["a", "b", "c"]:
+            writer.submit(lambda name=name: write(name))
+        gate.set()
+
+    assert sorted(synced) == [str(tmp_path / name) for name in ["a", "b", "c"]]
+
+
+def test_background_writer_raises_task_errors():
+    writer = BackgroundWriter()
+
+    def failing_task():
+        raise OSError("disk full")
+
+    writer.submit(failing_task)
+    with pytest.raises(OSError):
+        writer.close()
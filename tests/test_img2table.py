@@ -0,0 +1,55 @@
+import pymupdf
+
+from paper2table.readers.img2table import (
+    Img2TableDocument,
+    read_tables,
+    split_scanned_pages,
+)
+
+DEMO_PDF = "./tests/data/demo_table.pdf"
+
+
+def test_read_table_from_text_layer():
+    result = read_tables(DEMO_PDF)
+
+    assert len(result.tables) == 1
+    assert result.tables[0].page == 1
+    assert result.tables[0].rows[:2] == [
+        {"0": "common_name", "1": "scientific_name", "2": "species"},
+        {"0": "Sunflower", "1": "Helianthus annuus", "2": "annuus"},
+    ]
+
+
+def test_split_scanned_pages(tmp_path):
+    path = str(tmp_path / "mixed.pdf")
+    with pymupdf.open() as doc:
+        doc.new_page().insert_text((50, 50), "Table 1. Some born-digital page")
+        pixmap = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 20, 20), False)
+        doc.new_page().insert_image(pymupdf.Rect(50, 50, 250, 250), pixmap=pixmap)
+        doc.save(path)
+
+    assert split_scanned_pages(path) == ([0], [1])
+
+
+def test_pages_are_read_in_windows(tmp_path):
+    path = str(tmp_path / "long.pdf")
+    with pymupdf.open(DEMO_PDF) as demo, pymupdf.open() as doc:
+        for _ in range(3):
+            doc.insert_pdf(demo)
+        doc.save(path)
+
+    document = Img2TableDocument(path, pages_per_window=2)
+    rows = []
+    for page in document.pages:
+        assert set(document.tables) <= {page.page, page.page - 1, page.page + 1}
+        rows.append(
+            [
+                table.to_dataframe([], False).values.tolist()
+                for table in page.extract_tables()
+            ]
+        )
+    document.close()
+
+    assert document.tables == {}
+    assert [len(tables) for tables in rows] == [1, 1, 1]
+    assert rows[0] == rows[1] == rows[2]
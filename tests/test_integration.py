@@ -93,7 +93,6 @@ def test_camelot_cli():
                 "table_fragments": [
                     {
                         "rows": [
-                            {"0": "This is an interesting table:", "1": "", "2": ""},
                             {
                                 "0": "common_name",
                                 "1": "scienti\x00c_name",
@@ -0,0 +1,64 @@
+import json
+
+from paper2table.journal import JOURNAL_FILENAME, RunJournal, is_completed
+from paper2table.runner import PaperResult
+
+
+def test_load_missing_journal(tmp_path):
+    assert RunJournal(str(tmp_path)).load() == {}
+
+
+def test_record_and_load(tmp_path):
+    journal = RunJournal(str(tmp_path / "resultset"))
+    journal.record(PaperResult(path="papers/a.pdf", status="done", elapsed=1.23456))
+    journal.record(
+        PaperResult(path="papers/b.pdf", status="partial", page_num=4, elapsed=2)
+    )
+    journal.close()
+
+    records = RunJournal(str(tmp_path / "resultset")).load()
+    assert records["a.pdf"]["status"] == "done"
+    assert records["a.pdf"]["path"] == "papers/a.pdf"
+    assert records["a.pdf"]["elapsed"] == 1.235
+    assert "page_num" not in records["a.pdf"]
+    assert records["b.pdf"]["status"] == "partial"
+    assert records["b.pdf"]["page_num"] == 4
+
+
+def test_load_keeps_last_record_of_each_paper(tmp_path):
+    journal = RunJournal(str(tmp_path))
+    journal.record(PaperResult(path="a.pdf", status="unavailable"))
+    journal.record(PaperResult(path="a.pdf", status="done"))
+    journal.close()
+
+    assert RunJournal(str(tmp_path)).load()["a.pdf"]["status"] == "done"
+
+
+def test_journal_is_append_only(tmp_path):
+    first = RunJournal(str(tmp_path))
+    first.record(PaperResult(path="a.pdf", status="done"))
+    first.close()
+    second = RunJournal(str(tmp_path))
+    second.record(PaperResult(path="b.pdf", status="empty"))
+    second.close()
+
+    lines = (tmp_path / JOURNAL_FILENAME).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["paper"] for line in lines] == ["a.pdf", "b.pdf"]
+
+
+def test_load_ignores_truncated_lines(tmp_path):
+    (tmp_path / JOURNAL_FILENAME).write_text(
+        '{"paper": "a.pdf", "status": "done"}\n{"paper": "b.pdf", "sta',
+        encoding="utf-8",
+    )
+    assert list(RunJournal(str(tmp_path)).load()) == ["a.pdf"]
+
+
+def test_is_completed():
+    assert not is_completed(None)
+    assert is_completed({"status": "done"})
+    assert is_completed({"status": "empty"})
+    assert is_completed({"status": "failed"})
+    assert not is_completed({"status": "failed"}, retry_failed=True)
+    assert not is_completed({"status": "partial"})
+    assert not is_completed({"status": "unavailable"})
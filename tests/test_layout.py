@@ -0,0 +1,26 @@
+import numpy as np
+import pymupdf
+
+from paper2table.readers.layout import find_rulings, gap_breaks
+
+
+def test_find_rulings():
+    with pymupdf.open() as doc:
+        page = doc.new_page()
+        page.draw_line((50, 100), (300, 100))
+        page.draw_line((50, 100), (50, 200))
+        page.draw_line((50, 300), (55, 300))
+        page.draw_rect(pymupdf.Rect(100, 400, 200, 450))
+
+        horizontal, vertical = find_rulings(page)
+
+    assert sorted(horizontal[:, 0].tolist()) == [100, 400, 450]
+    assert sorted(vertical[:, 0].tolist()) == [50, 100, 200]
+
+
+def test_gap_breaks():
+    starts = np.array([0, 12, 40, 55])
+    ends = np.array([10, 30, 50, 60])
+
+    assert gap_breaks(starts, ends).tolist() == [2]
+    assert gap_breaks(starts[:1], ends[:1]).tolist() == []
@@ -0,0 +1,74 @@
+import numpy as np
+import pymupdf
+import pytest
+
+from paper2table.readers import agent
+from paper2table.readers.payload import PdfSlimmer, read_payload, slim_pdf
+
+DEMO_PDF = "./tests/data/demo_table.pdf"
+
+
+@pytest.fixture
+def figure_pdf(tmp_path) -> str:
+    """
+    The demo table, along with a noisy 1500x1500 pixels
+    image drawn in a 250x250 points box - i.e. at 432 DPI
+    """
+    path = str(tmp_path / "figure.pdf")
+    noise = np.random.default_rng(0).integers(0, 256, (1500, 1500, 3), dtype=np.uint8)
+    with pymupdf.open(DEMO_PDF) as doc:
+        pixmap = pymupdf.Pixmap(pymupdf.csRGB, 1500, 1500, noise.tobytes(), False)
+        doc[0].insert_image(pymupdf.Rect(50, 450, 300, 700), pixmap=pixmap)
+        doc.save(path)
+    return path
+
+
+def page_text(data: bytes) -> str:
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        return doc[0].get_text()
+
+
+def test_slim_pdf_downsamples_images_and_keeps_text(figure_pdf):
+    data = read_payload(figure_pdf)
+    slim = slim_pdf(data, image_dpi=150)
+
+    assert len(slim) < len(data) / 5
+    assert slim == slim_pdf(data, image_dpi=150)
+    assert page_text(slim) == page_text(data)
+    with pymupdf.open(stream=slim, filetype="pdf") as doc:
+        [image] = doc[0].get_images()
+        assert image[2] < 1500
+
+
+def test_slim_pdf_drops_images(figure_pdf):
+    data = read_payload(figure_pdf)
+    dropped = slim_pdf(data, drop_images=True)
+
+    assert len(dropped) < len(slim_pdf(data, image_dpi=150))
+    assert page_text(dropped) == page_text(data)
+
+
+def test_slimmer_keeps_pdfs_that_cant_be_made_smaller():
+    slimmer = PdfSlimmer()
+
+    assert slimmer(DEMO_PDF, b"not a pdf") == b"not a pdf"
+    assert len(read_payload(DEMO_PDF, slimmer)) <= len(read_payload(DEMO_PDF))
+
+
+def test_agent_reader_sends_slimmed_pdf(figure_pdf):
+    sizes = []
+
+    def spy_run_agent(test_agent, prompt):
+        sizes.append(len(prompt[0].data))
+        return test_agent.run_sync(prompt)
+
+    agent.read_tables(
+        figure_pdf,
+        model="test",
+        schema="name:str",
+        run_agent=spy_run_agent,
+        slimmer=PdfSlimmer(),
+    )
+
+    assert sizes == [len(read_payload(figure_pdf, PdfSlimmer()))]
+    assert sizes[0] < len(read_payload(figure_pdf))
@@ -1,8 +1,19 @@
+import json
+import shutil
+
+import pdfplumber
 import pytest
+from pdfminer.pdfparser import PDFSyntaxError
 
+from paper2table.cache import RepairCache
 from paper2table.mapping import ColumnMapping, TableMapping, TablesMapping
 from paper2table.readers.pdfplumber import (
+    PageLayout,
+    PDFPlumberDocument,
+    PDFPlumberPage,
+    open_document,
     read_tables,
+    repair_counts,
 )
 
 
@@ -399,3 +410,109 @@ def test_read_table_with_mapping_and_page_offset_out_of_bounds():
 
     assert result.citation == "A citation"
     assert len(result.tables) == 0
+
+
+def test_tables_candidates_match_pdfplumber_extraction():
+    with pdfplumber.open("./tests/data/demo_table.pdf") as pdf:
+        page = PDFPlumberPage(pdf.pages[0])
+        candidates = [
+            (settings_id, [table.rows for table in tables])
+            for settings_id, tables in page.extract_tables_candidates()
+        ]
+
+        assert candidates == [
+            (json.dumps(settings), pdf.pages[0].extract_tables(settings))
+            for settings in page.generate_pdfplumber_settings()
+        ]
+
+
+def test_page_layout_reuses_words_and_edges():
+    with pdfplumber.open("./tests/data/demo_table.pdf") as pdf:
+        layout = PageLayout(pdf.pages[0])
+        for min_words in [5, 3, 1]:
+            layout.extract_tables(
+                {
+                    "vertical_strategy": "text",
+                    "horizontal_strategy": "text",
+                    "min_words_vertical": min_words,
+                }
+            )
+
+        assert len(layout._words) == 1
+        assert len(layout._edges) == 4
+
+
+def test_closing_page_releases_its_layout():
+    with pdfplumber.open("./tests/data/demo_table.pdf") as pdf:
+        document = PDFPlumberDocument(pdf)
+        page = document.page_at(1)
+        page.extract_tables()
+        assert hasattr(page.page, "_layout")
+
+        page.close()
+
+        assert not hasattr(page.page, "_layout")
+        assert len(page.extract_tables()) == 1
+        with pytest.raises(IndexError):
+            document.page_at(2)
+
+
+def test_open_document_doesnt_repair_well_formed_pdfs(monkeypatch):
+    def fail_repair(*args, **kwargs):
+        raise AssertionError("Unexpected repair")
+
+    monkeypatch.setattr(pdfplumber, "repair", fail_repair)
+
+    document = open_document("./tests/data/demo_table.pdf")
+    assert document.page_count == 1
+    document.close()
+
+
+def test_open_document_repairs_malformed_pdfs_once(monkeypatch, tmp_path):
+    repairs = []
+
+    def fake_repair(path_or_fp, outfile=None, **kwargs):
+        repairs.append(path_or_fp)
+        shutil.copy("./tests/data/demo_table.pdf", outfile)
+
+    monkeypatch.setattr(pdfplumber, "repair", fake_repair)
+    malformed = tmp_path / "malformed.pdf"
+    malformed.write_bytes(b"not a pdf")
+    cache = RepairCache(tmp_path / "cache", max_size=1024 * 1024)
+    counts = dict(repair_counts)
+
+    for _ in range(2):
+        document = open_document(str(malformed), repair_cache=cache)
+        assert document.page_count == 1
+        document.close()
+
+    assert repairs == [str(malformed)]
+    assert repair_counts["repaired"] - counts.get("repaired", 0) == 2
+    assert repair_counts["cached"] - counts.get("cached", 0) == 1
+
+
+def test_document_is_repaired_when_a_page_cant_be_parsed(monkeypatch):
+    objects = pdfplumber.page.Page.objects
+    errors = [PDFSyntaxError("Malformed content stream")]
+
+    def malformed_objects(page):
+        if errors:
+            raise errors.pop()
+        return objects.fget(page)
+
+    monkeypatch.setattr(pdfplumber.page.Page, "objects", property(malformed_objects))
+    repairs = []
+
+    def repair():
+        repairs.append(True)
+        return pdfplumber.open("./tests/data/demo_table.pdf")
+
+    document = PDFPlumberDocument(
+        pdfplumber.open("./tests/data/demo_table.pdf"), repair=repair
+    )
+    page = document.page_at(1)
+
+    assert repairs == [True]
+    assert len(page.extract_tables()) == 1
+    assert document.repair is None
+    document.close()
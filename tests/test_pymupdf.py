@@ -1,9 +1,16 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pymupdf
 import pytest
 
 from paper2table.mapping import ColumnMapping, TableMapping, TablesMapping
+from paper2table.readers import document
 from paper2table.readers.pymupdf import (
+    PyMuPDFDocument,
+    open_document,
     read_tables,
 )
+from paper2table.supervisor import default_context
 
 def test_read_table_without_options():
     result = read_tables("./tests/data/demo_table.pdf")
@@ -388,3 +395,45 @@ def test_read_table_with_mapping_and_page_offset_out_of_bounds():
 
     assert result.citation == "A citation"
     assert len(result.tables) == 0
+
+
+def test_document_loads_pages_on_demand():
+    with pymupdf.open("./tests/data/demo_table.pdf") as pdf:
+        document = PyMuPDFDocument(pdf)
+
+        assert document.page_count == 1
+        assert document.page_at(1).page_number == 1
+        assert [page.page_number for page in document.pages] == [1]
+        with pytest.raises(IndexError):
+            document.page_at(2)
+        with pytest.raises(IndexError):
+            document.page_at(0)
+
+
+def test_read_tables_with_page_executor_keeps_page_order(tmp_path):
+    path = str(tmp_path / "five_tables.pdf")
+    with pymupdf.open() as doc, pymupdf.open("./tests/data/demo_table.pdf") as demo:
+        for _ in range(5):
+            doc.insert_pdf(demo)
+        doc.save(path)
+
+    with ProcessPoolExecutor(max_workers=2, mp_context=default_context()) as executor:
+        result = document.read_tables(
+            path,
+            read_document=open_document,
+            page_executor=executor,
+            pages_per_task=2,
+        )
+
+    assert [table.page for table in result.tables] == [1, 2, 3, 4, 5]
+    assert [table.rows for table in result.tables] == [
+        table.rows for table in read_tables(path).tables
+    ]
+
+
+def test_read_unreadable_pdf_raises(tmp_path):
+    path = tmp_path / "bad.pdf"
+    path.write_bytes(b"%PDF-1.4 garbage")
+
+    with pytest.raises(pymupdf.FileDataError):
+        read_tables(str(path))
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from paper2table.rate_limit import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_starts_full():
+    bucket = TokenBucket(10, clock=FakeClock())
+    assert bucket.delay(10) == 0
+
+
+def test_bucket_delay_when_empty():
+    clock = FakeClock()
+    bucket = TokenBucket(60, period=60, clock=clock)
+    bucket.charge(60)
+    assert bucket.delay(1) == pytest.approx(1)
+    clock.now = 0.5
+    assert bucket.delay(1) == pytest.approx(0.5)
+
+
+def test_bucket_refills_up_to_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(10, period=10, clock=clock)
+    bucket.charge(5)
+    clock.now = 100
+    bucket.refill()
+    assert bucket.tokens == 10
+
+
+def test_bucket_caps_requested_amount_to_capacity():
+    bucket = TokenBucket(10, clock=FakeClock())
+    assert bucket.delay(1000) == 0
+
+
+def test_bucket_debt_delays_acquisition():
+    clock = FakeClock()
+    bucket = TokenBucket(10, period=10, clock=clock)
+    bucket.charge(20)
+    assert bucket.delay(0) == pytest.approx(10)
+
+
+def test_bucket_rejects_non_positive_capacity():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_limiter_without_limits_never_waits():
+    limiter = RateLimiter()
+    assert limiter.delay(1000) == 0
+    assert asyncio.run(limiter.acquire()) == 0
+
+
+def test_limiter_estimates_tokens_from_settled_requests():
+    limiter = RateLimiter(tokens_per_minute=1000, clock=FakeClock())
+    limiter.settle(0, 100)
+    limiter.settle(0, 300)
+    assert limiter.estimate_tokens() == 200
+
+
+def test_limiter_settle_charges_difference():
+    limiter = RateLimiter(tokens_per_minute=1000, clock=FakeClock())
+    limiter.settle(100, 400)
+    assert limiter.tokens.tokens == 700
+
+
+def test_limiter_throttles_by_requests_per_minute():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=2, clock=clock)
+
+    async def acquire_all():
+        await limiter.acquire()
+        await limiter.acquire()
+
+    asyncio.run(acquire_all())
+    assert limiter.delay(0) == pytest.approx(30)
@@ -0,0 +1,169 @@
+import threading
+
+import pymupdf
+
+from paper2table.readers import split_pages
+from paper2table.readers.errors import ModelUnavailableError
+from paper2table.retry import RetryQueue, resume_path
+from paper2table.runner import PaperResult, read_papers
+from paper2table.tables_reader.dict import DictTablesReader
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def retry_queue(clock: FakeClock, **kwargs) -> RetryQueue:
+    return RetryQueue(
+        base_delay=10, clock=clock, sleep=clock.sleep, jitter=lambda: 1.0, **kwargs
+    )
+
+
+def page_table(page: int) -> dict:
+    return {"table_fragments": [{"rows": [{"a": str(page)}], "page": page}]}
+
+
+class FlakyModel:
+    """
+    A split-pages page reader that is unavailable
+    the first times it reads the given physical pages
+    """
+
+    def __init__(self, pdf_path: str, unavailable: dict[int, int]):
+        self.pdf_path = pdf_path
+        self.unavailable = dict(unavailable)
+        self.pages_read = []
+
+    def read_tables(self, paper_path, page_range=None):
+        first_page = page_range[0] if page_range else 1
+        offset = iter(range(first_page, 1000))
+
+        def read_page(path):
+            page = next(offset)
+            if self.unavailable.get(page, 0) > 0:
+                self.unavailable[page] -= 1
+                raise ModelUnavailableError("503 UNAVAILABLE")
+            self.pages_read.append(page)
+            return DictTablesReader({"tables": [page_table(1)], "citation": None})
+
+        return split_pages.read_tables(
+            paper_path, read_page, page_range=page_range, page_size=1
+        )
+
+
+def write_pdf(path, pages: int) -> str:
+    with pymupdf.open() as doc:
+        for _ in range(pages):
+            doc.new_page()
+        doc.save(path)
+    return str(path)
+
+
+def read_with_retries(queue: RetryQueue, paths: list[str], read_tables, **kwargs):
+    return list(queue.settled(read_papers(paths, read_tables, retries=queue, **kwargs)))
+
+
+def test_unavailable_papers_are_retried_with_exponential_backoff():
+    clock = FakeClock()
+    queue = retry_queue(clock)
+    attempts = []
+
+    def read_tables(paper_path, page_range=None):
+        attempts.append((paper_path, clock.now))
+        if len(attempts) < 4:
+            raise ModelUnavailableError("503 UNAVAILABLE")
+        return DictTablesReader({"tables": [], "citation": None})
+
+    papers = read_with_retries(queue, ["paper.pdf"], read_tables)
+
+    assert [paper.status for paper in papers] == ["empty"]
+    assert attempts == [
+        ("paper.pdf", 0),
+        ("paper.pdf", 10),
+        ("paper.pdf", 30),
+        ("paper.pdf", 70),
+    ]
+    assert len(queue) == 0
+
+
+def test_retries_are_bounded_by_budget_and_attempts():
+    clock = FakeClock()
+    queue = retry_queue(clock, budget=3, max_attempts=2)
+
+    def unavailable(paper_path, page_range=None):
+        raise ModelUnavailableError("503 UNAVAILABLE")
+
+    papers = read_with_retries(queue, ["a.pdf", "b.pdf"], unavailable)
+
+    assert sorted(paper.path for paper in papers) == ["a.pdf", "b.pdf"]
+    assert [paper.status for paper in papers] == ["unavailable", "unavailable"]
+    assert queue.budget == 0
+    assert not queue.defer(PaperResult("c.pdf", "unavailable", model_unavailable=True))
+
+
+def test_retries_are_read_by_the_workers_pool():
+    queue = RetryQueue(base_delay=0.01, jitter=lambda: 1.0)
+    threads = []
+
+    def read_tables(paper_path, page_range=None):
+        threads.append(threading.current_thread())
+        if len(threads) < 2:
+            raise ModelUnavailableError("503 UNAVAILABLE")
+        return DictTablesReader({"tables": [], "citation": None})
+
+    for ordered in [True, False]:
+        threads.clear()
+        papers = read_with_retries(
+            queue,
+            ["paper.pdf"],
+            read_tables,
+            workers=2,
+            use_threads=True,
+            ordered=ordered,
+        )
+
+        assert [paper.status for paper in papers] == ["empty"]
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+
+
+def test_failures_other_than_unavailability_are_not_retried():
+    queue = retry_queue(FakeClock())
+
+    assert not queue.defer(PaperResult("paper.pdf", "failed"))
+    assert not queue.defer(PaperResult("paper.pdf", "partial", page_num=2))
+    assert not queue.defer(PaperResult("paper.pdf", "done"))
+
+
+def test_resume_path():
+    assert resume_path(PaperResult("a.pdf", "unavailable")) == "a.pdf"
+    assert (
+        resume_path(PaperResult("a.pdf", "unavailable", page_range=(2, 5)))
+        == "a.pdf:2:5"
+    )
+    assert (
+        resume_path(PaperResult("a.pdf", "partial", page_num=3, page_range=(2, 5)))
+        == "a.pdf:3:5"
+    )
+
+
+def test_partial_papers_are_resumed_from_the_failed_page(tmp_path):
+    pdf_path = write_pdf(tmp_path / "paper.pdf", 4)
+    model = FlakyModel(pdf_path, unavailable={3: 2})
+    clock = FakeClock()
+    queue = retry_queue(clock)
+
+    papers = read_with_retries(queue, [pdf_path], model.read_tables)
+
+    assert [paper.status for paper in papers] == ["done"]
+    assert model.pages_read == [1, 2, 3, 4]
+    assert [
+        table["table_fragments"][0]["page"] for table in papers[0].result.tables
+    ] == [1, 2, 3, 4]
@@ -0,0 +1,189 @@
+from paper2table.readers.errors import ModelUnavailableError, PartialProcessingError
+from paper2table.runner import PaperResult, read_paper, read_papers
+from paper2table.tables_reader.dict import DictTablesReader
+
+DEMO_PDF = "./tests/data/demo_table.pdf"
+
+
+class FakeTablesReader:
+    def __init__(self, tables, citation=None):
+        self.tables = tables
+        self.citation = citation
+
+    def to_dict(self):
+        return {"tables": self.tables, "citation": self.citation}
+
+
+def fake_read_tables(paper_path, page_range=None):
+    return FakeTablesReader(
+        tables=[{"table_fragments": [{"rows": [], "page": 1}]}],
+        citation=f"{paper_path} {page_range}",
+    )
+
+
+def build_fake_reader(_args):
+    return fake_read_tables
+
+
+def test_read_paper_done():
+    result = read_paper(fake_read_tables, "paper.pdf:2:3")
+    assert result.path == "paper.pdf"
+    assert result.status == "done"
+    assert result.result.citation == "paper.pdf (2, 3)"
+
+
+def test_read_paper_empty():
+    result = read_paper(lambda path, page_range: FakeTablesReader([]), "paper.pdf")
+    assert result.status == "empty"
+
+
+def test_read_paper_failed():
+    def failing_reader(path, page_range):
+        raise ValueError("broken pdf")
+
+    result = read_paper(failing_reader, "paper.pdf")
+    assert result.status == "failed"
+    assert result.result is None
+    assert "broken pdf" in result.error
+
+
+def test_read_paper_unavailable():
+    def unavailable_reader(path, page_range):
+        raise ModelUnavailableError("503")
+
+    result = read_paper(unavailable_reader, "paper.pdf")
+    assert result.status == "unavailable"
+    assert result.model_unavailable
+
+
+def test_read_paper_partial():
+    partial = FakeTablesReader([])
+
+    def partial_reader(path, page_range):
+        try:
+            raise ModelUnavailableError("503")
+        except ModelUnavailableError as e:
+            raise PartialProcessingError(3, partial, e) from e
+
+    result = read_paper(partial_reader, "paper.pdf")
+    assert result.status == "partial"
+    assert result.page_num == 3
+    assert result.result is partial
+    assert result.model_unavailable
+
+
+def test_snapshot_converts_result_to_dict_reader():
+    result = read_paper(fake_read_tables, "paper.pdf").snapshot()
+    assert isinstance(result.result, DictTablesReader)
+    assert result.result.to_dict() == fake_read_tables("paper.pdf").to_dict()
+
+
+def test_read_papers_sequentially_skips():
+    results = list(
+        read_papers(
+            ["a.pdf", "b.pdf:1:2"],
+            fake_read_tables,
+            should_skip=lambda path: path == "a.pdf",
+        )
+    )
+    assert [(r.path, r.status) for r in results] == [
+        ("a.pdf", "skipped"),
+        ("b.pdf", "done"),
+    ]
+
+
+def test_read_papers_with_workers_keeps_order_and_results():
+    paths = [f"paper{i}.pdf" for i in range(6)]
+    sequential = list(read_papers(paths, fake_read_tables))
+    parallel = list(
+        read_papers(
+            paths,
+            fake_read_tables,
+            should_skip=lambda path: path == "paper2.pdf",
+            workers=2,
+            reader_factory=build_fake_reader,
+            factory_args=(None,),
+        )
+    )
+    assert [r.path for r in parallel] == paths
+    assert parallel[2].status == "skipped"
+    for seq, par in zip(sequential, parallel):
+        if par.status != "skipped":
+            assert seq.result.to_dict() == par.result.to_dict()
+
+
+def test_read_papers_with_workers_unordered_yields_all():
+    paths = [f"paper{i}.pdf" for i in range(4)]
+    results = list(
+        read_papers(
+            paths,
+            fake_read_tables,
+            workers=2,
+            reader_factory=build_fake_reader,
+            factory_args=(None,),
+            ordered=False,
+        )
+    )
+    assert sorted(r.path for r in results) == paths
+    assert all(isinstance(r, PaperResult) for r in results)
+
+
+def read_pymupdf_tables(paper_path, page_range=None):
+    from paper2table.readers import pymupdf
+
+    return pymupdf.read_tables(paper_path)
+
+
+def build_pymupdf_reader(_args):
+    return read_pymupdf_tables
+
+
+def test_read_papers_with_real_reader_in_workers():
+    results = list(
+        read_papers(
+            [DEMO_PDF],
+            read_pymupdf_tables,
+            workers=2,
+            reader_factory=build_pymupdf_reader,
+            factory_args=(None,),
+        )
+    )
+    assert results[0].status == "done"
+    assert results[0].result.to_dict() == read_pymupdf_tables(DEMO_PDF).to_dict()
+
+
+def test_read_papers_unordered_consumes_paths_lazily():
+    consumed = []
+
+    def paths():
+        for i in range(10):
+            consumed.append(i)
+            yield f"paper{i}.pdf"
+
+    results = read_papers(
+        paths(),
+        fake_read_tables,
+        workers=2,
+        use_threads=True,
+        ordered=False,
+        max_pending=2,
+    )
+    next(results)
+    assert len(consumed) <= 3
+    assert len(list(results)) == 9
+
+
+def test_read_papers_ordered_bounds_submitted_papers():
+    submitted = []
+
+    def read_tables(paper_path, page_range=None):
+        submitted.append(paper_path)
+        return fake_read_tables(paper_path, page_range)
+
+    paths = [f"paper{i}.pdf" for i in range(10)]
+    results = read_papers(
+        paths, read_tables, workers=2, use_threads=True, max_pending=2
+    )
+    next(results)
+    assert len(submitted) <= 2
+    assert [result.path for result in results] == paths[1:]
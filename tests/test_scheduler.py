@@ -0,0 +1,79 @@
+import threading
+
+import pymupdf
+import pytest
+
+from paper2table.runner import read_papers
+from paper2table.scheduler import (
+    clean_path_costs,
+    longest_first,
+    page_count,
+    scan_page_counts,
+)
+
+DEMO_PDF = "./tests/data/demo_table.pdf"
+
+
+class FakeTablesReader:
+    tables = []
+    citation = None
+
+    def to_dict(self):
+        return {"tables": []}
+
+
+@pytest.fixture
+def three_pages_pdf(tmp_path):
+    path = str(tmp_path / "three_pages.pdf")
+    with pymupdf.open() as doc:
+        for _ in range(3):
+            doc.new_page()
+        doc.save(path)
+    return path
+
+
+def test_page_count(three_pages_pdf):
+    assert page_count(DEMO_PDF) == 1
+    assert page_count(three_pages_pdf) == 3
+
+
+def test_page_count_honours_page_range(three_pages_pdf):
+    assert page_count(f"{three_pages_pdf}:2:3") == 2
+    assert page_count(f"{three_pages_pdf}:2:10") == 2
+
+
+def test_page_count_of_unreadable_paper():
+    assert page_count("missing.pdf") == 1
+
+
+def test_scan_page_counts_ignores_skipped_papers(three_pages_pdf):
+    assert scan_page_counts(
+        [DEMO_PDF, f"{three_pages_pdf}:1:2"], should_skip=lambda path: path == DEMO_PDF
+    ) == {f"{three_pages_pdf}:1:2": 2}
+
+
+def test_longest_first():
+    paths = ["a.pdf", "b.pdf", "c.pdf", "d.pdf"]
+    costs = {"a.pdf": 3, "b.pdf": 400, "c.pdf": 3, "d.pdf": 10}
+    assert longest_first(paths, costs) == [1, 3, 0, 2]
+
+
+def test_clean_path_costs():
+    assert clean_path_costs({"a.pdf:1:3": 3, "b.pdf": 1}) == {"a.pdf": 3, "b.pdf": 1}
+
+
+def test_read_papers_dispatches_longest_first_keeping_output_order():
+    paths = ["a.pdf", "b.pdf", "c.pdf", "d.pdf"]
+    costs = {"a.pdf": 1, "b.pdf": 2, "c.pdf": 3, "d.pdf": 400}
+    started = []
+    lock = threading.Lock()
+
+    def read_tables(path, page_range=None):
+        with lock:
+            started.append(path)
+        return FakeTablesReader()
+
+    results = read_papers(paths, read_tables, workers=2, use_threads=True, costs=costs)
+
+    assert [paper.path for paper in results] == paths
+    assert set(started[:2]) == {"d.pdf", "c.pdf"}
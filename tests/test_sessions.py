@@ -0,0 +1,66 @@
+import threading
+
+from pydantic_ai.models import infer_model
+
+from paper2table.readers import agent
+from paper2table.readers.sessions import AgentPool
+
+DEMO_PDF = "./tests/data/demo_table.pdf"
+
+
+class CountingModelFactory:
+    def __init__(self):
+        self.names = []
+
+    def __call__(self, name: str):
+        self.names.append(name)
+        return infer_model(name)
+
+
+def test_agents_are_built_once_per_model_and_schema():
+    factory = CountingModelFactory()
+    pool = AgentPool(factory)
+    agents = []
+
+    def spy_run_agent(test_agent, prompt):
+        agents.append(test_agent)
+        return test_agent.run_sync(prompt)
+
+    for _ in range(3):
+        agent.read_tables(
+            DEMO_PDF,
+            model="test",
+            schema="name:str",
+            run_agent=spy_run_agent,
+            agents=pool,
+        )
+    agent.read_tables(
+        DEMO_PDF,
+        model="test",
+        schema="name:str species:str",
+        run_agent=spy_run_agent,
+        agents=pool,
+    )
+
+    assert agents[0] is agents[1] is agents[2]
+    assert agents[3] is not agents[0]
+    assert agents[3].model is agents[0].model
+    assert factory.names == ["test"]
+
+
+def test_each_thread_has_its_own_models():
+    factory = CountingModelFactory()
+    pool = AgentPool(factory)
+    models = [pool.model("test")]
+
+    thread = threading.Thread(target=lambda: models.append(pool.model("test")))
+    thread.start()
+    thread.join()
+
+    assert models[0] is not models[1]
+    assert pool.model("test") is models[0]
+    assert factory.names == ["test", "test"]
+
+
+def test_output_models_are_built_once_per_schema():
+    assert agent.build_tables_model("name:str") is agent.build_tables_model("name:str")
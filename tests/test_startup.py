@@ -0,0 +1,56 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["pandas", "pydantic_ai", "camelot", "img2table", "cv2", "pdfplumber"]
+
+
+def import_times(code: str) -> dict[str, int]:
+    """
+    Run code in a fresh interpreter with -X importtime
+    and answer the cumulative import time of each module, in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.removeprefix("import time:").split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_startup_doesnt_import_readers_backends():
+    times = import_times("import paper2table.__main__")
+
+    assert [module for module in HEAVY_MODULES if module in times] == []
+
+
+@pytest.mark.parametrize(
+    "reader,unexpected",
+    [
+        ("pymupdf", ["pydantic_ai", "camelot", "img2table", "cv2", "pdfplumber"]),
+        ("pdfplumber", ["pydantic_ai", "camelot", "img2table", "cv2"]),
+    ],
+)
+def test_only_selected_reader_is_imported(reader, unexpected):
+    times = import_times(
+        "import sys;"
+        f"sys.argv = ['paper2table', '-r', '{reader}', 'paper.pdf'];"
+        "from paper2table.__main__ import get_tables_reader, parse_args;"
+        "get_tables_reader(parse_args())"
+    )
+
+    assert reader in times
+    assert [module for module in unexpected if module in times] == []
+
+
+def test_cli_startup_time():
+    # generous bound: importing any reader backend takes several times longer
+    assert import_times("import paper2table.__main__")["paper2table.__main__"] < 500_000
@@ -0,0 +1,30 @@
+import json
+
+from paper2table.journal import status_record
+from paper2table.runner import PaperResult
+from paper2table.tables_reader.dict import DictTablesReader
+from paper2table.writers import stdout
+
+
+def test_write_tables_line_writes_one_line_per_tables_file(capsys):
+    stdout.write_tables_line(
+        DictTablesReader({"tables": [{"rows": [{"0": "a\nb"}], "page": 1}]})
+    )
+    stdout.write_tables_line(DictTablesReader({"tables": [], "citation": "c"}))
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"tables": [{"rows": [{"0": "a\nb"}], "page": 1}]},
+        {"tables": [], "citation": "c"},
+    ]
+
+
+def test_write_status_record_line(capsys):
+    stdout.write_line(
+        status_record(PaperResult(path="papers/a.pdf", status="partial", page_num=3))
+    )
+
+    record = json.loads(capsys.readouterr().out)
+    assert record["paper"] == "a.pdf"
+    assert record["status"] == "partial"
+    assert record["page_num"] == 3
@@ -0,0 +1,205 @@
+import pandas as pd
+import pytest
+
+from paper2table.mapping import ColumnMapping, TableMapping, TablesMapping
+from paper2table.readers.document import (
+    PDFDocument,
+    PDFPage,
+    read_mapped_tables,
+    read_page_as_dataframe,
+    score_table,
+)
+from paper2table.readers.strategies import StrategyMemo, prefer
+
+
+class FakeTable:
+    def __init__(self, rows=None):
+        self.rows = rows or [["Rose"], ["Tulip"], ["Oak"]]
+
+    def to_dataframe(self, _column_names_hints, _skip_first_row):
+        return pd.DataFrame(self.rows)
+
+
+class FakePage(PDFPage):
+    def __init__(self, number, working_strategies, tried, tables=None):
+        self.number = number
+        self.working_strategies = working_strategies
+        self.tried = tried
+        self.tables = tables or {}
+        self.closed = False
+
+    def extract_tables_candidates(self, preferred=()):
+        for strategy in prefer(["a", "b", "c"], list(preferred)):
+            self.tried.append((self.number, strategy))
+            yield (
+                strategy,
+                (
+                    [self.tables.get(strategy, FakeTable())]
+                    if strategy in self.working_strategies
+                    else []
+                ),
+            )
+
+    @property
+    def page_number(self):
+        return self.number
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDocument(PDFDocument):
+    def __init__(self, pages):
+        self._pages = pages
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def page_at(self, index):
+        if not 1 <= index <= self.page_count:
+            raise IndexError(index)
+        return self._pages[index - 1]
+
+
+def make_mapping(first_page, last_page):
+    return TablesMapping(
+        citation="",
+        tables=[
+            TableMapping(
+                title="flowers",
+                header_mode="none",
+                first_page=first_page,
+                last_page=last_page,
+                column_mappings=[
+                    ColumnMapping(from_column_number=0, to_column_name="name")
+                ],
+            )
+        ],
+    )
+
+
+def test_prefer():
+    assert prefer(["a", "b", "c", "d"], ["c", "a"]) == ["c", "a", "b", "d"]
+    assert prefer(["a", "b"], ["x"]) == ["a", "b"]
+
+
+def test_memo_prefers_table_winner_then_document_winner():
+    memo = StrategyMemo()
+    memo.record("0", "b", True, 0.1)
+    memo.choose("0", "b")
+    memo.record("1", "c", True, 0.1)
+    memo.choose("1", "c")
+    memo.record("1", "a", False, 0.1)
+
+    assert memo.preferred("0") == ["b", "c"]
+    assert memo.preferred("1") == ["c"]
+    assert memo.preferred("2") == ["c"]
+    assert memo.stats["a"].failures == 1
+    assert memo.stats["c"].successes == 1
+
+
+def test_memo_save_and_load(tmp_path):
+    memo = StrategyMemo()
+    memo.record("0", "b", True, 0.25)
+    memo.choose("0", "b")
+    memo.save(tmp_path / "paper.strategies.json")
+
+    loaded = StrategyMemo.load(tmp_path / "paper.strategies.json")
+    assert loaded.to_dict() == memo.to_dict()
+    assert StrategyMemo.load(tmp_path / "missing.json").to_dict() == StrategyMemo().to_dict()
+
+
+def test_mapped_tables_try_last_winner_first():
+    tried = []
+    document = FakeDocument([FakePage(n, ["c"], tried) for n in [1, 2, 3]])
+
+    tables = read_mapped_tables("paper.pdf", make_mapping(1, 3), document)
+
+    assert len(tables) == 3
+    assert tried == [(1, "a"), (1, "b"), (1, "c"), (2, "c"), (3, "c")]
+
+
+def test_mapped_tables_use_mapping_memo():
+    tried = []
+    mapping = make_mapping(1, 1)
+    mapping.strategy_memo = StrategyMemo()
+    mapping.strategy_memo.record("0", "b", True, 0.1)
+    mapping.strategy_memo.choose("0", "b")
+
+    read_mapped_tables("paper.pdf", mapping, FakeDocument([FakePage(1, ["b"], tried)]))
+
+    assert tried == [(1, "b")]
+    assert mapping.strategy_memo.stats["b"].successes == 2
+
+
+def test_score_table():
+    table_mapping = make_mapping(1, 1).tables[0]
+    good = FakeTable([["Rose"], ["Tulip"], ["Oak"]])
+    wide = FakeTable([["Rose", "red"], ["Tulip", "pink"], ["Oak", "green"]])
+    sparse = FakeTable([[""], ["Tulip"], [None]])
+
+    def score(table):
+        return score_table(
+            *read_page_as_dataframe([table], table_mapping, 1), table_mapping
+        )
+
+    assert score(good) == pytest.approx(0.95)
+    assert score(wide) == pytest.approx(0.95)
+    assert score(sparse) < score(good)
+
+
+def test_mapped_tables_choose_best_scored_candidate():
+    tried = []
+    page = FakePage(
+        1,
+        ["a", "b", "c"],
+        tried,
+        tables={
+            "a": FakeTable([["Rose"], [""]]),
+            "b": FakeTable([[""], ["Tulip"], [None]]),
+        },
+    )
+    mapping = make_mapping(1, 1)
+    mapping.strategy_memo = StrategyMemo()
+
+    tables = read_mapped_tables("paper.pdf", mapping, FakeDocument([page]))
+
+    assert tried == [(1, "a"), (1, "b"), (1, "c")]
+    assert tables[0].rows == [{"name": "Rose"}, {"name": "Tulip"}, {"name": "Oak"}]
+    assert mapping.strategy_memo.document_winner == "c"
+
+
+def test_mapped_tables_stop_when_page_time_budget_runs_out():
+    tried = []
+    page = FakePage(
+        1, ["a", "b", "c"], tried, tables={"a": FakeTable([["Ro", "se"], ["Tu", "lip"]])}
+    )
+
+    tables = read_mapped_tables(
+        "paper.pdf", make_mapping(1, 1), FakeDocument([page]), page_time_budget=0
+    )
+
+    assert tried == [(1, "a")]
+    assert tables[0].rows == [{"name": "Ro"}, {"name": "Tu"}]
+
+
+def test_mapped_tables_stop_when_page_time_budget_runs_out_on_failures():
+    tried = []
+    page = FakePage(1, [], tried)
+
+    tables = read_mapped_tables(
+        "paper.pdf", make_mapping(1, 1), FakeDocument([page]), page_time_budget=0
+    )
+
+    assert tried == [(1, "a")]
+    assert tables == []
+
+
+def test_mapped_pages_are_closed_after_being_read():
+    tried = []
+    pages = [FakePage(number, ["a"], tried) for number in (1, 2, 3)]
+
+    read_mapped_tables("paper.pdf", make_mapping(1, 2), FakeDocument(pages))
+
+    assert [page.closed for page in pages] == [True, True, False]
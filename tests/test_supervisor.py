@@ -0,0 +1,114 @@
+import os
+import time
+
+import pytest
+
+from paper2table.runner import read_papers
+from paper2table.supervisor import (
+    SupervisedProcessPool,
+    TaskError,
+    WorkerDiedError,
+    current_rss,
+)
+
+
+def get_pid():
+    return os.getpid()
+
+
+def sleep_and_get_pid(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def fail():
+    raise ValueError("broken")
+
+
+def die():
+    os._exit(3)
+
+
+def test_current_rss_is_positive():
+    assert current_rss() > 0
+
+
+def test_pool_runs_tasks_in_another_process():
+    with SupervisedProcessPool(1) as pool:
+        assert pool.submit(get_pid).result() != os.getpid()
+
+
+def test_pool_reuses_workers():
+    with SupervisedProcessPool(1) as pool:
+        assert pool.submit(get_pid).result() == pool.submit(get_pid).result()
+
+
+def test_pool_kills_workers_that_exceed_timeout():
+    with SupervisedProcessPool(1, timeout=0.5) as pool:
+        first_pid = pool.submit(get_pid).result()
+        with pytest.raises(TimeoutError):
+            pool.submit(sleep_and_get_pid, 30).result()
+        assert pool.submit(get_pid).result() != first_pid
+
+
+def test_pool_recycles_workers_after_max_tasks():
+    with SupervisedProcessPool(1, max_tasks_per_worker=2) as pool:
+        pids = [pool.submit(get_pid).result() for _ in range(4)]
+    assert pids[0] == pids[1]
+    assert pids[1] != pids[2]
+    assert pids[2] == pids[3]
+
+
+def test_pool_recycles_workers_exceeding_rss():
+    with SupervisedProcessPool(1, max_worker_rss=1) as pool:
+        assert pool.submit(get_pid).result() != pool.submit(get_pid).result()
+
+
+def test_pool_keeps_workers_below_rss():
+    with SupervisedProcessPool(1, max_worker_rss=1024**4) as pool:
+        assert pool.submit(get_pid).result() == pool.submit(get_pid).result()
+
+
+def test_pool_reports_task_errors():
+    with SupervisedProcessPool(1) as pool:
+        with pytest.raises(TaskError, match="broken"):
+            pool.submit(fail).result()
+        assert pool.submit(get_pid).result()
+
+
+def test_pool_reports_dead_workers():
+    with SupervisedProcessPool(1) as pool:
+        with pytest.raises(WorkerDiedError):
+            pool.submit(die).result()
+        assert pool.submit(get_pid).result()
+
+
+def slow_read_tables(paper_path, page_range=None):
+    from paper2table.tables_reader.dict import DictTablesReader
+
+    if "slow" in paper_path:
+        time.sleep(30)
+    return DictTablesReader({"tables": [{"table_fragments": []}], "citation": None})
+
+
+def build_slow_reader(_args):
+    return slow_read_tables
+
+
+def test_read_papers_reports_timed_out_papers():
+    results = list(
+        read_papers(
+            ["fast.pdf", "slow.pdf:1:2", "other.pdf"],
+            slow_read_tables,
+            workers=2,
+            reader_factory=build_slow_reader,
+            factory_args=(None,),
+            timeout=1,
+        )
+    )
+    assert [(r.path, r.status) for r in results] == [
+        ("fast.pdf", "done"),
+        ("slow.pdf", "timeout"),
+        ("other.pdf", "done"),
+    ]
+    assert results[1].elapsed == 1
@@ -0,0 +1,73 @@
+import io
+
+import numpy as np
+import pdfplumber
+import pdfplumber.page
+import pytest
+
+from paper2table.cache import TextLayerCache
+from paper2table.readers.pdfplumber import open_document
+from paper2table.readers.text_layer import decode_objects, encode_objects
+
+DEMO_PDF = "./tests/data/demo_table.pdf"
+
+
+def roundtrip(objects):
+    buffer = io.BytesIO()
+    np.savez(buffer, **encode_objects(objects))
+    buffer.seek(0)
+    with np.load(buffer, allow_pickle=False) as arrays:
+        return decode_objects(arrays)
+
+
+def test_page_objects_roundtrip():
+    with pdfplumber.open(DEMO_PDF, unicode_norm="NFKC") as pdf:
+        objects = pdf.pages[0].objects
+
+        assert roundtrip(objects) == objects
+
+
+def test_roundtrip_keeps_types_and_missing_attributes():
+    objects = {
+        "curve": [
+            {
+                "x0": 1,
+                "pts": [(0.0, 1.5), (2.0, 3.0)],
+                "dash": ([], 0),
+                "mcid": None,
+                "text": "a\x00",
+            },
+            {
+                "x0": 2.5,
+                "pts": [(1.0, 1.0)],
+                "dash": None,
+                "mcid": 3,
+                "text": "b",
+                "tag": "P",
+            },
+        ],
+        "char": [],
+    }
+
+    assert roundtrip(objects) == objects
+    assert "tag" not in roundtrip(objects)["curve"][0]
+
+
+def test_cached_text_layer_is_used_instead_of_parsing(tmp_path, monkeypatch):
+    cache = TextLayerCache(tmp_path, max_size=1024 * 1024 * 1024)
+
+    document = open_document(DEMO_PDF, text_layer_cache=cache)
+    rows = [table.rows for table in document.page_at(1).extract_tables()]
+    document.close()
+
+    def fail_parse(self):
+        raise AssertionError("Unexpected parsing")
+
+    monkeypatch.setattr(pdfplumber.page.Page, "parse_objects", fail_parse)
+    document = open_document(DEMO_PDF, text_layer_cache=cache)
+
+    assert [table.rows for table in document.page_at(1).extract_tables()] == rows
+    document.close()
+
+    with pytest.raises(AssertionError):
+        open_document(DEMO_PDF).page_at(1).extract_tables()
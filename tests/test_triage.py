@@ -0,0 +1,83 @@
+import pymupdf
+import pytest
+
+from paper2table.cache import TriageCache
+from paper2table.readers import pymupdf as pymupdf_reader
+from paper2table.readers.triage import (
+    PageTriage,
+    PageTriager,
+    count_aligned_rows,
+    triage_document,
+)
+
+DEMO_PDF = "./tests/data/demo_table.pdf"
+
+PROSE = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 60
+
+
+@pytest.fixture
+def prose_and_table_pdf(tmp_path):
+    path = str(tmp_path / "prose_and_table.pdf")
+    with pymupdf.open() as doc:
+        doc.new_page().insert_textbox(pymupdf.Rect(50, 50, 550, 800), PROSE)
+        doc.insert_pdf(pymupdf.open(DEMO_PDF))
+        doc.save(path)
+    return path
+
+
+def test_triage_scores_table_pages_higher_than_prose(prose_and_table_pdf):
+    prose, table = triage_document(prose_and_table_pdf)
+
+    assert prose.page_number == 1
+    assert prose.score == 0
+    assert table.page_number == 2
+    assert table.rules > 0
+    assert table.aligned_rows > 0
+    assert table.score > 0.5
+
+
+def test_two_column_rows_are_not_aligned_rows():
+    words = [
+        (x, y, x + 200, y + 10, "word", 0, 0, 0)
+        for y in range(0, 300, 12)
+        for x in (50, 300)
+    ]
+    assert count_aligned_rows(words) == 0
+
+
+def test_scanned_pages_are_always_selected():
+    assert PageTriage(1, scanned=True).score == 1
+
+
+def test_page_triage_roundtrip():
+    triage = PageTriage(3, rules=4, aligned_rows=2, caption=True)
+    assert PageTriage.from_dict(triage.to_dict()).to_dict() == triage.to_dict()
+
+
+def test_triager_selects_pages_above_threshold(prose_and_table_pdf):
+    assert PageTriager(0.3)(prose_and_table_pdf) == {2}
+    assert PageTriager(0)(prose_and_table_pdf) == {1, 2}
+
+
+def test_triager_reads_all_pages_when_triage_fails(tmp_path):
+    assert PageTriager()(str(tmp_path / "missing.pdf")) is None
+
+
+def test_triager_uses_cache(prose_and_table_pdf, tmp_path):
+    cache = TriageCache(tmp_path / "cache", max_size=1024 * 1024)
+    key = cache.key(prose_and_table_pdf, version=1)
+    cache.put_triage(key, [PageTriage(1).to_dict(), PageTriage(2).to_dict()])
+
+    assert PageTriager(0.3, cache=cache)(prose_and_table_pdf) == set()
+    assert PageTriager(0.3, cache=cache, refresh=True)(prose_and_table_pdf) == {2}
+    assert PageTriager(0.3, cache=cache)(prose_and_table_pdf) == {2}
+
+
+def test_read_tables_skips_pages_not_selected_by_triage(prose_and_table_pdf):
+    all_tables = pymupdf_reader.read_tables(prose_and_table_pdf).tables
+    triaged_tables = pymupdf_reader.read_tables(
+        prose_and_table_pdf, triage=lambda _: {1}
+    ).tables
+
+    assert [table.page for table in all_tables] == [2]
+    assert triaged_tables == []
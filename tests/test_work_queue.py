@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+
+from paper2table.journal import RunJournal
+from paper2table.runner import PaperResult, read_papers
+from paper2table.tables_reader.dict import DictTablesReader
+from paper2table.work_queue import LeaseQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_queue(tmp_path, node, clock=None, lease_timeout=60):
+    clock = clock or FakeClock()
+    return LeaseQueue(
+        str(tmp_path / "queue"),
+        node=node,
+        lease_timeout=lease_timeout,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+
+def test_nodes_share_resultset_uuid(tmp_path):
+    first = make_queue(tmp_path, "a").resultset_uuid()
+    assert make_queue(tmp_path, "b").resultset_uuid() == first
+
+
+def test_paper_is_claimed_by_a_single_node(tmp_path):
+    a = make_queue(tmp_path, "a")
+    b = make_queue(tmp_path, "b")
+
+    assert a.claim("papers/x.pdf")
+    assert not b.claim("papers/x.pdf")
+    assert not a.claim("papers/x.pdf")
+
+
+def test_completed_papers_are_not_claimed_again(tmp_path):
+    a = make_queue(tmp_path, "a")
+    b = make_queue(tmp_path, "b")
+
+    a.claim("x.pdf")
+    a.release("x.pdf", completed=True)
+
+    assert a.is_done("x.pdf")
+    assert not b.claim("x.pdf")
+
+
+def test_incomplete_papers_can_be_claimed_again(tmp_path):
+    a = make_queue(tmp_path, "a")
+    b = make_queue(tmp_path, "b")
+
+    a.claim("x.pdf")
+    a.release("x.pdf", completed=False)
+
+    assert b.claim("x.pdf")
+
+
+def test_expired_leases_are_taken_over(tmp_path):
+    clock = FakeClock()
+    clock.now = os.path.getmtime(tmp_path)
+    a = make_queue(tmp_path, "a", clock)
+    b = make_queue(tmp_path, "b", clock)
+
+    assert a.claim("x.pdf")
+    clock.now += 30
+    assert not b.claim("x.pdf")
+    clock.now += 60
+    assert b.claim("x.pdf")
+
+
+def test_heartbeat_keeps_leases_alive(tmp_path):
+    clock = FakeClock()
+    a = make_queue(tmp_path, "a", clock)
+    b = make_queue(tmp_path, "b", clock)
+
+    a.claim("x.pdf")
+    clock.now = os.path.getmtime(a.lease_path("x.pdf")) + 30
+    os.utime(a.lease_path("x.pdf"), (0, 0))
+    assert b.is_expired(b.lease_path("x.pdf"))
+
+    a.heartbeat()
+    assert not b.claim("x.pdf")
+
+
+def test_claims_skip_papers_done_by_other_nodes(tmp_path):
+    a = make_queue(tmp_path, "a")
+    b = make_queue(tmp_path, "b")
+    b.claim("y.pdf")
+    b.release("y.pdf", completed=True)
+
+    assert list(a.claims(["x.pdf", "y.pdf", "z.pdf:1:2"])) == ["x.pdf", "z.pdf:1:2"]
+
+
+def test_claims_wait_for_papers_held_by_dead_nodes(tmp_path):
+    clock = FakeClock()
+    clock.now = os.path.getmtime(tmp_path)
+    dead = make_queue(tmp_path, "dead", clock)
+    alive = make_queue(tmp_path, "alive", clock)
+    dead.claim("x.pdf")
+
+    claims = list(alive.claims(["x.pdf", "y.pdf"]))
+    assert [path for path in claims if path is not None] == ["y.pdf", "x.pdf"]
+    assert None in claims
+    assert clock.now > os.path.getmtime(tmp_path) + 60
+
+
+def test_close_gives_up_held_leases(tmp_path):
+    a = make_queue(tmp_path, "a")
+    b = make_queue(tmp_path, "b")
+    a.claim("x.pdf")
+    a.close()
+
+    assert b.claim("x.pdf")
+
+
+def test_journals_of_all_nodes_are_loaded(tmp_path):
+    a = RunJournal(str(tmp_path), node="a")
+    b = RunJournal(str(tmp_path), node="b")
+    a.record(PaperResult(path="x.pdf", status="partial"))
+    b.record(PaperResult(path="y.pdf", status="done"))
+    b.record(PaperResult(path="x.pdf", status="done"))
+    a.close()
+    b.close()
+
+    records = RunJournal(str(tmp_path)).load()
+    assert records["x.pdf"]["status"] == "done"
+    assert records["y.pdf"]["status"] == "done"
+
+
+def test_nodes_reading_in_parallel_finish_each_others_papers(tmp_path):
+    paths = [f"p{i}.pdf" for i in range(4)]
+    finished = []
+
+    def read_tables(paper_path, page_range=None):
+        time.sleep(0.05)
+        return DictTablesReader({"tables": [], "citation": None})
+
+    def run_node(node, node_paths):
+        queue = LeaseQueue(str(tmp_path / "queue"), node=node)
+        queue.poll_interval = 0.05
+        for paper in read_papers(
+            queue.claims(node_paths),
+            read_tables,
+            workers=2,
+            use_threads=True,
+            ordered=False,
+        ):
+            queue.release(paper.path, completed=True)
+            finished.append(paper.path)
+
+    nodes = [
+        threading.Thread(target=run_node, args=("a", paths), daemon=True),
+        threading.Thread(
+            target=run_node, args=("b", paths[2:] + paths[:2]), daemon=True
+        ),
+    ]
+    for node in nodes:
+        node.start()
+    for node in nodes:
+        node.join(timeout=10)
+
+    assert not any(node.is_alive() for node in nodes)
+    assert sorted(finished) == paths
+
+
+def test_leases_taken_over_are_not_released_nor_refreshed(tmp_path):
+    clock = FakeClock()
+    clock.now = os.path.getmtime(tmp_path)
+    slow = make_queue(tmp_path, "slow", clock)
+    other = make_queue(tmp_path, "other", clock)
+    slow.claim("x.pdf")
+    clock.now += 120
+    assert other.claim("x.pdf")
+
+    slow.heartbeat()
+    slow.release("x.pdf", completed=False)
+
+    assert other.owns(other.lease_path("x.pdf"))
+    assert not slow._held